@@ -0,0 +1,14 @@
+import pytest
+from tradando.app import create_app
+from tradando.config import Config
+
+
+@pytest.fixture(autouse=True)
+def single_process(monkeypatch):
+    # Backtests run in the test process rather than a spawned pool
+    monkeypatch.setattr(Config, 'ANALYZE_BACKTEST_WORKERS', 1)
+
+
+@pytest.fixture
+def client():
+    return create_app().test_client()
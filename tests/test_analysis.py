@@ -0,0 +1,86 @@
+import pandas as pd
+import pytest
+from tradando import utils
+from tradando.services import analysis
+from tradando.benchmarks.synthetic import gbm_ohlcv
+from tradando.services.analysis import build_strategies, run_backtests
+from tradando.services.backtest import Backtester
+from tradando.services.portfolio_backtest import PortfolioBacktester
+from tradando.strategies.registry import strategy_registry
+
+# Tickers trading over different stretches, as crypto and equities do
+DATA = {
+    'BTC-USD': gbm_ohlcv(1200, seed=1),
+    'ETH-USD': gbm_ohlcv(1200, seed=2, start_price=50.0).iloc[200:],
+    'AAPL': gbm_ohlcv(1200, seed=4, start_price=20.0).iloc[::3].tz_convert('America/New_York'),
+}
+
+
+@pytest.fixture
+def bulk_calls(monkeypatch):
+    # Stands in for the bar store refresh, with the columns it stores
+    calls = []
+
+    def prefetch(symbols, days, interval='5m'):
+        calls.append(list(symbols))
+        return {symbol: DATA[symbol].assign(Dividends=0.0, **{'Stock Splits': 0.0})
+                for symbol in symbols if symbol in DATA}
+
+    monkeypatch.setattr(utils, 'prefetch_historical_data', prefetch)
+    monkeypatch.setattr(analysis, 'prefetch_historical_data', prefetch)
+    return calls
+
+
+def test_fetch_many_aligns_symbols_on_one_index(bulk_calls):
+    frame = utils.fetch_many(['BTC-USD', 'ETH-USD', 'NOPE'], columns=('Close', 'Volume'))
+
+    assert list(frame.columns) == [('Close', 'BTC-USD'), ('Close', 'ETH-USD'),
+                                   ('Volume', 'BTC-USD'), ('Volume', 'ETH-USD')]
+    assert frame.index.equals(DATA['BTC-USD'].index)
+    assert frame['Close']['ETH-USD'].isna().sum() == 200
+    pd.testing.assert_series_equal(frame['Close']['ETH-USD'].dropna(), DATA['ETH-USD']['Close'],
+                                   check_names=False, check_freq=False)
+
+
+def test_run_backtests_fetches_once_and_matches_single_backtests(bulk_calls):
+    tickers = ['BTC-USD', 'NOPE', 'ETH-USD', 'AAPL']
+    strategies = build_strategies(['sma_cross', 'rsi'], stop_loss=3, take_profit=4)
+    finished = []
+    results = run_backtests(tickers, strategies, days=5,
+                            on_ticker=lambda pos, symbol, rows: finished.append((symbol, len(rows))))
+
+    assert bulk_calls == [tickers]
+    assert sorted(finished) == [('AAPL', 2), ('BTC-USD', 2), ('ETH-USD', 2), ('NOPE', 0)]
+    assert [(r['symbol'], r['strategy_key']) for r in results] == [
+        (symbol, key) for symbol in ('BTC-USD', 'ETH-USD', 'AAPL') for key in ('sma_cross', 'rsi')]
+    for result in results:
+        single = Backtester(strategies[result['strategy_key']]).run(DATA[result['symbol']])
+        assert result['return_pct'] == single['return_pct']
+        assert result['n_trades'] == single['n_trades']
+
+
+def test_run_backtests_keeps_each_tickers_timezone(bulk_calls):
+    # AAPL trades in New York time next to UTC crypto; its trades keep their local timestamps
+    strategy = build_strategies(['sma_cross'], stop_loss=5, take_profit=5)['sma_cross']
+    results = run_backtests(['BTC-USD', 'AAPL'], {'sma_cross': strategy}, days=5)
+    for result in results:
+        single = Backtester(strategy).run(DATA[result['symbol']])
+        assert result['trades'].to_dicts() == single['trades'].to_dicts()
+    assert results[1]['trades'].to_dicts()
+
+
+def test_portfolio_backtest_uses_the_bulk_fetch(client, bulk_calls):
+    response = client.post('/portfolio_backtest', json={'tickers': ['BTC-USD', 'ETH-USD', 'AAPL'],
+                                                        'strategy': 'sma_cross', 'max_positions': 2})
+
+    assert response.status_code == 200
+    assert bulk_calls == [['BTC-USD', 'ETH-USD', 'AAPL']]
+    expected = PortfolioBacktester(strategy_registry.instance('sma_cross', stop_loss_pct=5.0, take_profit_pct=5.0),
+                                   max_positions=2).run(DATA)
+    result = response.get_json()
+    assert (result['final_value'], result['n_trades']) == (expected['final_value'], expected['n_trades'])
+
+
+def test_portfolio_backtest_without_data_is_not_found(client, bulk_calls):
+    response = client.post('/portfolio_backtest', json={'tickers': ['NOPE']})
+    assert response.status_code == 404
@@ -0,0 +1,64 @@
+import pandas as pd
+import pytest
+from tradando.benchmarks.synthetic import gbm_ohlcv
+from tradando.services.backtest import Backtester
+from tradando.strategies.base import TradingStrategy
+from tradando.strategies.registry import strategy_registry
+
+STRATEGIES = ['sma_cross', 'rsi', 'macd']
+
+
+def run(strategy, data, mode):
+    result = Backtester(strategy, mode=mode).run(data)
+    trades = result.pop('trades').to_dicts()
+    return result, trades
+
+
+@pytest.mark.parametrize('name', STRATEGIES)
+@pytest.mark.parametrize('seed', range(5))
+def test_vectorized_matches_loop(name, seed):
+    data = gbm_ohlcv(3000, seed=seed)
+    strategy = strategy_registry.create(name, stop_loss_pct=1, take_profit_pct=1.5)
+    assert run(strategy, data, 'vectorized') == run(strategy, data, 'loop')
+
+
+@pytest.mark.parametrize('name', STRATEGIES)
+def test_vectorized_matches_loop_on_rounded_prices(name):
+    # Repeated prices produce indicator ties and exits landing exactly on the thresholds
+    data = gbm_ohlcv(3000, seed=7).round(1)
+    strategy = strategy_registry.create(name, stop_loss_pct=0.5, take_profit_pct=0.5)
+    result, trades = run(strategy, data, 'vectorized')
+    assert trades
+    assert (result, trades) == run(strategy, data, 'loop')
+
+
+def test_custom_exit_rules_fall_back_to_loop():
+    class NeverExit(type(strategy_registry.create('sma_cross'))):
+        def check_exit_conditions(self, current_price, entry_price):
+            return {'exit': False}
+
+    data = gbm_ohlcv(2000, seed=1)
+    result, trades = run(NeverExit(), data, 'vectorized')
+    assert result['n_stop_losses'] == result['n_take_profits'] == 0
+    assert (result, trades) == run(NeverExit(), data, 'loop')
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        Backtester(strategy_registry.create('sma_cross'), mode='fast')
+
+
+def test_exit_thresholds_follow_the_base_rules():
+    strategy = strategy_registry.create('sma_cross', stop_loss_pct=2, take_profit_pct=3)
+    assert strategy.check_exit_conditions(98, 100)['reason'] == 'stop_loss'
+    assert strategy.check_exit_conditions(103, 100)['reason'] == 'take_profit'
+    assert not strategy.check_exit_conditions(101, 100)['exit']
+    assert TradingStrategy.check_exit_conditions(strategy, 100, None) == {'exit': False}
+
+
+def test_trades_are_stamped_to_the_minute():
+    data = gbm_ohlcv(2000, seed=6)
+    data.index += pd.Timedelta(seconds=30)
+    trades = Backtester(strategy_registry.create('sma_cross')).run(data)['trades'].to_dicts()
+
+    assert trades and {trade['timestamp'] for trade in trades} <= set(data.index.strftime('%Y-%m-%d %H:%M'))
@@ -0,0 +1,147 @@
+import time
+from types import SimpleNamespace
+import pandas as pd
+import pytest
+from tradando.benchmarks.synthetic import gbm_ohlcv
+from tradando.services import bar_store
+from tradando.services.bar_store import BarStore, EVENT_COLUMNS
+
+BARS = gbm_ohlcv(1000, seed=3)
+# What the store keeps for BARS: every column as float, with no corporate actions
+STORED = BARS.astype(float).assign(**{column: 0.0 for column in EVENT_COLUMNS})
+
+
+class FakeFetcher:
+    """Stand-in for yfinance serving BARS up to a movable `now`, recording each request"""
+
+    def __init__(self, now=BARS.index[499]):
+        self.now = now
+        self.calls = []
+        self.fail = False
+
+    def __call__(self, symbol, start, end, interval):
+        self.calls.append((symbol, pd.Timestamp(start), pd.Timestamp(end)))
+        if self.fail:
+            raise ConnectionError("upstream down")
+        index = BARS.index
+        return BARS[(index >= start) & (index <= min(pd.Timestamp(end), self.now))]
+
+    def bulk(self, symbols, start, end, interval):
+        return {symbol: self(symbol, start, end, interval) for symbol in symbols}
+
+
+def assert_bars(df, expected):
+    # Frames read back from disk carry nanosecond timestamps whatever unit was fetched
+    pd.testing.assert_frame_equal(df.set_axis(df.index.as_unit('ns')),
+                                  expected.set_axis(expected.index.as_unit('ns')), check_freq=False)
+
+
+@pytest.fixture
+def fetcher():
+    return FakeFetcher()
+
+
+def store(root, fetcher, refresh_seconds=3600, bulk=False):
+    return BarStore(str(root), fetcher, refresh_seconds, bulk_fetcher=fetcher.bulk if bulk else None)
+
+
+def test_cache_hit_does_not_fetch(tmp_path, fetcher):
+    bars = store(tmp_path, fetcher)
+    first = bars.get('BTC-USD', BARS.index[100], BARS.index[499])
+    second = bars.get('BTC-USD', BARS.index[100], BARS.index[499])
+
+    assert len(fetcher.calls) == 1
+    assert_bars(first, STORED.iloc[100:500])
+    assert_bars(second, first)
+
+
+def test_cache_survives_a_new_store(tmp_path, fetcher):
+    store(tmp_path, fetcher).get('BTC-USD', BARS.index[0], BARS.index[499])
+    fetcher.fail = True
+    reopened = store(tmp_path, fetcher).get('BTC-USD', BARS.index[0], BARS.index[499])
+
+    assert len(fetcher.calls) == 1
+    assert_bars(reopened, STORED.iloc[:500])
+    assert str(reopened.index.tz) == 'UTC'
+
+
+def test_top_up_fetches_only_newer_bars(tmp_path, fetcher):
+    bars = store(tmp_path, fetcher, refresh_seconds=0)
+    bars.get('BTC-USD', BARS.index[0], BARS.index[-1])
+    fetcher.now = BARS.index[599]
+    df = bars.get('BTC-USD', BARS.index[0], BARS.index[-1])
+
+    # The last cached bar is requested again in case it was still forming
+    assert fetcher.calls[-1][1] == BARS.index[499]
+    assert_bars(df, STORED.iloc[:600])
+
+
+def test_older_history_is_fetched_once(tmp_path, fetcher):
+    bars = store(tmp_path, fetcher)
+    bars.get('BTC-USD', BARS.index[300], BARS.index[499])
+    df = bars.get('BTC-USD', BARS.index[100], BARS.index[499])
+    bars.get('BTC-USD', BARS.index[100], BARS.index[499])
+
+    assert [(start, end) for _, start, end in fetcher.calls[1:]] == [(BARS.index[100], BARS.index[300])]
+    assert_bars(df, STORED.iloc[100:500])
+
+
+def test_failed_top_up_serves_the_cache(tmp_path, fetcher):
+    bars = store(tmp_path, fetcher, refresh_seconds=0)
+    bars.get('BTC-USD', BARS.index[0], BARS.index[-1])
+    fetcher.fail = True
+    df = bars.get('BTC-USD', BARS.index[0], BARS.index[-1])
+
+    assert_bars(df, STORED.iloc[:500])
+
+
+def test_get_many_refreshes_stale_symbols_in_one_bulk_fetch(tmp_path, fetcher):
+    bars = store(tmp_path, fetcher, bulk=True)
+    bars.get('ETH-USD', BARS.index[0], BARS.index[499])
+    fetcher.calls.clear()
+
+    result = bars.get_many(['BTC-USD', 'ETH-USD', 'SOL-USD'], BARS.index[0], BARS.index[499])
+
+    assert sorted(symbol for symbol, _, _ in fetcher.calls) == ['BTC-USD', 'SOL-USD']
+    for df in result.values():
+        assert_bars(df, STORED.iloc[:500])
+
+
+def test_get_many_tops_up_warm_symbols_from_their_last_bar(tmp_path, fetcher, monkeypatch):
+    clock = [time.time()]
+    monkeypatch.setattr(bar_store, 'time', SimpleNamespace(time=lambda: clock[0]))
+    bars = store(tmp_path, fetcher, refresh_seconds=60, bulk=True)
+    fetcher.now = BARS.index[399]
+    bars.get_many(['ETH-USD'], BARS.index[100], BARS.index[599])
+    fetcher.now = BARS.index[499]
+    bars.get_many(['BTC-USD'], BARS.index[100], BARS.index[599])
+    clock[0] += 120
+    fetcher.now = BARS.index[599]
+    fetcher.calls.clear()
+
+    result = bars.get_many(['BTC-USD', 'ETH-USD', 'SOL-USD'], BARS.index[100], BARS.index[599])
+
+    # Only SOL-USD, with nothing cached, needs the whole range
+    assert sorted(fetcher.calls) == [('BTC-USD', BARS.index[399], BARS.index[599]),
+                                     ('ETH-USD', BARS.index[399], BARS.index[599]),
+                                     ('SOL-USD', BARS.index[100], BARS.index[599])]
+    for df in result.values():
+        assert_bars(df, STORED.iloc[100:600])
+
+
+def test_missing_symbol_returns_none(tmp_path, fetcher):
+    fetcher.now = BARS.index[0] - pd.Timedelta(days=1)
+    assert store(tmp_path, fetcher).get('NOPE', BARS.index[0], BARS.index[10]) is None
+
+
+def test_history_and_bulk_fetches_store_the_same_columns(tmp_path, fetcher):
+    # Ticker.history() adds corporate action columns that yf.download() leaves out
+    def history(symbol, start, end, interval):
+        df = fetcher(symbol, start, end, interval)
+        return df.assign(**{'Dividends': 0.0, 'Stock Splits': 0.0, 'Capital Gains': 0.0})
+
+    single = BarStore(str(tmp_path / 'single'), history, 3600).get('BTC-USD', BARS.index[0], BARS.index[499])
+    bulk = store(tmp_path / 'bulk', fetcher, bulk=True).get_many(['BTC-USD', 'ETH-USD'], BARS.index[0], BARS.index[499])
+
+    assert_bars(single, STORED.iloc[:500])
+    assert_bars(bulk['BTC-USD'], single)
@@ -0,0 +1,53 @@
+import base64
+import numpy as np
+import pandas as pd
+import pytest
+from tradando import routes
+from tradando.benchmarks.synthetic import gbm_ohlcv
+from tradando.services import charting
+
+DATA = gbm_ohlcv(5000, seed=2)
+
+
+@pytest.mark.parametrize('unit', ['s', 'ms', 'us', 'ns'])
+def test_packed_timestamps_are_epoch_seconds_for_any_unit(unit):
+    index = DATA.index[:100].as_unit(unit)
+    expected = (DATA.index[:100] - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1)
+
+    body, layout = charting.encode(index, {'prices': DATA['Close'].to_numpy()[:100]}, 'binary')
+    np.testing.assert_array_equal(np.frombuffer(body[:400], dtype='<u4'), expected)
+
+    payload = charting.encode(index, {'prices': DATA['Close'].to_numpy()[:100]}, 'base64')
+    np.testing.assert_array_equal(np.frombuffer(base64.b64decode(payload['timestamps']), dtype='<u4'), expected)
+
+
+@pytest.mark.parametrize('method', charting.DOWNSAMPLERS)
+def test_downsampling_keeps_ends_and_extremes(method):
+    close = DATA['Close'].to_numpy().copy()
+    close[1234] = close.max() * 2
+    index, series = charting.downsample(DATA.index, {'prices': close}, 500, method)
+
+    assert len(index) <= 500
+    assert index.is_monotonic_increasing
+    assert (index[0], index[-1]) == (DATA.index[0], DATA.index[-1])
+    assert series['prices'].max() == close[1234]
+
+
+@pytest.mark.parametrize('method', charting.DOWNSAMPLERS)
+@pytest.mark.parametrize('max_points', [1, 2, 3])
+def test_tiny_budgets_keep_the_first_and_last_point(method, max_points):
+    index, _ = charting.downsample(DATA.index, {'prices': DATA['Close'].to_numpy()}, max_points, method)
+    if method == 'lttb' and max_points == 3:
+        assert len(index) == 3
+    else:
+        assert list(index) == [DATA.index[0], DATA.index[-1]]
+
+
+def test_historical_data_budget(client, monkeypatch):
+    monkeypatch.setattr(routes, 'fetch_historical_data', lambda symbol, days, interval: DATA)
+
+    response = client.post('/get_historical_data', json={'symbol': 'BTC-USD', 'max_points': 2})
+    assert len(response.get_json()['prices']) == 2
+
+    response = client.post('/get_historical_data', json={'symbol': 'BTC-USD', 'max_points': -5})
+    assert response.status_code == 400
@@ -0,0 +1,114 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from tradando.services.descriptions import DescriptionService
+from tradando.strategies.registry import strategy_registry
+
+
+class StubModel:
+    """Local stand-in for the inference API, recording every request it gets"""
+
+    def __init__(self):
+        self.requests = []
+        self.status = 200
+        self.delay = 0.0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                stub.requests.append((self.path, self.headers.get('Authorization'), body))
+                time.sleep(stub.delay)
+                payload = json.dumps([{'generated_text': f"Generated: {body['inputs'][:20]}"}]).encode()
+                self.send_response(stub.status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/models/"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+@pytest.fixture
+def stub():
+    stub = StubModel()
+    yield stub
+    stub.server.shutdown()
+
+
+def service(stub, tmp_path, **kwargs):
+    return DescriptionService(stub.url, 'secret', 'tiny-model', str(tmp_path), **kwargs)
+
+
+def test_fallback_first_then_generated_text(stub, tmp_path):
+    descriptions = service(stub, tmp_path)
+    strategy = strategy_registry.create('sma_cross')
+
+    assert descriptions.get(strategy) == DescriptionService.fallback(strategy)
+    descriptions.wait()
+    text = descriptions.get(strategy)
+    descriptions.get(strategy)
+
+    assert text.startswith('Generated: ')
+    assert len(stub.requests) == 1
+    path, authorization, body = stub.requests[0]
+    assert (path, authorization) == ('/models/tiny-model', 'Bearer secret')
+    assert body == {'inputs': DescriptionService.prompt(strategy)}
+
+
+def test_get_does_not_wait_for_the_model(stub, tmp_path):
+    stub.delay = 0.5
+    descriptions = service(stub, tmp_path)
+    strategy = strategy_registry.create('rsi')
+
+    started = time.perf_counter()
+    assert descriptions.get(strategy) == DescriptionService.fallback(strategy)
+    assert time.perf_counter() - started < 0.2
+    descriptions.wait()
+
+
+def test_disk_cache_is_shared_with_a_new_service(stub, tmp_path):
+    strategy = strategy_registry.create('macd')
+    first = service(stub, tmp_path)
+    first.get(strategy)
+    first.wait()
+
+    stub.status = 500
+    assert service(stub, tmp_path).get(strategy) == first.get(strategy)
+    assert len(stub.requests) == 1
+
+
+def test_parameters_are_part_of_the_key(stub, tmp_path):
+    descriptions = service(stub, tmp_path)
+    for fast in (10, 20):
+        descriptions.get(strategy_registry.create('sma_cross', fast_period=fast))
+    descriptions.wait()
+    assert len(stub.requests) == 2
+
+
+@pytest.mark.parametrize('failure', ['status', 'timeout'])
+def test_failures_serve_the_fallback_and_back_off(stub, tmp_path, failure):
+    if failure == 'status':
+        stub.status = 503
+    else:
+        stub.delay = 0.5
+    descriptions = service(stub, tmp_path, timeout=(1, 0.1), retry_seconds=60)
+    strategy = strategy_registry.create('sma_cross')
+
+    for _ in range(3):
+        assert descriptions.get(strategy) == DescriptionService.fallback(strategy)
+        descriptions.wait()
+    assert len(stub.requests) == 1
+
+    stub.status, stub.delay = 200, 0.0
+    descriptions.retry_seconds = 0
+    descriptions.get(strategy)
+    descriptions.wait()
+    assert descriptions.get(strategy).startswith('Generated: ')
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+from tradando import routes
+from tradando.benchmarks.synthetic import gbm_ohlcv
+from tradando.services.backtest import Backtester
+from tradando.services.execution import ExecutionModel
+from tradando.strategies.registry import strategy_registry
+
+DATA = gbm_ohlcv(2000, seed=11)
+
+
+def run(data, mode, execution, name='sma_cross'):
+    strategy = strategy_registry.create(name, stop_loss_pct=2, take_profit_pct=3)
+    result = Backtester(strategy, mode=mode, execution=execution).run(data)
+    return result, result.pop('trades').to_dicts()
+
+
+def bars(**columns):
+    return {name: np.array(values, dtype=float) for name, values in columns.items()}
+
+
+@pytest.mark.parametrize('seed', range(3))
+@pytest.mark.parametrize('name', ['sma_cross', 'rsi', 'macd'])
+def test_intrabar_vectorized_matches_loop(name, seed):
+    data = gbm_ohlcv(3000, seed=seed)
+    execution = ExecutionModel(trailing_stop_pct=1.5, slippage_pct=0.05, fee_pct=0.1)
+    assert run(data, 'vectorized', execution, name) == run(data, 'loop', execution, name)
+
+
+def test_trailing_stop_follows_the_previous_highs():
+    execution = ExecutionModel(trailing_stop_pct=5)
+    # Enter at 100; the High reaches 110, so the stop trails up to 104.5 from the next bar on
+    prices = bars(Open=[100, 101, 106, 109, 105], High=[100, 104, 110, 109, 106],
+                  Low=[100, 100, 105, 104, 103], Close=[100, 103, 108, 106, 104])
+    signal = np.array([1, 0, 0, 0, 0])
+
+    trades = execution.find_trades(prices, signal, 0, stop_loss_pct=10, take_profit_pct=50)
+
+    assert trades == [(0, 'buy', 'signal', 100.0), (3, 'sell', 'trailing_stop', pytest.approx(104.5))]
+    assert execution.check_exit(109, 109, 104, 100, 110, 10, 50) == ('trailing_stop', pytest.approx(104.5))
+    # Below the fixed stop the trailing one never applies
+    assert execution.stop_level(100, 101, 2) == (98.0, 'stop_loss')
+
+
+def test_gap_through_the_stop_fills_at_the_open():
+    execution = ExecutionModel(slippage_pct=1)
+    prices = bars(Open=[100, 95], High=[100, 96], Low=[100, 94], Close=[100, 95])
+
+    trades = execution.find_trades(prices, np.array([1, 0]), 0, stop_loss_pct=2, take_profit_pct=5)
+
+    assert trades == [(0, 'buy', 'signal', pytest.approx(101.0)),
+                      (1, 'sell', 'stop_loss', pytest.approx(95 * 0.99))]
+
+
+def test_fees_are_charged_on_both_sides_of_every_trade():
+    fee_pct = 0.25
+    result, trades = run(DATA, 'vectorized', ExecutionModel(trailing_stop_pct=1, fee_pct=fee_pct))
+    assert any(trade['reason'] == 'trailing_stop' for trade in trades)
+
+    cash = result['initial_value']
+    for trade in trades:
+        if trade['type'] == 'buy':
+            # The fee comes out of the cash the position is bought with
+            assert trade['amount'] + trade['fee'] == pytest.approx(cash, abs=0.02)
+            assert trade['fee'] == pytest.approx(trade['amount'] * fee_pct / 100, abs=0.01)
+        else:
+            assert trade['fee'] == pytest.approx(trade['amount'] * fee_pct / 100, abs=0.01)
+            cash = trade['amount'] - trade['fee']
+    assert result['fees'] == pytest.approx(sum(trade['fee'] for trade in trades), abs=0.05)
+    if trades[-1]['type'] == 'sell':
+        assert result['cash'] == pytest.approx(cash, abs=0.02)
+
+
+def test_fees_lower_the_return():
+    free, _ = run(DATA, 'vectorized', ExecutionModel())
+    charged, _ = run(DATA, 'vectorized', ExecutionModel(fee_pct=0.5))
+    assert free['n_trades'] == charged['n_trades']
+    assert charged['final_value'] < free['final_value']
+
+
+@pytest.mark.parametrize('value, intrabar', [('false', False), ('0', False), ('', False), ('off', False),
+                                             ('true', True), ('1', True), ('on', True)])
+def test_backtest_route_parses_intrabar(client, monkeypatch, value, intrabar):
+    monkeypatch.setattr(routes, 'fetch_historical_data', lambda symbol, days, interval: DATA)
+    result = client.post('/backtest', data={'ticker': 'BTC-USD', 'intrabar': value}).get_json()
+
+    assert ('fees' in result) == intrabar
+    strategy = strategy_registry.instance('sma_cross')
+    expected = Backtester(strategy, execution=ExecutionModel() if intrabar else None).run(DATA)
+    assert result['final_value'] == expected['final_value']
+
+
+def test_backtest_route_rejects_bad_execution_options(client, monkeypatch):
+    monkeypatch.setattr(routes, 'fetch_historical_data', lambda symbol, days, interval: DATA)
+    response = client.post('/backtest', data={'ticker': 'BTC-USD', 'trailing_stop': '-1'})
+    assert response.status_code == 400
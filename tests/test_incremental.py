@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from tradando.benchmarks.synthetic import gbm_ohlcv
+from tradando.services.backtest import Backtester
+from tradando.services.live import LiveTrader
+from tradando.strategies.registry import strategy_registry
+
+STRATEGIES = ['sma_cross', 'rsi', 'macd']
+
+
+def bars(seed):
+    data = gbm_ohlcv(1500, seed=seed, start_price=20)
+    # Odd seeds get rounded prices, full of ties between indicators
+    return data.round(1) if seed % 2 else data
+
+
+def replay(strategy, data):
+    strategy.reset()
+    return np.array([strategy.on_bar(bar) for bar in data.to_dict('records')], dtype=np.int8)
+
+
+@pytest.mark.parametrize('name', STRATEGIES)
+@pytest.mark.parametrize('seed', range(20))
+def test_on_bar_matches_batch_signals(name, seed):
+    data = bars(seed)
+    strategy = strategy_registry.create(name)
+    np.testing.assert_array_equal(replay(strategy, data), strategy.signal_array(data['Close']))
+
+
+@pytest.mark.parametrize('name', STRATEGIES)
+def test_on_bar_matches_batch_signals_with_missing_closes(name):
+    data = bars(1)
+    data.iloc[[300, 301, 900], data.columns.get_loc('Close')] = np.nan
+    strategy = strategy_registry.create(name)
+    np.testing.assert_array_equal(replay(strategy, data), strategy.signal_array(data['Close']))
+
+
+@pytest.mark.parametrize('name', STRATEGIES)
+def test_live_trader_matches_backtest(name):
+    data = bars(3)
+    trader = LiveTrader(strategy_registry.create(name, stop_loss_pct=1, take_profit_pct=1))
+    # Fed in overlapping fetches, the way /update polls
+    for end in range(200, len(data) + 1, 137):
+        trader.feed(data.iloc[max(0, end - 400):end])
+    trader.feed(data)
+
+    # The last bar may still be forming and is not consumed
+    expected = Backtester(strategy_registry.create(name, stop_loss_pct=1, take_profit_pct=1)).run(data.iloc[:-1])
+    assert trader.portfolio.trades.to_dicts() == expected['trades'].to_dicts()
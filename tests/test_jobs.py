@@ -0,0 +1,112 @@
+import json
+import sqlite3
+import threading
+import time
+import pytest
+from tradando.benchmarks.synthetic import gbm_ohlcv
+from tradando.services import analysis, jobs
+from tradando.services.jobs import JobQueue, request_hash
+
+DATA = {'BTC-USD': gbm_ohlcv(1200, seed=31), 'ETH-USD': gbm_ohlcv(1200, seed=32, start_price=50.0)}
+PAYLOAD = {'tickers': ['BTC-USD', 'ETH-USD'], 'strategies': ['sma_cross', 'rsi']}
+
+
+class Feed:
+    """Serves DATA to run_backtests, holding every fetch until `gate` opens"""
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.gate.set()
+        self.calls = 0
+
+    def __call__(self, symbols, days, interval='5m'):
+        self.calls += 1
+        assert self.gate.wait(10)
+        return {symbol: DATA[symbol] for symbol in symbols if symbol in DATA}
+
+
+@pytest.fixture
+def feed(monkeypatch):
+    feed = Feed()
+    monkeypatch.setattr(analysis, 'prefetch_historical_data', feed)
+    yield feed
+    feed.gate.set()
+
+
+@pytest.fixture
+def path(tmp_path, monkeypatch):
+    path = str(tmp_path / 'jobs.sqlite3')
+    monkeypatch.setattr(jobs, '_queue', JobQueue(path, workers=1))
+    return path
+
+
+def wait_for(client, job_id, statuses):
+    deadline = time.monotonic() + 10
+    while True:
+        job = client.get(f'/analyze/jobs/{job_id}').get_json()
+        if job['status'] in statuses or time.monotonic() > deadline:
+            return job
+        time.sleep(0.01)
+
+
+def test_jobs_run_in_the_background_and_deduplicate(client, feed, path):
+    feed.gate.clear()
+    submitted = client.post('/analyze/jobs', json=PAYLOAD)
+    assert submitted.status_code == 202
+    job_id = submitted.get_json()['job_id']
+
+    running = wait_for(client, job_id, ['running'])
+    assert running['status'] == 'running' and running['progress'] == {'done': 0, 'total': 2}
+    assert running['results'] == [] and 'summary' not in running
+    # The same request while it is in flight joins it
+    assert client.post('/analyze/jobs', json=PAYLOAD).get_json() == {'job_id': job_id, 'deduplicated': True}
+
+    feed.gate.set()
+    done = wait_for(client, job_id, ['done', 'failed'])
+    assert done['status'] == 'done' and done['progress'] == {'done': 2, 'total': 2}
+    assert len(done['results']) == 4 and 'summary' in done
+    returns = [result['return_pct'] for result in done['results']]
+    assert returns == sorted(returns, reverse=True)
+    assert 'results' not in client.get(f'/analyze/jobs/{job_id}?results=0').get_json()
+
+    # Finished jobs are not joined: the request runs again
+    again = client.post('/analyze/jobs', json=PAYLOAD).get_json()
+    assert not again['deduplicated'] and again['job_id'] != job_id
+    assert wait_for(client, again['job_id'], ['done', 'failed'])['status'] == 'done'
+
+
+@pytest.mark.parametrize('payload, error', [
+    ({'tickers': ['NOPE']}, 'No data available'),
+    ({'tickers': ['BTC-USD'], 'stop_loss': 'tight'}, 'could not convert'),
+])
+def test_failures_are_recorded(client, feed, path, payload, error):
+    job_id = client.post('/analyze/jobs', json=payload).get_json()['job_id']
+    job = wait_for(client, job_id, ['done', 'failed'])
+
+    assert job['status'] == 'failed' and error in job['error']
+
+
+def test_unknown_jobs_and_empty_requests(client, path):
+    assert client.get('/analyze/jobs/nope').status_code == 404
+    assert client.post('/analyze/jobs', json={'tickers': []}).status_code == 400
+
+
+def test_a_restart_reruns_interrupted_jobs_and_keeps_finished_ones(client, feed, path, monkeypatch):
+    # A job the previous process was running when it died, with one ticker's results recorded
+    db = sqlite3.connect(path)
+    db.execute("INSERT INTO jobs (id, request_hash, payload, status, done, total, created_at, updated_at) "
+               "VALUES ('interrupted', ?, ?, 'running', 1, 2, 0, 0)", (request_hash(PAYLOAD), json.dumps(PAYLOAD)))
+    db.execute("INSERT INTO job_results (job_id, position, results) VALUES ('interrupted', 0, ?)",
+               (json.dumps([{'symbol': 'BTC-USD', 'return_pct': 999.0}]),))
+    db.commit()
+    db.close()
+
+    monkeypatch.setattr(jobs, '_queue', JobQueue(path, workers=1))
+    job = wait_for(client, 'interrupted', ['done', 'failed'])
+    assert job['status'] == 'done' and job['progress'] == {'done': 2, 'total': 2}
+    assert len(job['results']) == 4 and 999.0 not in [result['return_pct'] for result in job['results']]
+
+    calls = feed.calls
+    monkeypatch.setattr(jobs, '_queue', JobQueue(path, workers=1))
+    assert client.get('/analyze/jobs/interrupted').get_json()['results'] == job['results']
+    assert feed.calls == calls
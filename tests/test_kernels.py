@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+import pytest
+from tradando.benchmarks.synthetic import gbm_ohlcv
+from tradando.services import kernels
+from tradando.strategies.registry import strategy_registry
+
+SEEDS = range(8)
+
+
+def closes(seed, decimals=1):
+    # Rounded prices repeat, so indicators tie and RSI lands exactly on its thresholds
+    return gbm_ohlcv(2000, seed=seed, start_price=20)['Close'].round(decimals)
+
+
+# The pandas expressions the strategies computed before the kernels
+
+def sma_cross_signals(close, fast=20, slow=50):
+    fast, slow = close.rolling(window=fast).mean(), close.rolling(window=slow).mean()
+    signal = pd.Series(0, index=close.index)
+    signal[fast > slow] = 1
+    signal[fast < slow] = -1
+    return signal.to_numpy()
+
+
+def rsi_signals(close, period=14, overbought=70, oversold=30):
+    delta = close.diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+    rsi = 100 - (100 / (1 + gain / loss))
+    signal = pd.Series(0, index=close.index)
+    signal[rsi < oversold] = 1
+    signal[rsi > overbought] = -1
+    return signal.to_numpy()
+
+
+def macd_signals(close, fast=12, slow=26, signal_period=9):
+    macd = close.ewm(span=fast, adjust=False).mean() - close.ewm(span=slow, adjust=False).mean()
+    line = macd.ewm(span=signal_period, adjust=False).mean()
+    signal = pd.Series(0, index=close.index)
+    signal[(macd > line) & (macd.shift(1) <= line.shift(1))] = 1
+    signal[(macd < line) & (macd.shift(1) >= line.shift(1))] = -1
+    return signal.to_numpy()
+
+
+REFERENCES = {'sma_cross': sma_cross_signals, 'rsi': rsi_signals, 'macd': macd_signals}
+
+
+@pytest.mark.parametrize('name', REFERENCES)
+@pytest.mark.parametrize('seed', SEEDS)
+def test_signals_match_pandas_on_rounded_prices(name, seed):
+    close = closes(seed)
+    expected = REFERENCES[name](close)
+    strategy = strategy_registry.create(name)
+
+    np.testing.assert_array_equal(strategy.generate_signals(close.to_frame())['signal'].to_numpy(), expected)
+    np.testing.assert_array_equal(strategy.signal_array(close), expected)
+
+
+@pytest.mark.parametrize('name', REFERENCES)
+def test_signal_matrix_matches_each_row(name):
+    paths = np.stack([closes(seed).to_numpy() for seed in SEEDS])
+    expected = np.stack([REFERENCES[name](pd.Series(path)) for path in paths])
+    np.testing.assert_array_equal(strategy_registry.create(name).signal_matrix(paths), expected)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_indicators_are_bitwise_pandas(seed):
+    close = closes(seed, decimals=2)
+    x = close.to_numpy()
+    for window in (1, 14, 50):
+        np.testing.assert_array_equal(kernels.rolling_mean(x, window), close.rolling(window).mean().to_numpy())
+    for span in (9, 26):
+        np.testing.assert_array_equal(kernels.ema(x, span), close.ewm(span=span, adjust=False).mean().to_numpy())
+
+
+def test_missing_values_follow_pandas():
+    close = closes(0)
+    close.iloc[[100, 101, 500]] = np.nan
+    x = close.to_numpy()
+    np.testing.assert_array_equal(kernels.rolling_mean(x, 20), close.rolling(20).mean().to_numpy())
+    np.testing.assert_array_equal(kernels.ema(x, 12), close.ewm(span=12, adjust=False).mean().to_numpy())
+
+
+def test_preallocated_output_is_filled_in_place():
+    x = closes(1).to_numpy()
+    out = np.empty_like(x)
+    assert kernels.rolling_mean(x, 10, out=out) is out
+    with pytest.raises(ValueError):
+        kernels.ema(x, 10, out=np.empty(3))
+
+
+def test_batches_are_bitwise_pandas_row_by_row():
+    rows = np.stack([closes(seed, decimals=2).to_numpy() for seed in SEEDS])
+    rows[1, [0, 40, 41, 300]] = np.nan
+    rows[2] -= rows[2].mean()  # windows of both signs around zero
+    rows[3, 500:700] = rows[3, 500]  # a run of one value
+    for window in (1, 14, 50):
+        expected = np.stack([pd.Series(row).rolling(window).mean().to_numpy() for row in rows])
+        np.testing.assert_array_equal(kernels.rolling_mean(rows, window), expected)
+    for span in (9, 26):
+        expected = np.stack([pd.Series(row).ewm(span=span, adjust=False).mean().to_numpy() for row in rows])
+        np.testing.assert_array_equal(kernels.ema(rows, span), expected)
+
+
+def test_batches_are_written_into_the_output():
+    rows = np.stack([closes(seed).to_numpy() for seed in SEEDS[:3]])
+    out = np.empty_like(rows)
+    assert kernels.ema(rows, 12, out=out) is out
+    # A non-contiguous output still receives every value
+    strided = np.empty((rows.shape[0], rows.shape[1] * 2))[:, ::2]
+    kernels.rolling_mean(rows, 20, out=strided)
+    np.testing.assert_array_equal(strided, kernels.rolling_mean(rows, 20))
@@ -0,0 +1,71 @@
+import pytest
+from tradando import routes
+from tradando.benchmarks.synthetic import gbm_ohlcv
+from tradando.services.metrics import DEFAULT_BUCKETS, MetricsRegistry, metrics
+from tradando.services.result_cache import ResultCache
+
+DATA = gbm_ohlcv(1500, seed=23)
+BACKTEST_LABELS = 'mode="vectorized",strategy="SMACrossStrategy"'
+
+
+@pytest.fixture(autouse=True)
+def fresh(monkeypatch):
+    metrics.clear()
+    monkeypatch.setattr(routes, 'result_cache', ResultCache(1024 * 1024))
+    monkeypatch.setattr(routes, 'fetch_historical_data', lambda symbol, days, interval: DATA)
+    yield
+    metrics.clear()
+
+
+def scrape(client, name):
+    """Sample lines of one metric from /metrics, as {name and labels: value}"""
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain; version=0.0.4')
+    text = response.get_data(as_text=True)
+    assert f"# TYPE {name} histogram" in text
+    samples = dict(line.rsplit(' ', 1) for line in text.splitlines() if line.startswith(name + '_'))
+    return {key: float(value) for key, value in samples.items()}
+
+
+def test_histogram_lines_render_in_prometheus_format():
+    registry = MetricsRegistry()
+    for seconds in (0.003, 0.2, 7):
+        registry.observe('tradando_backtest_seconds', seconds, strategy='X', mode='loop')
+
+    lines = registry.render().splitlines()
+    assert lines[:2] == ['# HELP tradando_backtest_seconds Backtester.run latency by strategy and mode',
+                         '# TYPE tradando_backtest_seconds histogram']
+    assert lines[2:5] == ['tradando_backtest_seconds_bucket{mode="loop",strategy="X",le="0.001"} 0',
+                          'tradando_backtest_seconds_bucket{mode="loop",strategy="X",le="0.0025"} 0',
+                          'tradando_backtest_seconds_bucket{mode="loop",strategy="X",le="0.005"} 1']
+    assert 'tradando_backtest_seconds_bucket{mode="loop",strategy="X",le="0.25"} 2' in lines
+    assert 'tradando_backtest_seconds_bucket{mode="loop",strategy="X",le="10"} 3' in lines
+    assert lines[-3:] == ['tradando_backtest_seconds_bucket{mode="loop",strategy="X",le="+Inf"} 3',
+                          'tradando_backtest_seconds_sum{mode="loop",strategy="X"} 7.203',
+                          'tradando_backtest_seconds_count{mode="loop",strategy="X"} 3']
+
+
+def test_backtests_are_scraped_from_the_endpoint(client):
+    assert client.post('/backtest', data={'ticker': 'BTC-USD'}).status_code == 200
+    samples = scrape(client, 'tradando_backtest_seconds')
+
+    buckets = [samples[f'tradando_backtest_seconds_bucket{{{BACKTEST_LABELS},le="{bound}"}}']
+               for bound in list(DEFAULT_BUCKETS) + ['+Inf']]
+    total = samples[f'tradando_backtest_seconds_sum{{{BACKTEST_LABELS}}}']
+    assert buckets == sorted(buckets) and buckets[-1] == 1
+    assert samples[f'tradando_backtest_seconds_count{{{BACKTEST_LABELS}}}'] == 1
+    # The one run lands in the first bucket its duration fits
+    first = buckets.index(1)
+    assert 0 < total <= DEFAULT_BUCKETS[first]
+    assert first == 0 or total > DEFAULT_BUCKETS[first - 1]
+
+
+def test_cached_results_are_not_timed_again(client):
+    for _ in range(2):
+        assert client.post('/backtest', data={'ticker': 'BTC-USD'}).status_code == 200
+
+    samples = scrape(client, 'tradando_backtest_seconds')
+    assert samples[f'tradando_backtest_seconds_count{{{BACKTEST_LABELS}}}'] == 1
+    requests = scrape(client, 'tradando_request_seconds')
+    assert requests['tradando_request_seconds_count{method="POST",route="/backtest",status="200"}'] == 2
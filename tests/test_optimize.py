@@ -0,0 +1,63 @@
+import pytest
+from tradando import routes
+from tradando.benchmarks.synthetic import gbm_ohlcv
+from tradando.services.backtest import Backtester
+from tradando.services.optimize import run_sweep
+from tradando.strategies.registry import strategy_registry
+
+DATA = gbm_ohlcv(1500, seed=5)
+
+
+def test_sweep_ranks_results_like_single_backtests():
+    result = run_sweep(DATA, 'sma_cross', {'fast_period': [5, 10, 30], 'slow_period': [20, 40]},
+                       [1, 2], {'start': 1.0, 'stop': 2.0, 'step': 0.5})
+
+    # fast 30 / slow 20 is not a valid crossover and is left out
+    assert result['n_combinations'] == 5 * 2 * 3
+    returns = [r['return_pct'] for r in result['results']]
+    assert returns == sorted(returns, reverse=True)
+
+    for row in result['results'][:5]:
+        strategy = strategy_registry.create('sma_cross', stop_loss_pct=row['stop_loss_pct'],
+                                            take_profit_pct=row['take_profit_pct'], **row['params'])
+        single = Backtester(strategy).run(DATA)
+        assert (row['return_pct'], row['n_trades']) == (single['return_pct'], single['n_trades'])
+
+
+def test_sweep_keeps_the_top_results():
+    grid = {'fast_period': [5, 10]}
+    every = run_sweep(DATA, 'sma_cross', grid, [1, 2], [1])['results']
+    assert run_sweep(DATA, 'sma_cross', grid, [1, 2], [1], top=3)['results'] == every[:3]
+    for top in (0, -1, 1.5, True):
+        with pytest.raises(ValueError, match='top must be a positive integer'):
+            run_sweep(DATA, 'sma_cross', grid, [1, 2], [1], top=top)
+
+
+def test_sweep_rejects_unknown_parameters():
+    with pytest.raises(ValueError, match='slowest'):
+        run_sweep(DATA, 'sma_cross', {'slowest': [10]}, [1], [1])
+
+
+def test_optimize_coerces_exit_levels(client, monkeypatch):
+    monkeypatch.setattr(routes, 'fetch_historical_data', lambda symbol, days, interval: DATA)
+    response = client.post('/optimize', json={'symbol': 'BTC-USD', 'stop_loss': '2', 'take_profit': ['1', 3],
+                                              'params': {'fast_period': [5, 10]}})
+
+    assert response.status_code == 200
+    assert {(r['stop_loss_pct'], r['take_profit_pct']) for r in response.get_json()['results']} == {(2.0, 1.0),
+                                                                                                   (2.0, 3.0)}
+
+
+@pytest.mark.parametrize('payload', [
+    {'stop_loss': 'two'},
+    {'take_profit': {'start': '1', 'stop': 2}},
+    {'params': {'fast': [5]}},
+    {'top': 0},
+    {'top': -3},
+    {'top': 2.5},
+    {'top': 'ten'},
+])
+def test_optimize_rejects_bad_input(client, monkeypatch, payload):
+    monkeypatch.setattr(routes, 'fetch_historical_data', lambda symbol, days, interval: DATA)
+    response = client.post('/optimize', json={'symbol': 'BTC-USD', **payload})
+    assert response.status_code == 400
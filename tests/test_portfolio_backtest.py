@@ -0,0 +1,68 @@
+import pandas as pd
+import pytest
+from tradando.benchmarks.synthetic import gbm_ohlcv
+from tradando.services.backtest import Backtester
+from tradando.services.portfolio_backtest import PortfolioBacktester
+from tradando.strategies.base import TradingStrategy
+from tradando.strategies.registry import strategy_registry
+
+INDEX = pd.date_range('2024-01-01', periods=5, freq='5min', tz='UTC')
+# A swings twice as hard as B before both signal a buy on bar 3, then both gain and sell on bar 4
+DATA = {
+    'A': pd.DataFrame({'Close': [100, 100, 110, 99, 108.9]}, index=INDEX),
+    'B': pd.DataFrame({'Close': [100, 100, 105, 99.75, 104.7375]}, index=INDEX),
+}
+
+
+class Scripted(TradingStrategy):
+    """Trades the same fixed signals on every symbol, from the first bar"""
+    fast_period = slow_period = 0
+
+    def __init__(self, signal):
+        super().__init__(stop_loss_pct=50, take_profit_pct=50)
+        self.signal = signal
+
+    def generate_signals(self, data):
+        return data.assign(signal=self.signal)
+
+
+def run(**kwargs):
+    result = PortfolioBacktester(Scripted([0, 0, 0, 1, -1]), lookback=2, **kwargs).run(DATA)
+    amounts = {row['symbol']: [trade['amount'] for trade in row['trades'].to_dicts()] for row in result['symbols']}
+    return result, amounts
+
+
+def test_equal_weights_split_the_equity_evenly():
+    result, amounts = run(max_positions=2)
+
+    assert amounts == {'A': [5000, pytest.approx(5500)], 'B': [5000, pytest.approx(5250)]}
+    assert result['final_value'] == 10750
+
+
+def test_inverse_volatility_weights_the_calmer_symbol_up():
+    # Volatility over the last two returns: A 0.1 * sqrt(2), B half that, so B gets twice A's share
+    result, amounts = run(max_positions=2, allocation='inverse_volatility')
+
+    # The ledger keeps cents
+    assert amounts == {'A': [3333.33, 3666.67], 'B': [6666.67, pytest.approx(7000)]}
+    assert result['final_value'] == 10666.67
+
+
+def test_the_stronger_momentum_takes_the_last_slot():
+    # Over two bars A fell 1% and B 0.25%
+    result, amounts = run(max_positions=1)
+
+    assert amounts == {'A': [], 'B': [10000, pytest.approx(10500)]}
+    assert result['final_value'] == 10500
+
+
+@pytest.mark.parametrize('allocation', PortfolioBacktester.ALLOCATIONS)
+def test_a_single_symbol_trades_like_the_backtester(allocation):
+    data = gbm_ohlcv(3000, seed=13)
+    strategy = strategy_registry.create('sma_cross', stop_loss_pct=2, take_profit_pct=3)
+
+    portfolio = PortfolioBacktester(strategy, max_positions=1, allocation=allocation).run({'X': data})
+    single = Backtester(strategy).run(data)
+
+    assert portfolio['n_trades'] == single['n_trades']
+    assert portfolio['final_value'] == pytest.approx(single['final_value'], abs=0.01)
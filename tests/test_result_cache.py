@@ -0,0 +1,113 @@
+import pickle
+import pytest
+from tradando import routes
+from tradando.benchmarks.synthetic import gbm_ohlcv
+from tradando.services import analysis
+from tradando.services.execution import ExecutionModel
+from tradando.services.result_cache import ResultCache, result_key
+from tradando.strategies.registry import strategy_registry
+
+DATA = gbm_ohlcv(1500, seed=41)
+
+
+def entry(i, size=1000):
+    # Roughly `size` pickled bytes
+    return {'i': i, 'padding': 'x' * size}
+
+
+def pickled_size(result):
+    return len(pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = ResultCache(1024 * 1024)
+    monkeypatch.setattr(routes, 'result_cache', cache)
+    monkeypatch.setattr(analysis, 'result_cache', cache)
+    monkeypatch.setattr(routes, 'fetch_historical_data', lambda symbol, days, interval: DATA)
+    monkeypatch.setattr(analysis, 'prefetch_historical_data',
+                        lambda symbols, days, interval='5m': {symbol: DATA for symbol in symbols})
+    return cache
+
+
+def test_least_recently_used_entries_are_evicted_first():
+    cache = ResultCache(3 * pickled_size(entry(0)))
+    for i in range(3):
+        cache.put(str(i), entry(i))
+    assert cache.get('0')['i'] == 0  # now the most recent
+    cache.put('3', entry(3))
+
+    assert '1' not in cache and cache.get('1') is None
+    assert [cache.get(key)['i'] for key in ('0', '2', '3')] == [0, 2, 3]
+    assert cache.nbytes == sum(pickled_size(entry(i)) for i in (0, 2, 3)) <= cache.max_bytes
+
+
+def test_entries_larger_than_the_cache_are_not_kept():
+    cache = ResultCache(pickled_size(entry(0)))
+    cache.put('small', entry(0))
+    cache.put('large', entry(1, size=5000))
+
+    assert 'large' not in cache and cache.get('small')['i'] == 0
+    assert len(cache) == 1
+
+
+def test_evicted_entries_come_back_from_disk(tmp_path):
+    cache = ResultCache(pickled_size(entry(0)), str(tmp_path))
+    cache.put('a', entry(0))
+    cache.put('b', entry(1))
+
+    # Only 'b' fits in memory, but both are on disk
+    assert len(cache) == 1 and 'a' in cache
+    assert cache.get('a') == entry(0) and cache.get('b') == entry(1)
+    assert len(cache) == 1
+
+
+def test_get_hands_out_copies():
+    cache = ResultCache(1024 * 1024)
+    cache.put('a', entry(0))
+    cache.get('a')['extra'] = True
+    assert 'extra' not in cache.get('a')
+
+
+def test_keys_change_with_every_setting():
+    strategy = strategy_registry.create('sma_cross')
+    key = result_key(DATA, strategy)
+
+    assert result_key(DATA.copy(), strategy_registry.create('sma_cross')) == key
+    assert len({key,
+                result_key(DATA.iloc[1:], strategy),
+                result_key(DATA, strategy_registry.create('sma_cross', fast_period=12)),
+                result_key(DATA, strategy_registry.create('sma_cross', stop_loss_pct=2)),
+                result_key(DATA, strategy, mode='loop'),
+                result_key(DATA, strategy, execution=ExecutionModel(fee_pct=0.1)),
+                result_key(DATA, strategy, initial_value=500)}) == 7
+
+
+def test_backtest_revalidation_is_not_modified(client, cache):
+    first = client.post('/backtest', data={'ticker': 'BTC-USD'})
+    etag = first.headers['ETag']
+    again = client.post('/backtest', data={'ticker': 'BTC-USD'}, headers={'If-None-Match': etag})
+
+    assert first.status_code == 200 and first.headers['Cache-Control'] == 'no-cache'
+    assert again.status_code == 304 and again.get_data() == b''
+    assert again.headers['ETag'] == etag
+    assert len(cache) == 1
+
+
+def test_changed_parameters_miss_the_cache(client, cache):
+    etag = client.post('/backtest', data={'ticker': 'BTC-USD'}).headers['ETag']
+    changed = client.post('/backtest', data={'ticker': 'BTC-USD', 'fee': '0.1'}, headers={'If-None-Match': etag})
+
+    assert changed.status_code == 200 and 'fees' in changed.get_json()
+    assert changed.headers['ETag'] != etag
+    assert len(cache) == 2
+
+
+def test_analyze_revalidation_is_not_modified(client, cache):
+    payload = {'tickers': ['BTC-USD'], 'strategies': ['sma_cross', 'rsi']}
+    etag = client.post('/analyze', json=payload).headers['ETag']
+    again = client.post('/analyze', json=payload, headers={'If-None-Match': etag})
+    other = client.post('/analyze', json={**payload, 'stop_loss': 2}, headers={'If-None-Match': etag})
+
+    assert again.status_code == 304 and again.get_data() == b''
+    assert other.status_code == 200 and other.headers['ETag'] != etag
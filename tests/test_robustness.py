@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+from tradando import routes
+from tradando.benchmarks.synthetic import gbm_ohlcv
+from tradando.config import Config
+from tradando.services.backtest import Backtester
+from tradando.services.robustness import resample_paths, run_robustness, simulate
+from tradando.strategies.registry import strategy_registry
+
+DATA = gbm_ohlcv(1500, seed=21)
+CLOSE = DATA['Close'].to_numpy(dtype=float)
+
+
+@pytest.mark.parametrize('name', ['sma_cross', 'rsi', 'macd'])
+def test_simulating_the_observed_path_matches_the_backtester(name):
+    strategy = strategy_registry.create(name, stop_loss_pct=1, take_profit_pct=1.5)
+    paths = CLOSE[None, :]
+    start_index = Backtester(strategy).start_index()
+    simulated = simulate(paths, strategy.signal_matrix(paths), start_index,
+                         strategy.stop_loss_pct, strategy.take_profit_pct, Config.INITIAL_CASH)
+    expected = Backtester(strategy, mode='loop').run(DATA, initial_value=Config.INITIAL_CASH)
+
+    assert round(float(simulated['return_pct'][0]), 2) == expected['return_pct']
+    assert int(simulated['n_trades'][0]) == expected['n_trades']
+
+
+@pytest.mark.parametrize('method', ['bootstrap', 'block'])
+def test_paths_start_at_the_first_close_and_reuse_observed_returns(method):
+    paths = resample_paths(CLOSE, 50, method, block_bars=10, rng=np.random.default_rng(0))
+
+    assert paths.shape == (50, len(CLOSE))
+    np.testing.assert_allclose(paths[:, 0], CLOSE[0])
+    observed = np.diff(np.log(CLOSE))
+    drawn = np.diff(np.log(paths), axis=1)
+    # Every resampled return is one of the observed ones
+    assert np.isin(np.round(drawn, 9), np.round(observed, 9)).all()
+
+
+def test_a_block_as_long_as_the_history_rotates_its_returns():
+    paths = resample_paths(CLOSE, 5, 'block', block_bars=len(CLOSE), rng=np.random.default_rng(1))
+    observed = np.diff(np.log(CLOSE))
+    for path in paths:
+        drawn = np.diff(np.log(path))
+        shift = int(np.argmin(np.abs(observed - drawn[0])))
+        np.testing.assert_allclose(drawn, np.roll(observed, -shift), atol=1e-9)
+
+
+def test_seeded_runs_repeat():
+    strategy = strategy_registry.create('sma_cross')
+    first = run_robustness(strategy, DATA, n_paths=40, seed=7)
+
+    assert run_robustness(strategy, DATA, n_paths=40, seed=7) == first
+    assert run_robustness(strategy, DATA, n_paths=40, seed=8)['return_pct'] != first['return_pct']
+    assert first['n_paths'] == 40 and first['n_bars'] == len(DATA)
+
+
+@pytest.mark.parametrize('kwargs, message', [
+    ({'method': 'shuffle'}, 'Unknown resampling method'),
+    ({'n_paths': 0}, 'n_paths must be positive'),
+    ({'n_paths': Config.ROBUSTNESS_MAX_CELLS}, 'Too many simulated bars'),
+])
+def test_invalid_requests_are_rejected(kwargs, message):
+    with pytest.raises(ValueError, match=message):
+        run_robustness(strategy_registry.create('sma_cross'), DATA, **kwargs)
+
+
+def test_invalid_closes_are_rejected():
+    with pytest.raises(ValueError, match='two closes'):
+        resample_paths(CLOSE[:1], 10)
+    with pytest.raises(ValueError, match='positive and finite'):
+        resample_paths(np.r_[CLOSE[:10], np.nan], 10)
+
+
+def test_custom_exits_are_rejected():
+    class NeverExit(type(strategy_registry.create('sma_cross'))):
+        def check_exit_conditions(self, current_price, entry_price):
+            return {'exit': False}
+
+    with pytest.raises(ValueError, match='default stop loss'):
+        run_robustness(NeverExit(), DATA, n_paths=10)
+
+
+def test_route_reports_bad_parameters(client, monkeypatch):
+    monkeypatch.setattr(routes, 'fetch_historical_data', lambda symbol, days, interval: DATA)
+    ok = client.post('/robustness', json={'symbol': 'BTC-USD', 'n_paths': 20, 'seed': 3})
+    bad = client.post('/robustness', json={'symbol': 'BTC-USD', 'method': 'shuffle'})
+
+    assert ok.status_code == 200 and ok.get_json()['seed'] == 3
+    assert bad.status_code == 400
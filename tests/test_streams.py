@@ -0,0 +1,117 @@
+import json
+from collections import OrderedDict
+from functools import partial
+import pytest
+from tradando.benchmarks.synthetic import gbm_ohlcv
+from tradando.config import Config
+from tradando.services import live, streams
+from tradando.services.live import get_live_trader
+from tradando.services.streams import SymbolStream, get_symbol_stream
+from tradando.strategies.registry import strategy_registry
+
+DATA = gbm_ohlcv(800, seed=9)
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch):
+    monkeypatch.setattr(live, '_traders', OrderedDict())
+    monkeypatch.setattr(streams, '_streams', OrderedDict())
+    monkeypatch.setattr(streams, 'get_strategy_description', lambda strategy: 'description')
+
+
+def shared_trader(symbol):
+    """Looks up the symbol's trader in the shared LRU, as the /stream route does"""
+    return partial(get_live_trader, symbol,
+                   partial(strategy_registry.create, 'sma_cross', stop_loss_pct=0.5, take_profit_pct=0.5))
+
+
+class Feed:
+    """Serves DATA up to a movable bar count"""
+
+    def __init__(self, n):
+        self.n = n
+
+    def __call__(self, symbol):
+        return DATA.iloc[:self.n]
+
+
+def drain(subscription):
+    events = []
+    while not subscription.queue.empty():
+        _, text = subscription.queue.get_nowait()
+        fields = dict(line.split(': ', 1) for line in text.strip().splitlines())
+        events.append((fields['event'], json.loads(fields['data'])))
+    return events
+
+
+def test_poll_publishes_deltas_with_matching_timestamps():
+    feed = Feed(300)
+    stream = SymbolStream('BTC-USD', shared_trader('BTC-USD'), fetch=feed, poll_seconds=3600, queue_size=1000)
+    subscription = stream.subscribe()
+    [(name, snapshot)] = drain(subscription)
+    assert name == 'snapshot' and 'trades' in snapshot
+
+    feed.n = 800
+    stream.poll()
+    events = drain(subscription)
+    stream.unsubscribe(subscription)
+
+    bars = {data['timestamp'] for name, data in events if name == 'bar'}
+    trades = [data for name, data in events if name == 'trade']
+    (portfolio,) = [data for name, data in events if name == 'portfolio']
+    assert len(bars) == 500 and trades
+    # Trades are stamped like the bars they were made on
+    assert {trade['timestamp'] for trade in trades} <= bars
+    assert 'trades' not in portfolio
+    assert len(trades) == len(stream.trader.portfolio.trades) - len(snapshot['trades'])
+
+
+def test_live_traders_are_capped(monkeypatch):
+    monkeypatch.setattr(Config, 'LIVE_TRADER_ENTRIES', 2)
+    first = get_live_trader('A', lambda: strategy_registry.create('sma_cross'))
+    get_live_trader('B', lambda: strategy_registry.create('sma_cross'))
+    assert get_live_trader('A', None) is first  # refreshes A, so B is the oldest
+    get_live_trader('C', lambda: strategy_registry.create('sma_cross'))
+
+    assert list(live._traders) == ['A', 'C']
+
+
+def test_only_idle_streams_are_evicted(monkeypatch):
+    monkeypatch.setattr(Config, 'STREAM_ENTRIES', 1)
+    busy = get_symbol_stream('A', shared_trader('A'))
+    busy.fetch, busy.poll_seconds = Feed(300), 3600
+    subscription = busy.subscribe()
+    get_symbol_stream('B', shared_trader('B'))
+    get_symbol_stream('C', shared_trader('C'))
+
+    assert list(streams._streams) == ['A', 'C']
+    busy.unsubscribe(subscription)
+    get_symbol_stream('D', shared_trader('D'))
+    assert list(streams._streams) == ['D']
+
+
+def test_streams_follow_a_replaced_trader(monkeypatch):
+    monkeypatch.setattr(Config, 'LIVE_TRADER_ENTRIES', 1)
+    feed = Feed(300)
+    stream = SymbolStream('A', shared_trader('A'), fetch=feed, poll_seconds=3600, queue_size=1000)
+    subscription = stream.subscribe()
+    drain(subscription)
+
+    # Another symbol evicts A's trader and /live_trade starts A over with a new one
+    shared_trader('B')()
+    replacement = shared_trader('A')()
+    feed.n = 400
+    stream.poll()
+    events = drain(subscription)
+    stream.unsubscribe(subscription)
+
+    assert stream.trader is replacement and replacement.n_bars == 399
+    [(name, snapshot)] = events
+    assert name == 'snapshot' and snapshot['trades'] == replacement.portfolio.trades.to_dicts()
+
+
+def test_clients_retry_quickly_however_slow_the_poll():
+    stream = SymbolStream('A', shared_trader('A'), fetch=Feed(300), poll_seconds=3600)
+    subscription = stream.subscribe()
+    assert next(stream.iter_events(subscription)) == f"retry: {Config.STREAM_RETRY_SECONDS * 1000}\n\n"
+    stream.unsubscribe(subscription)
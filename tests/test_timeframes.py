@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+from tradando.benchmarks.synthetic import gbm_ohlcv
+from tradando.services import timeframes
+from tradando.services.timeframes import TimeframeCache, resample_ohlcv, session_offset
+
+
+def session_bars(n_days=10, tz='America/New_York', open_time='09:30', close_time='16:00'):
+    """5m bars of a market trading from `open_time` to `close_time` on weekdays"""
+    sessions = [pd.date_range(f'{day.date()} {open_time}', f'{day.date()} {close_time}', freq='5min',
+                              inclusive='left', tz=tz)
+                for day in pd.bdate_range('2024-03-04', periods=n_days)]
+    index = sessions[0].append(sessions[1:])
+    bars = gbm_ohlcv(len(index), seed=2)
+    bars.index = index
+    return bars
+
+
+def around_the_clock(n=3000, start='2024-03-08 13:35', tz='UTC'):
+    bars = gbm_ohlcv(n, seed=1)
+    bars.index = pd.date_range(start, periods=n, freq='5min', tz='UTC').tz_convert(tz)
+    return bars
+
+
+def pandas_resample(bars, interval, offset=None):
+    rule = interval.replace('m', 'min')
+    how = {column: timeframes.AGGREGATIONS[column] for column in bars.columns}
+    return bars.resample(rule, offset=offset).agg(how).dropna(subset=['Open'])
+
+
+def assert_same(ours, expected):
+    pd.testing.assert_frame_equal(ours, expected[ours.columns], check_freq=False,
+                                  check_index_type=False, check_dtype=False)
+
+
+def test_intraday_bars_start_at_the_session_open():
+    bars = session_bars()
+    hourly = resample_ohlcv(bars, '1h')
+
+    assert session_offset(bars.index, '1h') == pd.Timedelta(minutes=30).value
+    assert set(hourly.index.strftime('%H:%M')) == {f'{hour:02d}:30' for hour in range(9, 16)}
+    assert_same(hourly, pandas_resample(bars, '1h', '30min'))
+    assert_same(resample_ohlcv(bars, '15m'), pandas_resample(bars, '15m'))
+
+
+def test_four_hour_bars_keep_their_session_times_across_dst():
+    # US clocks moved forward on 2024-03-10
+    four_hourly = resample_ohlcv(session_bars(), '4h')
+    assert set(four_hourly.index.strftime('%H:%M')) == {'09:30', '13:30'}
+
+
+def test_a_window_cutting_into_the_first_session_keeps_the_offset():
+    bars = session_bars(n_days=2).iloc[20:]
+    assert resample_ohlcv(bars, '1h').index[0].strftime('%H:%M') == '10:30'
+
+
+@pytest.mark.parametrize('interval', ['15m', '1h', '4h'])
+def test_around_the_clock_utc_bars_align_to_the_clock(interval):
+    bars = around_the_clock()
+    assert session_offset(bars.index, interval) == 0
+    assert_same(resample_ohlcv(bars, interval), pandas_resample(bars, interval))
+
+
+def test_dst_fall_back_keeps_both_one_oclock_hours_apart():
+    bars = around_the_clock(600, start='2024-11-02 20:00', tz='America/New_York')
+    hourly = resample_ohlcv(bars, '1h')
+
+    assert hourly.index.is_monotonic_increasing and hourly.index.is_unique
+    assert (hourly.index.strftime('%d %H:%M') == '03 01:00').sum() == 2
+    assert_same(hourly.tz_convert('UTC'), pandas_resample(bars.tz_convert('UTC'), '1h'))
+
+
+@pytest.mark.parametrize('bars', [session_bars(20), around_the_clock(), around_the_clock(tz='America/New_York')],
+                         ids=['session', 'utc', 'new-york'])
+def test_cache_extends_like_a_full_aggregation(bars):
+    rng = np.random.default_rng(0)
+    cache = TimeframeCache(8)
+    lo, hi = 0, 300
+    for _ in range(60):
+        lo, hi = lo + int(rng.integers(0, 30)), hi + int(rng.integers(0, 40))
+        window = bars.iloc[lo:hi].copy()
+        # The last bar is still forming
+        window.iloc[-1, window.columns.get_loc('Close')] *= 1 + rng.normal() * 0.001
+        for interval in ['15m', '1h', '4h', '1d']:
+            pd.testing.assert_frame_equal(cache.get('X', window, interval), resample_ohlcv(window, interval))
@@ -0,0 +1,43 @@
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from tradando.benchmarks.synthetic import gbm_ohlcv
+from tradando.config import Config
+from tradando.services import walk_forward
+from tradando.services.walk_forward import build_windows, run_walk_forward
+from tradando.strategies.registry import strategy_registry
+
+DATA = gbm_ohlcv(3000, seed=17)
+
+
+class ThreadPool(ThreadPoolExecutor):
+    """Stands in for the process pool, counting the chunks submitted to it"""
+
+    def __init__(self):
+        super().__init__(2)
+        self.n_chunks = 0
+
+    def submit(self, fn, *args):
+        self.n_chunks += 1
+        return super().submit(fn, *args)
+
+
+def test_windows_advance_by_the_step():
+    assert build_windows(10, 4, 2) == [(0, 4, 6), (2, 6, 8), (4, 8, 10)]
+    assert build_windows(10, 0, 3, step_bars=4) == [(0, 0, 3), (4, 4, 7)]
+    with pytest.raises(ValueError):
+        build_windows(10, 4, 0)
+
+
+@pytest.mark.parametrize('train_bars, step_bars', [(400, None), (0, 150), (600, 90)])
+def test_chunks_over_the_pool_match_a_serial_run(monkeypatch, train_bars, step_bars):
+    strategy = strategy_registry.create('sma_cross', stop_loss_pct=1, take_profit_pct=2)
+    serial = run_walk_forward(strategy, DATA, train_bars, 200, step_bars)
+
+    # Chunks still get only the bars their windows cover, as they would in a worker
+    monkeypatch.setattr(Config, 'ANALYZE_BACKTEST_WORKERS', 2)
+    with ThreadPool() as pool:
+        monkeypatch.setattr(walk_forward, 'get_backtest_pool', lambda: pool)
+        parallel = run_walk_forward(strategy, DATA, train_bars, 200, step_bars)
+
+    assert pool.n_chunks > 1
+    assert parallel == serial
@@ -1,10 +1,72 @@
-from flask import Flask
+from flask import Flask, g, request, has_request_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+import cProfile
+import os
+import time
+import uuid
+from tradando.config import Config
+from tradando.models.trade_ledger import TradeLedger
 from tradando.routes import api_bp
+from tradando.services.metrics import metrics
+
+def _route_label() -> str:
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+class JSONProvider(DefaultJSONProvider):
+    @staticmethod
+    def default(o):
+        # Trade ledgers only take their dict shape when a response is serialized
+        if isinstance(o, TradeLedger):
+            return o.to_dicts()
+        return DefaultJSONProvider.default(o)
+
+    def dumps(self, obj, **kwargs) -> str:
+        if not has_request_context():
+            return super().dumps(obj, **kwargs)
+        with metrics.timer('tradando_serialize_seconds', route=_route_label()):
+            return super().dumps(obj, **kwargs)
+
+def _profiling_requested() -> bool:
+    return Config.PROFILING_ENABLED and (request.headers.get('X-Profile') == '1'
+                                         or request.args.get('profile') == '1')
+
+def register_instrumentation(app: Flask):
+    """Time every request, and cProfile the ones that ask for it.
+
+    Profiles only cover the request thread; work fanned out to the analysis
+    pools shows up as time spent waiting on futures.
+    """
+    @app.before_request
+    def start_request():
+        g.request_started = time.perf_counter()
+        if _profiling_requested():
+            g.profiler = cProfile.Profile()
+            g.profiler.enable()
+
+    @app.after_request
+    def finish_request(response):
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            profiler.disable()
+            os.makedirs(Config.PROFILE_DIR, exist_ok=True)
+            route = _route_label().strip('/').replace('/', '_') or 'index'
+            name = f"{time.strftime('%Y%m%d-%H%M%S')}-{route}-{uuid.uuid4().hex[:8]}.prof"
+            path = os.path.join(Config.PROFILE_DIR, name)
+            profiler.dump_stats(path)
+            response.headers['X-Profile-File'] = path
+
+        started = g.pop('request_started', None)
+        if started is not None:
+            metrics.observe('tradando_request_seconds', time.perf_counter() - started,
+                            route=_route_label(), method=request.method, status=response.status_code)
+        return response
 
 def create_app():
     app = Flask(__name__)
+    app.json = JSONProvider(app)
     CORS(app)
+    register_instrumentation(app)
     app.register_blueprint(api_bp)
     return app
 
@@ -0,0 +1,3 @@
+from tradando.benchmarks.run import main
+
+main()
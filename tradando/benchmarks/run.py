@@ -0,0 +1,270 @@
+"""Benchmark harness for strategies, the backtester and the /analyze route.
+
+    python -m tradando.benchmarks --suite quick --output bench.json
+    python -m tradando.benchmarks --suite quick --compare bench.json
+
+Every benchmark runs on seeded synthetic GBM bars, so two runs of the same
+suite on the same machine measure the same work and their JSON reports can
+be compared name by name.
+"""
+from typing import Callable, Dict, Any, List, Optional
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from tradando.benchmarks.synthetic import bars_for, gbm_ohlcv, universe
+from tradando.config import Config
+from tradando.services import indicators
+from tradando.services.bar_store import BarStore
+from tradando.services.result_cache import result_cache
+from tradando.services.backtest import Backtester
+from tradando.strategies.registry import strategy_registry
+
+SUITES = {
+    'quick': {
+        'series': [('5m', 5), ('1h', 90)],
+        'analyze_tickers': [1, 10],
+        'repeats': 5,
+    },
+    'full': {
+        'series': [('1m', 5), ('5m', 5), ('1m', 30), ('5m', 365), ('1h', 730)],
+        'analyze_tickers': [1, 10, 100, 500],
+        'repeats': 5,
+    },
+}
+
+# The bar-by-bar engine is too slow to time repeatedly on very long series
+LOOP_MAX_BARS = 50_000
+
+
+def measure(fn: Callable[[], Any], repeats: int, setup: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+    """Latency percentiles over `repeats` timed calls, plus peak traced memory of one more call.
+
+    The slowest call is reported as 'max' rather than a tail percentile,
+    which a handful of repeats cannot estimate.
+    """
+    latencies = []
+    for _ in range(repeats):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    latencies = np.array(latencies) * 1000
+    return {
+        'repeats': repeats,
+        'latency_ms': {
+            'min': round(float(latencies.min()), 3),
+            'mean': round(float(latencies.mean()), 3),
+            'p50': round(float(np.percentile(latencies, 50)), 3),
+            'p90': round(float(np.percentile(latencies, 90)), 3),
+            'max': round(float(latencies.max()), 3),
+        },
+        'peak_mem_mb': round(peak / 2 ** 20, 3),
+    }
+
+
+def _throughput(result: Dict[str, Any], n_bars: int, n_backtests: int = 0) -> Dict[str, Any]:
+    seconds = result['latency_ms']['p50'] / 1000
+    result['bars_per_sec'] = round(n_bars / seconds, 1) if seconds else None
+    if n_backtests:
+        result['backtests_per_sec'] = round(n_backtests / seconds, 3) if seconds else None
+    return result
+
+
+def bench_signals(series: List, repeats: int) -> List[Dict[str, Any]]:
+    results = []
+    for interval, days in series:
+        df = gbm_ohlcv(bars_for(days, interval), interval)
+        for key in strategy_registry.names():
+            strategy = strategy_registry.create(key)
+            # Clear the shared indicator cache so every call computes its series
+            result = measure(lambda: strategy.generate_signals(df), repeats,
+                             setup=indicators.indicator_cache.clear)
+            results.append(_throughput({
+                'name': f'signals/{key}/{interval}/{days}d',
+                'n_bars': len(df),
+                **result
+            }, len(df)))
+    return results
+
+
+def bench_backtest(series: List, repeats: int) -> List[Dict[str, Any]]:
+    results = []
+    for interval, days in series:
+        df = gbm_ohlcv(bars_for(days, interval), interval)
+        for key in strategy_registry.names():
+            for mode in Backtester.MODES:
+                if mode == 'loop' and len(df) > LOOP_MAX_BARS:
+                    continue
+                backtester = Backtester(strategy_registry.create(key), mode)
+                result = measure(lambda: backtester.run(df), repeats,
+                                 setup=indicators.indicator_cache.clear)
+                results.append(_throughput({
+                    'name': f'backtest/{key}/{mode}/{interval}/{days}d',
+                    'n_bars': len(df),
+                    **result
+                }, len(df), 1))
+    return results
+
+
+def synthetic_bar_store(data: Dict[str, pd.DataFrame], root: str) -> BarStore:
+    """A bar store under `root` whose fetchers serve `data`, re-dated to end a day from now.
+
+    Every request made within that day finds a full window of bars, and
+    after the first one they are read from the on-disk cache like warm
+    production requests.
+    """
+    end = pd.Timestamp.now(tz='UTC').ceil('5min') + pd.Timedelta(days=1)
+    dated = {symbol: df.set_axis(df.index + (end - df.index[-1])) for symbol, df in data.items()}
+
+    def fetch(symbol, start, end, interval):
+        return dated.get(symbol)
+
+    def fetch_many(symbols, start, end, interval):
+        return {symbol: dated[symbol] for symbol in symbols if symbol in dated}
+
+    return BarStore(root, fetch, refresh_seconds=float('inf'), bulk_fetcher=fetch_many)
+
+
+def bench_analyze(ticker_counts: List[int], repeats: int, days: int = 5) -> List[Dict[str, Any]]:
+    """Full /analyze requests, with bars served from synthetic data through the bar store"""
+    from tradando import utils
+    from tradando.app import create_app
+    from tradando.services import analysis
+
+    client = create_app().test_client()
+    strategies = strategy_registry.names()
+    results = []
+
+    def clear_caches():
+        # Time the backtests, not result cache hits, nor indicators cached in the workers
+        indicators.indicator_cache.clear()
+        result_cache.clear()
+        analysis.restart_backtest_pool()
+
+    for n_tickers in ticker_counts:
+        # A day more than requested, so the window is full whenever it starts
+        data = universe(n_tickers, days + 1)
+        payload = {'tickers': list(data), 'strategies': strategies, 'days': days}
+
+        def request():
+            response = client.post('/analyze', json=payload)
+            assert response.status_code == 200, response.get_data(as_text=True)
+
+        with tempfile.TemporaryDirectory() as root:
+            previous = utils.set_bar_store(synthetic_bar_store(data, root))
+            try:
+                request()  # warm up imports, the thread pool and the bar store
+                result = measure(request, repeats, setup=clear_caches)
+            finally:
+                utils.set_bar_store(previous)
+
+        n_bars = n_tickers * bars_for(days, Config.BASE_INTERVAL)
+        results.append(_throughput({
+            'name': f'analyze/{n_tickers}x{len(strategies)}/5m/{days}d',
+            'n_bars': n_bars,
+            **result
+        }, n_bars, n_tickers * len(strategies)))
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(suite: str, only: Optional[List[str]] = None, repeats: Optional[int] = None) -> Dict[str, Any]:
+    spec = SUITES[suite]
+    repeats = repeats or spec['repeats']
+    groups = {
+        'signals': lambda: bench_signals(spec['series'], repeats),
+        'backtest': lambda: bench_backtest(spec['series'], repeats),
+        'analyze': lambda: bench_analyze(spec['analyze_tickers'], repeats),
+    }
+
+    results = []
+    for group, run in groups.items():
+        if only and group not in only:
+            continue
+        print(f"Running {group} benchmarks...", file=sys.stderr)
+        results.extend(run())
+
+    return {
+        'meta': {
+            'suite': suite,
+            'repeats': repeats,
+            'commit': _git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'results': results
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Median latency change per benchmark present in both reports"""
+    before = {r['name']: r for r in baseline['results']}
+    rows = []
+    for result in current['results']:
+        old = before.get(result['name'])
+        if old is None:
+            continue
+        old_p50, new_p50 = old['latency_ms']['p50'], result['latency_ms']['p50']
+        rows.append({
+            'name': result['name'],
+            'baseline_p50_ms': old_p50,
+            'current_p50_ms': new_p50,
+            'change_pct': round((new_p50 - old_p50) / old_p50 * 100, 1) if old_p50 else None,
+        })
+    return rows
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--suite', choices=sorted(SUITES), default='quick')
+    parser.add_argument('--only', nargs='+', choices=['signals', 'backtest', 'analyze'])
+    parser.add_argument('--repeats', type=int)
+    parser.add_argument('--output', help="write the JSON report here instead of stdout")
+    parser.add_argument('--compare', help="baseline JSON report to compare against")
+    args = parser.parse_args(argv)
+
+    report = run_suite(args.suite, args.only, args.repeats)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        for row in compare(baseline, report):
+            change = 'n/a' if row['change_pct'] is None else f"{row['change_pct']:+.1f}%"
+            print(f"{row['name']:<45} {row['baseline_p50_ms']:>10.2f}ms -> "
+                  f"{row['current_p50_ms']:>10.2f}ms  {change}", file=sys.stderr)
@@ -0,0 +1,43 @@
+from typing import Dict
+import numpy as np
+import pandas as pd
+
+INTERVAL_MINUTES = {'1m': 1, '5m': 5, '15m': 15, '1h': 60, '1d': 1440}
+
+
+def bars_for(days: float, interval: str) -> int:
+    """Number of bars in `days` of round-the-clock trading"""
+    return max(2, int(days * 1440 / INTERVAL_MINUTES[interval]))
+
+
+def gbm_ohlcv(n_bars: int, interval: str = '5m', seed: int = 0, start_price: float = 100.0,
+              annual_drift: float = 0.05, annual_volatility: float = 0.6,
+              start: str = '2024-01-01') -> pd.DataFrame:
+    """OHLCV bars from geometric Brownian motion, reproducible for a given seed.
+
+    Each bar's path is sampled at four points so High/Low bracket Open/Close
+    the way real bars do.
+    """
+    rng = np.random.default_rng(seed)
+    dt = INTERVAL_MINUTES[interval] / (365 * 1440)
+    steps = 4
+    sub_dt = dt / steps
+    log_returns = rng.normal((annual_drift - annual_volatility ** 2 / 2) * sub_dt,
+                             annual_volatility * np.sqrt(sub_dt), size=(n_bars, steps))
+    path = start_price * np.exp(np.cumsum(log_returns.ravel())).reshape(n_bars, steps)
+
+    close = path[:, -1]
+    open_ = np.concatenate(([start_price], close[:-1]))
+    high = np.maximum(path.max(axis=1), open_)
+    low = np.minimum(path.min(axis=1), open_)
+    volume = rng.lognormal(mean=10, sigma=1, size=n_bars)
+
+    index = pd.date_range(start, periods=n_bars, freq=f'{INTERVAL_MINUTES[interval]}min', tz='UTC')
+    return pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume},
+                        index=index)
+
+
+def universe(n_tickers: int, days: float, interval: str = '5m', seed: int = 0) -> Dict[str, pd.DataFrame]:
+    """Independent synthetic series keyed by made-up symbols"""
+    n_bars = bars_for(days, interval)
+    return {f'SYN{i:03d}-USD': gbm_ohlcv(n_bars, interval, seed=seed + i) for i in range(n_tickers)}
@@ -4,6 +4,39 @@ from dotenv import load_dotenv
 load_dotenv()
 
 class Config:
-    HF_API_URL = "https://api-inference.huggingface.co/models/"
+    HF_API_URL = os.getenv('HF_API_URL', "https://api-inference.huggingface.co/models/")
     HF_API_KEY = os.getenv('HF')
+    HF_MODEL = 'gpt2'
+    HF_TIMEOUT = (2, 10)  # connect, read seconds
+    DESCRIPTION_RETRY_SECONDS = 300
     INITIAL_CASH = 10000
+    DATA_CACHE_DIR = os.getenv('TRADANDO_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'tradando'))
+    DATA_REFRESH_SECONDS = 60
+    BASE_INTERVAL = '5m'  # the only interval downloaded; longer ones are aggregated from it
+    TIMEFRAME_CACHE_ENTRIES = 256
+    ANALYZE_FETCH_WORKERS = 8
+    ANALYZE_BACKTEST_WORKERS = os.cpu_count() or 1
+    ANALYZE_TICKER_TIMEOUT = 60
+    OPTIMIZE_MAX_COMBINATIONS = 50000
+    ROBUSTNESS_PATHS = 1000
+    ROBUSTNESS_BLOCK_BARS = 24  # consecutive returns kept together by the block bootstrap
+    ROBUSTNESS_MAX_CELLS = 20_000_000  # simulated paths x bars per request
+    INDICATOR_CACHE_MAX_BYTES = 64 * 1024 * 1024
+    RESULT_CACHE_MAX_BYTES = 32 * 1024 * 1024
+    RESULT_CACHE_ON_DISK = os.getenv('TRADANDO_RESULT_CACHE_DISK') == '1'
+    RESULT_CACHE_DIR = os.path.join(DATA_CACHE_DIR, 'results')
+    PROFILING_ENABLED = os.getenv('TRADANDO_PROFILING') == '1'
+    PROFILE_DIR = os.getenv('TRADANDO_PROFILE_DIR', os.path.join(DATA_CACHE_DIR, 'profiles'))
+    JOBS_DB_PATH = os.path.join(DATA_CACHE_DIR, 'jobs.sqlite3')
+    JOB_WORKERS = 2
+    STREAM_POLL_SECONDS = 30
+    STREAM_HEARTBEAT_SECONDS = 15
+    STREAM_RETRY_SECONDS = 3  # reconnect delay sent to EventSource clients
+    STREAM_QUEUE_SIZE = 256  # events buffered per subscriber before it is dropped
+    STREAM_REPLAY_EVENTS = 500
+    STREAM_ENTRIES = 256  # symbol streams kept; ones with subscribers are never evicted
+    LIVE_TRADER_ENTRIES = 256
+    BULK_FETCH_BATCH_SIZE = 100
+    BULK_FETCH_RETRIES = 3
+    BULK_FETCH_BACKOFF = 2  # seconds, doubled on every retry
+    BULK_FETCH_POOL_SIZE = 16
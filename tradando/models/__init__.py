@@ -1,3 +1,4 @@
 from .portfolio import Portfolio  # Ensure Portfolio is imported
+from .trade_ledger import TradeLedger
 
-__all__ = ['Portfolio']  # This makes Portfolio available for import
\ No newline at end of file
+__all__ = ['Portfolio', 'TradeLedger']  # This makes Portfolio available for import
@@ -1,75 +1,61 @@
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from datetime import datetime
+from tradando.models.trade_ledger import TradeLedger
 
 class Portfolio:
-    def __init__(self, initial_value: float = 10000):
+    def __init__(self, initial_value: float = 10000, fee_pct: float = 0.0):
         self.initial_value = initial_value
+        self.fee_pct = fee_pct
+        self.fees_paid = 0.0
         self.cash = initial_value
         self.holdings = 0
-        self.trades = []
+        self.trades = TradeLedger()
         self.entry_price = None
-        self.last_buy_trade = None
+        self.last_buy_amount = None
 
-    def execute_buy(self, price: float, timestamp) -> Dict[str, Any]:
-        """Execute a buy trade"""
+    def execute_buy(self, price: float, timestamp) -> Optional[int]:
+        """Execute a buy trade, returning its ledger position"""
         if self.cash <= 0:
             return None
             
-        buy_amount = self.cash
+        # The fee comes out of the cash, so the position is slightly smaller
+        buy_amount = self.cash / (1 + self.fee_pct / 100)
+        fee = self.cash - buy_amount
         shares = buy_amount / price
         self.holdings = shares
         self.cash = 0
+        self.fees_paid += fee
         self.entry_price = price
+        self.last_buy_amount = buy_amount + fee
         
-        trade = {
-            'type': 'buy',
-            'reason': 'signal',
-            'price': round(price, 2),
-            'timestamp': timestamp.strftime('%Y-%m-%d %H:%M') if hasattr(timestamp, 'strftime') else timestamp,
-            'amount': round(buy_amount, 2),
-            'shares': round(shares, 8)
-        }
-        self.trades.append(trade)
-        self.last_buy_trade = trade
-        return trade
+        return self.trades.append('buy', 'signal', timestamp, price, shares, buy_amount, fee=fee)
 
-    def execute_sell(self, price: float, timestamp, reason: str = 'signal') -> Dict[str, Any]:
-        """Execute a sell trade"""
+    def execute_sell(self, price: float, timestamp, reason: str = 'signal') -> Optional[int]:
+        """Execute a sell trade, returning its ledger position"""
         if self.holdings <= 0:
             return None
             
         sell_amount = self.holdings * price
+        fee = sell_amount * self.fee_pct / 100
         shares_sold = self.holdings
         price_change_pct = ((price - self.entry_price) / self.entry_price) * 100 if self.entry_price else 0
+        # Against the buy amount as reported, i.e. rounded to cents
+        pnl_amount = sell_amount - fee - round(self.last_buy_amount, 2) if self.last_buy_amount is not None else 0
         
-        self.cash = sell_amount
+        self.cash = sell_amount - fee
         self.holdings = 0
+        self.fees_paid += fee
         
-        trade = {
-            'type': 'sell',
-            'reason': reason,
-            'price': round(price, 2),
-            'timestamp': timestamp.strftime('%Y-%m-%d %H:%M') if hasattr(timestamp, 'strftime') else timestamp,
-            'amount': round(sell_amount, 2),
-            'shares': round(shares_sold, 8),
-            'pnl_pct': round(price_change_pct, 2),
-            'pnl_amount': round(sell_amount - self.last_buy_trade['amount'], 2) if self.last_buy_trade else 0,
-            'entry_price': round(self.entry_price, 2) if self.entry_price else 0
-        }
-        self.trades.append(trade)
+        position = self.trades.append('sell', reason, timestamp, price, shares_sold, sell_amount,
+                                      price_change_pct, pnl_amount, self.entry_price or 0, fee)
         self.entry_price = None
-        self.last_buy_trade = None
-        return trade
+        self.last_buy_amount = None
+        return position
 
     def get_statistics(self) -> Dict[str, Any]:
         """Get portfolio statistics"""
         return {
-            'n_trades': len(self.trades),
-            'n_buys': len([t for t in self.trades if t['type'] == 'buy']),
-            'n_sells': len([t for t in self.trades if t['type'] == 'sell']),
-            'n_stop_losses': len([t for t in self.trades if t['reason'] == 'stop_loss']),
-            'n_take_profits': len([t for t in self.trades if t['reason'] == 'take_profit']),
-            'n_signal_trades': len([t for t in self.trades if t['reason'] == 'signal']),
+            **self.trades.summary(),
             'trades': self.trades
         }
 
@@ -77,7 +63,7 @@ class Portfolio:
         """Calculate current portfolio value"""
         return self.cash + (self.holdings * current_price)
 
-    def execute_trade(self, trade_type: str, price: float, timestamp, reason: str = 'signal') -> Dict[str, Any]:
+    def execute_trade(self, trade_type: str, price: float, timestamp, reason: str = 'signal') -> Optional[int]:
         if trade_type == 'buy':
             return self.execute_buy(price, timestamp)
         elif trade_type == 'sell':
@@ -0,0 +1,116 @@
+from typing import Dict, List, Any
+import numpy as np
+import pandas as pd
+
+
+class TradeLedger:
+    """Append-only trade log stored as a growable structured NumPy array.
+
+    Sides and reasons are small integer codes and timestamps are int64
+    wall-clock nanoseconds, so recording a trade does no formatting. The
+    dict shape the API returns is built by to_dicts() at the boundary.
+    """
+
+    SIDES = ('buy', 'sell')
+    REASONS = ('signal', 'stop_loss', 'take_profit', 'trailing_stop')
+    # The API's trade timestamps, shared with streamed bars so trades line up
+    # with the bars they happened on; the ledger itself keeps nanoseconds
+    TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M'
+    DTYPE = np.dtype([
+        ('side', 'i1'),
+        ('reason', 'i1'),
+        ('timestamp', 'i8'),
+        ('price', 'f8'),
+        ('shares', 'f8'),
+        ('amount', 'f8'),
+        ('pnl_pct', 'f8'),
+        ('pnl_amount', 'f8'),
+        ('entry_price', 'f8'),
+        ('fee', 'f8'),
+    ])
+
+    def __init__(self, capacity: int = 64):
+        self._rows = np.empty(capacity, dtype=self.DTYPE)
+        self._n = 0
+        # Timestamps without strftime (e.g. a RangeIndex) are stored and returned as integers
+        self.datetime_timestamps = True
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state['_rows'] = self.rows.copy()
+        return state
+
+    @property
+    def rows(self) -> np.ndarray:
+        """Structured array view of the recorded trades"""
+        return self._rows[:self._n]
+
+    def _timestamp_value(self, timestamp) -> int:
+        if hasattr(timestamp, 'strftime'):
+            timestamp = pd.Timestamp(timestamp)
+            if timestamp.tzinfo is not None:
+                timestamp = timestamp.tz_localize(None)
+            return timestamp.value
+        self.datetime_timestamps = False
+        return int(timestamp)
+
+    def append(self, side: str, reason: str, timestamp, price: float, shares: float, amount: float,
+               pnl_pct: float = 0.0, pnl_amount: float = 0.0, entry_price: float = 0.0,
+               fee: float = 0.0) -> int:
+        """Record a trade and return its position in the ledger"""
+        if self._n == len(self._rows):
+            grown = np.empty(max(1, 2 * len(self._rows)), dtype=self.DTYPE)
+            grown[:self._n] = self._rows
+            self._rows = grown
+
+        self._rows[self._n] = (self.SIDES.index(side), self.REASONS.index(reason),
+                               self._timestamp_value(timestamp), price, shares, amount,
+                               pnl_pct, pnl_amount, entry_price, fee)
+        self._n += 1
+        return self._n - 1
+
+    def summary(self) -> Dict[str, int]:
+        """Trade counts by side and reason"""
+        rows = self.rows
+        sides = np.bincount(rows['side'], minlength=len(self.SIDES))
+        reasons = np.bincount(rows['reason'], minlength=len(self.REASONS))
+        return {
+            'n_trades': self._n,
+            'n_buys': int(sides[0]),
+            'n_sells': int(sides[1]),
+            'n_stop_losses': int(reasons[1]),
+            'n_take_profits': int(reasons[2]),
+            'n_signal_trades': int(reasons[0]),
+            'n_trailing_stops': int(reasons[3]),
+        }
+
+    def to_dicts(self, start: int = 0) -> List[Dict[str, Any]]:
+        """Trades from position `start` on, in the JSON shape the frontend expects"""
+        rows = self.rows[start:]
+        if self.datetime_timestamps:
+            timestamps = pd.to_datetime(rows['timestamp']).strftime(self.TIMESTAMP_FORMAT).tolist()
+        else:
+            timestamps = rows['timestamp'].tolist()
+
+        trades = []
+        for row, timestamp in zip(rows.tolist(), timestamps):
+            side, reason, _, price, shares, amount, pnl_pct, pnl_amount, entry_price, fee = row
+            trade = {
+                'type': self.SIDES[side],
+                'reason': self.REASONS[reason],
+                'price': round(price, 2),
+                'timestamp': timestamp,
+                'amount': round(amount, 2),
+                'shares': round(shares, 8)
+            }
+            if side == 1:
+                trade['pnl_pct'] = round(pnl_pct, 2)
+                trade['pnl_amount'] = round(pnl_amount, 2)
+                trade['entry_price'] = round(entry_price, 2)
+            if fee:
+                trade['fee'] = round(fee, 2)
+            trades.append(trade)
+        return trades
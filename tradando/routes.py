@@ -1,26 +1,65 @@
-from flask import Blueprint, render_template, jsonify, request
-from tradando.models.portfolio import Portfolio
-from tradando.utils import fetch_historical_data, utc_to_local, get_strategy_description#, get_top_cryptos, analyze_crypto
+from flask import Blueprint, Response, render_template, jsonify, request, stream_with_context
+from functools import partial
+from tradando.utils import fetch_historical_data, fetch_many, get_strategy_description#, get_top_cryptos, analyze_crypto
 from tradando.config import Config
-from datetime import datetime
-import numpy as np
-from concurrent.futures import ThreadPoolExecutor
+import json
 import logging
-import pandas as pd
-from tradando.strategies.sma_cross import SMACrossStrategy
 from tradando.services.backtest import Backtester
-from tradando.strategies.rsi import RSIStrategy
-from tradando.strategies.macd import MACDStrategy
+from tradando.services.execution import ExecutionModel
+from tradando.services.analysis import run_backtests, build_strategies, summarize_results
+from tradando.services.optimize import run_sweep
+from tradando.services.portfolio_backtest import PortfolioBacktester
+from tradando.services.walk_forward import run_walk_forward
+from tradando.services.robustness import run_robustness
+from tradando.services import indicators, charting
+from tradando.services.live import get_live_trader
+from tradando.services.streams import get_symbol_stream
+from tradando.services.metrics import metrics
+from tradando.services.result_cache import result_cache, result_key, combined_key
+from tradando.services.jobs import get_job_queue
+from tradando.services.timeframes import INTERVALS
+from tradando.strategies.registry import strategy_registry
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 api_bp = Blueprint('api', __name__)
 
+def with_etag(response: Response, key: str) -> Response:
+    response.set_etag(key)
+    # Let clients keep the body but revalidate before reusing it
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def not_modified(key: str) -> Response:
+    return with_etag(Response(status=304), key)
+
+def form_flag(field: str) -> bool:
+    """A checkbox-style form field, on only for an explicit true value"""
+    return request.form.get(field, '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+def unsupported_interval(interval: str):
+    """A 400 response if bars cannot be built at `interval`, else None"""
+    if interval not in INTERVALS:
+        return jsonify({"error": f"Unsupported interval: {interval} (choose from {', '.join(INTERVALS)})"}), 400
+    return None
+
 @api_bp.route('/')
 def index():
     return render_template('index.html', initial_cash=Config.INITIAL_CASH)
 
+@api_bp.route('/metrics')
+def metrics_endpoint():
+    return metrics.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+@api_bp.route('/strategies')
+def list_strategies():
+    try:
+        return jsonify({'strategies': strategy_registry.schemas()})
+    except Exception as e:
+        print(f"Error in strategies route: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
 @api_bp.route('/update', methods=['POST'])
 def update():
     try:
@@ -30,39 +69,74 @@ def update():
         if data is None or data.empty:
             return {"error": "Price data unavailable."}, 500
 
-        strategy = SMACrossStrategy()
-        backtester = Backtester(strategy)
-        result = backtester.run(data)
-        
-        # Format response with current portfolio state
-        response_data = {
-            'portfolio_value': round(result['final_value'], 2),
-            'price': round(float(data['Close'].iloc[-1]), 2),
-            'holdings': round(result['holdings'], 6),
-            'cash': round(result['cash'], 2),
-            'trades': result['trades'],
-            'strategy_description': get_strategy_description()
-        }
+        # Only bars completed since the previous update go through the strategy
+        trader = get_live_trader(ticker, partial(strategy_registry.create, 'sma_cross'))
+        with trader.lock:
+            trader.feed(data)
+            response_data = trader.snapshot(float(data['Close'].iloc[-1]))
+        response_data['strategy_description'] = get_strategy_description(trader.strategy)
         
         return jsonify(response_data)
     except Exception as e:
         return {"error": str(e)}, 500
 
+@api_bp.route('/stream/<ticker>')
+def stream(ticker):
+    try:
+        # Looked up on every poll, so the stream trades with the same trader as /live_trade
+        symbol_stream = get_symbol_stream(ticker, partial(get_live_trader, ticker,
+                                                          partial(strategy_registry.create, 'sma_cross')))
+
+        # EventSource sends Last-Event-ID itself when it reconnects
+        last_event_id = request.headers.get('Last-Event-ID') or request.args.get('lastEventId')
+        try:
+            last_event_id = int(last_event_id) if last_event_id else None
+        except ValueError:
+            return jsonify({"error": "Last-Event-ID must be an integer"}), 400
+
+        subscription = symbol_stream.subscribe(last_event_id)
+        return Response(stream_with_context(symbol_stream.iter_events(subscription)),
+                        mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    except Exception as e:
+        print(f"Error in stream route: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
 @api_bp.route('/backtest', methods=['POST'])
 def backtest():
     try:
         ticker = request.form.get('ticker')
         days = int(request.form.get('days', '5'))
+        interval = request.form.get('interval', Config.BASE_INTERVAL)
+        error = unsupported_interval(interval)
+        if error:
+            return error
         
-        data = fetch_historical_data(ticker, days)
+        data = fetch_historical_data(ticker, days, interval)
         if data is None or data.empty:
             return {"error": "Historical data unavailable."}, 500
             
-        strategy = SMACrossStrategy()
-        backtester = Backtester(strategy)
-        result = backtester.run(data)
-        
-        return jsonify(result)
+        strategy = strategy_registry.instance('sma_cross')
+        # Any execution option switches exits to intrabar High/Low checks
+        execution = None
+        try:
+            trailing_stop = request.form.get('trailing_stop')
+            trailing_stop = float(trailing_stop) if trailing_stop else None
+            slippage = float(request.form.get('slippage') or 0)
+            fee = float(request.form.get('fee') or 0)
+            if form_flag('intrabar') or trailing_stop is not None or slippage or fee:
+                execution = ExecutionModel(trailing_stop_pct=trailing_stop, slippage_pct=slippage, fee_pct=fee)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        backtester = Backtester(strategy, execution=execution)
+
+        # Same bars and settings, same result: revalidation skips the backtest and the JSON
+        key = result_key(data, strategy, backtester.mode, execution)
+        if request.if_none_match.contains(key):
+            return not_modified(key)
+        result = result_cache.get_or_compute(key, lambda: backtester.run(data))
+
+        return with_etag(jsonify(result), key)
     except Exception as e:
         return {"error": str(e)}, 500
 
@@ -76,126 +150,283 @@ def analyze():
         strategies = data.get('strategies', ['sma_cross'])  # Now accepts multiple strategies
         tickers = data.get('tickers', [])
 
+        interval = data.get('interval', Config.BASE_INTERVAL)
+
         if not tickers:
             return jsonify({"error": "No tickers selected"}), 400
-
-        all_results = []
-        total_profit = 0
-        
-        # Create strategy instances
-        strategy_instances = {}
-        for strategy_name in strategies:
-            if strategy_name == 'sma_cross':
-                strategy_instances[strategy_name] = SMACrossStrategy(
-                    stop_loss_pct=stop_loss,
-                    take_profit_pct=take_profit
-                )
-            elif strategy_name == 'rsi':
-                strategy_instances[strategy_name] = RSIStrategy(
-                    stop_loss_pct=stop_loss,
-                    take_profit_pct=take_profit
-                )
-            elif strategy_name == 'macd':
-                strategy_instances[strategy_name] = MACDStrategy(
-                    stop_loss_pct=stop_loss,
-                    take_profit_pct=take_profit
-                )
-            else:
-                continue
+        error = unsupported_interval(interval)
+        if error:
+            return error
 
         # Run analysis for each combination of ticker and strategy
-        for symbol in tickers:
-            data = fetch_historical_data(symbol, days)
-            
-            if data is None or data.empty:
-                continue
-                
-            for strategy_name, strategy in strategy_instances.items():
-                backtester = Backtester(strategy)
-                result = backtester.run(data)
-                result['symbol'] = symbol
-                result['strategy'] = strategy.name
-                result['strategy_key'] = strategy_name
-                all_results.append(result)
-                total_profit += (result['final_value'] - result['initial_value'])
-
+        strategy_instances = build_strategies(strategies, stop_loss, take_profit)
+        result_keys = []
+        all_results = run_backtests(tickers, strategy_instances, days, result_keys=result_keys,
+                                    interval=interval)
         if not all_results:
             return jsonify({"error": "No data available for selected pairs"}), 404
 
-        # Sort results by return percentage
-        all_results.sort(key=lambda x: x['return_pct'], reverse=True)
-        
-        # Enhanced summary statistics
-        strategy_stats = {}
-        for strategy_name in strategies:
-            strategy_results = [r for r in all_results if r['strategy_key'] == strategy_name]
-            if strategy_results:
-                avg_return = sum(r['return_pct'] for r in strategy_results) / len(strategy_results)
-                best_trade = max(strategy_results, key=lambda x: x['return_pct'])
-                worst_trade = min(strategy_results, key=lambda x: x['return_pct'])
-                
-                strategy_stats[strategy_name] = {
-                    'avg_return': round(avg_return, 2),
-                    'best_trade': {
-                        'symbol': best_trade['symbol'],
-                        'return': round(best_trade['return_pct'], 2)
-                    },
-                    'worst_trade': {
-                        'symbol': worst_trade['symbol'],
-                        'return': round(worst_trade['return_pct'], 2)
-                    },
-                    'total_trades': sum(r['n_trades'] for r in strategy_results),
-                    'profit': sum(r['final_value'] - r['initial_value'] for r in strategy_results)
-                }
-        
-        response_data = {
-            'summary': {
-                'total_profit': round(total_profit, 2),
-                'average_return_pct': round(sum(r['return_pct'] for r in all_results) / len(all_results), 2),
-                'best_performer': all_results[0]['symbol'],
-                'best_return_pct': round(all_results[0]['return_pct'], 2),
-                'analyzed_pairs': len(set(r['symbol'] for r in all_results)),
-                'strategy_stats': strategy_stats
-            },
-            'results': all_results
-        }
-        
-        return jsonify(response_data)
+        key = combined_key(result_keys, tickers=tickers, strategies=strategies)
+        if request.if_none_match.contains(key):
+            return not_modified(key)
+        response_data = summarize_results(all_results, strategies)
+
+        return with_etag(jsonify(response_data), key)
         
     except Exception as e:
         print(f"Error in analyze route: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@api_bp.route('/analyze/jobs', methods=['POST'])
+def submit_analyze_job():
+    try:
+        data = request.get_json()
+        if not data.get('tickers'):
+            return jsonify({"error": "No tickers selected"}), 400
+        error = unsupported_interval(data.get('interval', Config.BASE_INTERVAL))
+        if error:
+            return error
+
+        job_id, deduplicated = get_job_queue().submit(data)
+        return jsonify({'job_id': job_id, 'deduplicated': deduplicated}), 202
+
+    except Exception as e:
+        print(f"Error submitting analysis job: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@api_bp.route('/analyze/jobs/<job_id>', methods=['GET'])
+def get_analyze_job(job_id):
+    try:
+        job = get_job_queue().get(job_id, include_results=request.args.get('results', '1') != '0')
+        if job is None:
+            return jsonify({"error": "Unknown job"}), 404
+        return jsonify(job)
+
+    except Exception as e:
+        print(f"Error getting analysis job: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@api_bp.route('/optimize', methods=['POST'])
+def optimize():
+    try:
+        data = request.get_json()
+        symbol = data.get('symbol')
+        days = int(data.get('days', '5'))
+        strategy = data.get('strategy', 'sma_cross')
+        top = data.get('top', 50)
+        interval = data.get('interval', Config.BASE_INTERVAL)
+
+        if not symbol:
+            return jsonify({"error": "No symbol selected"}), 400
+        error = unsupported_interval(interval)
+        if error:
+            return error
+
+        df = fetch_historical_data(symbol, days, interval)
+        if df is None or df.empty:
+            return jsonify({"error": "No data available"}), 404
+
+        try:
+            result = run_sweep(
+                df,
+                strategy,
+                data.get('params', {}),
+                data.get('stop_loss', 5),
+                data.get('take_profit', 5),
+                top=int(top) if isinstance(top, str) else top,
+                sort_by=data.get('sort_by', 'return_pct')
+            )
+        except (ValueError, KeyError, TypeError) as e:
+            return jsonify({"error": str(e)}), 400
+
+        result['symbol'] = symbol
+        return jsonify(result)
+
+    except Exception as e:
+        print(f"Error in optimize route: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@api_bp.route('/walk_forward', methods=['POST'])
+def walk_forward():
+    try:
+        data = request.get_json()
+        symbol = data.get('symbol')
+        days = int(data.get('days', '30'))
+        strategy_name = data.get('strategy', 'sma_cross')
+        interval = data.get('interval', Config.BASE_INTERVAL)
+
+        if not symbol:
+            return jsonify({"error": "No symbol selected"}), 400
+        error = unsupported_interval(interval)
+        if error:
+            return error
+        if strategy_name not in strategy_registry:
+            return jsonify({"error": f"Unknown strategy: {strategy_name}"}), 400
+
+        df = fetch_historical_data(symbol, days, interval)
+        if df is None or df.empty:
+            return jsonify({"error": "No data available"}), 404
+
+        try:
+            strategy = strategy_registry.instance(
+                strategy_name,
+                stop_loss_pct=float(data.get('stop_loss', '5')),
+                take_profit_pct=float(data.get('take_profit', '5')),
+                **data.get('params', {})
+            )
+            result = run_walk_forward(
+                strategy,
+                df,
+                int(data.get('train_bars', 0)),
+                int(data.get('test_bars', 288)),
+                int(data['step_bars']) if data.get('step_bars') else None
+            )
+        except (ValueError, TypeError) as e:
+            return jsonify({"error": str(e)}), 400
+
+        result['symbol'] = symbol
+        result['strategy_key'] = strategy_name
+        return jsonify(result)
+
+    except Exception as e:
+        print(f"Error in walk forward route: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@api_bp.route('/robustness', methods=['POST'])
+def robustness():
+    try:
+        data = request.get_json()
+        symbol = data.get('symbol')
+        days = int(data.get('days', '5'))
+        strategy_name = data.get('strategy', 'sma_cross')
+        interval = data.get('interval', Config.BASE_INTERVAL)
+
+        if not symbol:
+            return jsonify({"error": "No symbol selected"}), 400
+        error = unsupported_interval(interval)
+        if error:
+            return error
+        if strategy_name not in strategy_registry:
+            return jsonify({"error": f"Unknown strategy: {strategy_name}"}), 400
+
+        df = fetch_historical_data(symbol, days, interval)
+        if df is None or df.empty:
+            return jsonify({"error": "No data available"}), 404
+
+        try:
+            strategy = strategy_registry.instance(
+                strategy_name,
+                stop_loss_pct=float(data.get('stop_loss', '5')),
+                take_profit_pct=float(data.get('take_profit', '5')),
+                **data.get('params', {})
+            )
+            result = run_robustness(
+                strategy,
+                df,
+                int(data.get('n_paths', Config.ROBUSTNESS_PATHS)),
+                data.get('method', 'block'),
+                int(data.get('block_bars', Config.ROBUSTNESS_BLOCK_BARS)),
+                int(data['seed']) if data.get('seed') is not None else None
+            )
+        except (ValueError, TypeError) as e:
+            return jsonify({"error": str(e)}), 400
+
+        result['symbol'] = symbol
+        result['strategy_key'] = strategy_name
+        return jsonify(result)
+
+    except Exception as e:
+        print(f"Error in robustness route: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@api_bp.route('/portfolio_backtest', methods=['POST'])
+def portfolio_backtest():
+    try:
+        data = request.get_json()
+        days = int(data.get('days', '5'))
+        tickers = data.get('tickers', [])
+        strategy_name = data.get('strategy', 'sma_cross')
+        interval = data.get('interval', Config.BASE_INTERVAL)
+
+        if not tickers:
+            return jsonify({"error": "No tickers selected"}), 400
+        if strategy_name not in strategy_registry:
+            return jsonify({"error": f"Unknown strategy: {strategy_name}"}), 400
+        error = unsupported_interval(interval)
+        if error:
+            return error
+
+        strategy = strategy_registry.instance(
+            strategy_name,
+            stop_loss_pct=float(data.get('stop_loss', '5')),
+            take_profit_pct=float(data.get('take_profit', '5'))
+        )
+        try:
+            backtester = PortfolioBacktester(
+                strategy,
+                max_positions=int(data.get('max_positions', 10)),
+                position_size_pct=float(data['position_size_pct']) if 'position_size_pct' in data else None,
+                allocation=data.get('allocation', 'equal')
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        # The portfolio trades on one shared timeline, so the tickers' closes are aligned up front
+        closes = fetch_many(tickers, days, interval=interval)
+        if closes.empty:
+            return jsonify({"error": "No data available for selected pairs"}), 404
+        histories = {symbol: series.dropna().to_frame('Close') for symbol, series in closes['Close'].items()}
+
+        result = backtester.run(histories)
+        result['strategy'] = strategy.name
+        result['strategy_key'] = strategy_name
+        return jsonify(result)
+
+    except Exception as e:
+        print(f"Error in portfolio backtest route: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
 @api_bp.route('/get_historical_data', methods=['POST'])
 def get_historical_data():
     try:
         data = request.json
         symbol = data.get('symbol')
         days = int(data.get('days', 5))
+        max_points = int(data.get('max_points', 0))
+        method = data.get('downsample', 'lttb')
+        encoding = data.get('encoding', 'json')
+        interval = data.get('interval', Config.BASE_INTERVAL)
+
+        if method not in charting.DOWNSAMPLERS or encoding not in charting.ENCODINGS:
+            return jsonify({"error": "Unsupported downsampling method or encoding"}), 400
+        if max_points < 0:
+            return jsonify({"error": "max_points cannot be negative"}), 400
+        error = unsupported_interval(interval)
+        if error:
+            return error
         
         # Fetch historical data
-        df = fetch_historical_data(symbol, days)
+        df = fetch_historical_data(symbol, days, interval)
         
         if df is None or df.empty:
             return jsonify({"error": "No data available"}), 404
             
-        # Calculate SMAs
-        df['SMA20'] = df['Close'].rolling(window=20).mean()
-        df['SMA50'] = df['Close'].rolling(window=50).mean()
-            
-        # Convert NaN values to None (null in JSON)
-        def clean_nans(x):
-            return None if pd.isna(x) else float(x)
-            
-        # Prepare data for the chart
-        response_data = {
-            'timestamps': df.index.strftime('%Y-%m-%d %H:%M:%S').tolist(),
-            'prices': [clean_nans(x) for x in df['Close'].tolist()],
-            'sma20': [clean_nans(x) for x in df['SMA20'].tolist()],
-            'sma50': [clean_nans(x) for x in df['SMA50'].tolist()]
+        # Calculate SMAs over every bar, then thin out what the chart receives
+        key = indicators.fingerprint(df['Close'])
+        series = {
+            'prices': df['Close'].to_numpy(dtype=float),
+            'sma20': indicators.sma(df['Close'], 20, key).to_numpy(dtype=float),
+            'sma50': indicators.sma(df['Close'], 50, key).to_numpy(dtype=float)
         }
-        
-        return jsonify(response_data)
+        index, series = charting.downsample(df.index, series, max_points, method, reference='prices')
+
+        if encoding == 'binary':
+            body, layout = charting.encode(index, series, 'binary')
+            return body, 200, {
+                'Content-Type': 'application/octet-stream',
+                'X-Chart-Layout': json.dumps(layout)
+            }
+        return jsonify(charting.encode(index, series, encoding))
         
     except Exception as e:
         print(f"Error getting historical data: {str(e)}")
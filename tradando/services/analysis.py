@@ -0,0 +1,230 @@
+from typing import Callable, Dict, Any, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+import multiprocessing
+import logging
+import threading
+import time
+import pandas as pd
+from tradando.config import Config
+from tradando.services.backtest import Backtester
+from tradando.services.metrics import Observation, metrics
+from tradando.services.result_cache import result_cache, result_key
+from tradando.strategies.base import TradingStrategy
+from tradando.strategies.registry import strategy_registry
+from tradando.utils import prefetch_historical_data
+
+logger = logging.getLogger(__name__)
+
+_thread_pool = None
+_backtest_pool = None
+_pools_lock = threading.Lock()
+
+
+def _get_pools():
+    """Create the shared thread and backtest pools on first use"""
+    global _thread_pool, _backtest_pool
+    with _pools_lock:
+        if _thread_pool is None:
+            _thread_pool = ThreadPoolExecutor(max_workers=Config.ANALYZE_FETCH_WORKERS,
+                                              thread_name_prefix='analyze')
+        if _backtest_pool is None and Config.ANALYZE_BACKTEST_WORKERS > 1:
+            # spawn: forking a threaded web server can deadlock the children
+            _backtest_pool = ProcessPoolExecutor(max_workers=Config.ANALYZE_BACKTEST_WORKERS,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+    return _thread_pool, _backtest_pool
+
+
+def get_backtest_pool() -> Optional[ProcessPoolExecutor]:
+    """Shared process pool for CPU-bound backtests, None when running single-process"""
+    return _get_pools()[1]
+
+
+def _start_worker(_: int) -> None:
+    # Unpickling this call is what loads tradando in a fresh worker
+    return None
+
+
+def restart_backtest_pool():
+    """Replace the backtest workers with fresh ones, started and with empty caches.
+
+    Caches such as the indicator cache live in each worker process, so
+    clearing them in this process leaves the workers' copies warm.
+    """
+    global _backtest_pool
+    with _pools_lock:
+        old, _backtest_pool = _backtest_pool, None
+    if old is not None:
+        old.shutdown(wait=True)
+    pool = get_backtest_pool()
+    if pool is not None:
+        # One task per worker, so all of them are spawned now rather than while being timed
+        list(pool.map(_start_worker, range(Config.ANALYZE_BACKTEST_WORKERS)))
+
+
+def _run_backtest(strategy: TradingStrategy, data: pd.DataFrame) -> Tuple[Dict[str, Any], List[Observation]]:
+    # Timings taken in a worker process are shipped back and recorded by the caller
+    with metrics.capture() as observations:
+        result = Backtester(strategy).run(data)
+    return result, observations
+
+
+def run_backtests(tickers: List[str], strategies: Dict[str, TradingStrategy], days: int,
+                  timeout: Optional[float] = None,
+                  on_ticker: Optional[Callable[[int, str, List[Dict[str, Any]]], None]] = None,
+                  result_keys: Optional[List[str]] = None,
+                  interval: str = Config.BASE_INTERVAL) -> List[Dict[str, Any]]:
+    """Fetch every ticker and backtest every strategy on it concurrently.
+
+    Bars for all tickers come from one prefetch, which refreshes stale
+    tickers with batched bulk downloads. Backtests are handed to a process
+    pool (a thread pool when running single-process) ticker by ticker. A ticker whose backtests do
+    not finish within `timeout` seconds of being submitted is skipped, like
+    a ticker without data. Results come back in ticker then strategy
+    order, exactly as the serial loop produced them.
+    `on_ticker(position, symbol, results)` is called as each ticker
+    finishes, with an empty list for skipped tickers. Backtests whose bars
+    and strategy were seen before come from the result cache; their keys
+    are appended to `result_keys`, in result order, when it is given.
+    Bars of a longer `interval` are aggregated from the base bars.
+    """
+    timeout = Config.ANALYZE_TICKER_TIMEOUT if timeout is None else timeout
+    thread_pool, backtest_pool = _get_pools()
+    strategy_items = list(strategies.items())
+
+    # Each ticker keeps its own index and timezone, exactly as fetch_historical_data()
+    # returns it, so results and result cache keys match /backtest's
+    histories = prefetch_historical_data(tickers, days, interval)
+
+    slots: Dict[tuple, Dict[str, Any]] = {}
+    keys: Dict[tuple, str] = {}
+    pending = {}  # future -> (ticker position, strategy position)
+    deadlines: Dict[int, float] = {}
+    remaining: Dict[int, int] = {}  # ticker position -> backtests still running
+
+    def ticker_results(pos: int) -> List[Dict[str, Any]]:
+        results = []
+        for strategy_pos, (strategy_name, strategy) in enumerate(strategy_items):
+            result = slots.get((pos, strategy_pos))
+            if result is None:
+                continue
+            result['symbol'] = tickers[pos]
+            result['strategy'] = strategy.name
+            result['strategy_key'] = strategy_name
+            results.append(result)
+        return results
+
+    def finish(pos: int):
+        if on_ticker is not None:
+            on_ticker(pos, tickers[pos], ticker_results(pos))
+
+    for pos, symbol in enumerate(tickers):
+        data = histories.get(symbol)
+        if data is None or data.empty or not strategy_items:
+            finish(pos)
+            continue
+        deadlines[pos] = time.monotonic() + timeout
+        remaining[pos] = len(strategy_items)
+        for strategy_pos, (_, strategy) in enumerate(strategy_items):
+            key = keys[(pos, strategy_pos)] = result_key(data, strategy)
+            cached = result_cache.get(key)
+            if cached is not None:
+                slots[(pos, strategy_pos)] = cached
+                remaining[pos] -= 1
+                continue
+            pool = backtest_pool if backtest_pool is not None else thread_pool
+            pending[pool.submit(_run_backtest, strategy, data)] = (pos, strategy_pos)
+        if remaining[pos] == 0:
+            finish(pos)
+
+    while pending:
+        wait_for = max(0.0, min(deadlines[pos] for pos, _ in pending.values()) - time.monotonic())
+        done, _ = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+        for future in done:
+            pos, strategy_pos = pending.pop(future)
+            result, observations = future.result()
+            metrics.record_all(observations)
+            result_cache.put(keys[(pos, strategy_pos)], result)
+            slots[(pos, strategy_pos)] = result
+            remaining[pos] -= 1
+            if remaining[pos] == 0:
+                finish(pos)
+
+        now = time.monotonic()
+        expired = {pos for pos, _ in pending.values() if deadlines[pos] <= now}
+        for pos in expired:
+            logger.warning(f"Analysis of {tickers[pos]} timed out after {timeout}s, skipping")
+            for future, (future_pos, _) in list(pending.items()):
+                if future_pos == pos:
+                    future.cancel()
+                    del pending[future]
+            for strategy_pos in range(len(strategy_items)):
+                slots.pop((pos, strategy_pos), None)
+            finish(pos)
+
+    all_results = []
+    for pos in range(len(tickers)):
+        all_results.extend(ticker_results(pos))
+    if result_keys is not None:
+        result_keys.extend(keys[slot] for slot in sorted(slots))
+    return all_results
+
+
+def build_strategies(names: List[str], stop_loss: float, take_profit: float) -> Dict[str, TradingStrategy]:
+    """Strategy instances for the requested names, skipping unknown ones"""
+    return {
+        strategy_name: strategy_registry.instance(
+            strategy_name,
+            stop_loss_pct=stop_loss,
+            take_profit_pct=take_profit
+        )
+        for strategy_name in names if strategy_name in strategy_registry
+    }
+
+
+def summarize_results(all_results: List[Dict[str, Any]], strategies: List[str]) -> Optional[Dict[str, Any]]:
+    """The /analyze response: results ranked by return plus summary statistics, None if empty"""
+    if not all_results:
+        return None
+
+    total_profit = 0
+    for result in all_results:
+        total_profit += (result['final_value'] - result['initial_value'])
+
+    # Sort results by return percentage
+    all_results.sort(key=lambda x: x['return_pct'], reverse=True)
+    
+    # Enhanced summary statistics
+    strategy_stats = {}
+    for strategy_name in strategies:
+        strategy_results = [r for r in all_results if r['strategy_key'] == strategy_name]
+        if strategy_results:
+            avg_return = sum(r['return_pct'] for r in strategy_results) / len(strategy_results)
+            best_trade = max(strategy_results, key=lambda x: x['return_pct'])
+            worst_trade = min(strategy_results, key=lambda x: x['return_pct'])
+            
+            strategy_stats[strategy_name] = {
+                'avg_return': round(avg_return, 2),
+                'best_trade': {
+                    'symbol': best_trade['symbol'],
+                    'return': round(best_trade['return_pct'], 2)
+                },
+                'worst_trade': {
+                    'symbol': worst_trade['symbol'],
+                    'return': round(worst_trade['return_pct'], 2)
+                },
+                'total_trades': sum(r['n_trades'] for r in strategy_results),
+                'profit': sum(r['final_value'] - r['initial_value'] for r in strategy_results)
+            }
+    
+    return {
+        'summary': {
+            'total_profit': round(total_profit, 2),
+            'average_return_pct': round(sum(r['return_pct'] for r in all_results) / len(all_results), 2),
+            'best_performer': all_results[0]['symbol'],
+            'best_return_pct': round(all_results[0]['return_pct'], 2),
+            'analyzed_pairs': len(set(r['symbol'] for r in all_results)),
+            'strategy_stats': strategy_stats
+        },
+        'results': all_results
+    }
@@ -1,51 +1,139 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 from tradando.models.portfolio import Portfolio  # Use absolute import
 from tradando.strategies.base import TradingStrategy
+from tradando.services.execution import ExecutionModel
+from tradando.services.metrics import metrics
+import numpy as np
 import pandas as pd
 
+
+def find_trades(close: np.ndarray, signal: np.ndarray, start_index: int,
+                stop_loss_pct: float, take_profit_pct: float) -> List[Tuple[int, str, str]]:
+    """Locate the trades of an all-in long-only run over contiguous arrays.
+
+    Mirrors the bar-by-bar loop: while holding, stop loss / take profit are
+    checked before the sell signal, and a bar that closes a position never
+    opens a new one. Instead of visiting every bar, each position jumps to
+    the next buy candidate and scans only the bars up to the next sell signal.
+    Returns (bar index, 'buy'/'sell', reason) tuples in execution order.
+    """
+    n = len(close)
+    buys = np.flatnonzero(signal[start_index:] > 0) + start_index
+    sells = np.flatnonzero(signal < 0)
+    trades = []
+    i = start_index
+
+    while True:
+        k = np.searchsorted(buys, i)
+        if k == len(buys):
+            break
+        entry = int(buys[k])
+        entry_price = close[entry]
+        trades.append((entry, 'buy', 'signal'))
+
+        s = np.searchsorted(sells, entry + 1)
+        end = int(sells[s]) if s < len(sells) else n
+        window = close[entry + 1:end + 1]
+        change = ((window - entry_price) / entry_price) * 100
+        hit = (change <= -stop_loss_pct) | (change >= take_profit_pct)
+
+        if hit.any():
+            offset = int(hit.argmax())
+            exit_index = entry + 1 + offset
+            reason = 'stop_loss' if change[offset] <= -stop_loss_pct else 'take_profit'
+        elif end < n:
+            exit_index = end
+            reason = 'signal'
+        else:
+            break
+
+        trades.append((exit_index, 'sell', reason))
+        i = exit_index + 1
+
+    return trades
+
+
+def summarize_trades(close: np.ndarray, trades: List[Tuple[int, str, str]], initial_value: float) -> Dict[str, Any]:
+    """Summarize an all-in run from its trade list without replaying a Portfolio"""
+    value = initial_value
+    entry = None
+    for i, trade_type, _ in trades:
+        if trade_type == 'buy':
+            entry = close[i]
+        else:
+            value = value / entry * close[i]
+            entry = None
+    if entry is not None:
+        value = value / entry * close[-1]
+
+    reasons = [reason for _, _, reason in trades]
+    return {
+        'final_value': round(float(value), 2),
+        'return_pct': round(float((value - initial_value) / initial_value * 100), 2),
+        'n_trades': len(trades),
+        'n_stop_losses': reasons.count('stop_loss'),
+        'n_take_profits': reasons.count('take_profit'),
+        'n_signal_trades': reasons.count('signal'),
+    }
+
+
 class Backtester:
-    def __init__(self, strategy: TradingStrategy):
+    MODES = ('loop', 'vectorized')
+
+    def __init__(self, strategy: TradingStrategy, mode: str = 'vectorized',
+                 execution: Optional[ExecutionModel] = None):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown backtest mode: {mode}")
         self.strategy = strategy
+        self.mode = mode
+        # Without an execution model, exits are checked and filled at Close
+        self.execution = execution
 
-    def run(self, data: pd.DataFrame, initial_value: float = 10000) -> Dict[str, Any]:
-        """Run backtest with the given strategy"""
-        portfolio = Portfolio(initial_value)
-        df = self.strategy.generate_signals(data)
-        
-        # Get the minimum required periods from the strategy
-        start_index = max(
+    def start_index(self) -> int:
+        """Get the minimum required periods from the strategy"""
+        return max(
             getattr(self.strategy, 'fast_period', 20),
             getattr(self.strategy, 'slow_period', 50)
         )
-        
-        for i in range(start_index, len(df)):
-            current_price = float(df['Close'].iloc[i])
-            current_time = df.index[i]
-            
-            # Check exit conditions if we have a position
-            if portfolio.holdings > 0:
-                exit_check = self.strategy.check_exit_conditions(
-                    current_price, 
-                    portfolio.entry_price
-                )
-                
-                if exit_check['exit']:
-                    portfolio.execute_trade('sell', current_price, current_time, exit_check['reason'])
-                    continue
-            
-            # Check strategy signals
-            signal = df['signal'].iloc[i]
-            
-            if signal > 0 and portfolio.cash > 0:
-                portfolio.execute_trade('buy', current_price, current_time)
-            elif signal < 0 and portfolio.holdings > 0:
-                portfolio.execute_trade('sell', current_price, current_time)
-        
+
+    def run(self, data: pd.DataFrame, initial_value: float = 10000) -> Dict[str, Any]:
+        """Run backtest with the given strategy"""
+        strategy_label = type(self.strategy).__name__
+        with metrics.timer('tradando_backtest_seconds', strategy=strategy_label, mode=self.mode):
+            portfolio = Portfolio(initial_value, self.execution.fee_pct if self.execution else 0.0)
+            with metrics.timer('tradando_signal_seconds', strategy=strategy_label):
+                df = self.strategy.generate_signals(data)
+            return self._run(df, portfolio, initial_value, data)
+
+    def _run(self, df: pd.DataFrame, portfolio: Portfolio, initial_value: float,
+             data: Optional[pd.DataFrame] = None) -> Dict[str, Any]:
+        """Trade the signal frame through the portfolio and summarize it"""
+        start_index = self.start_index()
+
+        # The vectorized engine reproduces the base stop loss / take profit
+        # rules; strategies overriding them fall back to the loop.
+        uses_base_exits = (type(self.strategy).check_exit_conditions
+                           is TradingStrategy.check_exit_conditions)
+
+        if self.execution is not None and uses_base_exits:
+            # Intrabar exits read Open/High/Low, which the signal frame does not carry
+            bars = ExecutionModel.bars(data if data is not None else df)
+            if self.mode == 'vectorized':
+                self._run_intrabar_vectorized(df, bars, portfolio, start_index)
+            else:
+                self._run_intrabar_loop(df, bars, portfolio, start_index)
+        elif self.mode == 'vectorized' and uses_base_exits:
+            self._run_vectorized(df, portfolio, start_index)
+        else:
+            self._run_loop(df, portfolio, start_index)
+
         # Calculate final results
         final_price = float(df['Close'].iloc[-1])
         final_value = portfolio.get_current_value(final_price)
-        
+
         stats = portfolio.get_statistics()
+        if self.execution is not None:
+            stats['fees'] = round(portfolio.fees_paid, 2)
         return {
             'initial_value': initial_value,
             'final_value': round(final_value, 2),
@@ -56,3 +144,78 @@ class Backtester:
             'cash': round(portfolio.cash, 2),
             **stats
         }
+
+    def _run_loop(self, df: pd.DataFrame, portfolio: Portfolio, start_index: int):
+        """Walk every bar and trade through the portfolio"""
+        for i in range(start_index, len(df)):
+            current_price = float(df['Close'].iloc[i])
+            current_time = df.index[i]
+
+            # Check exit conditions if we have a position
+            if portfolio.holdings > 0:
+                exit_check = self.strategy.check_exit_conditions(
+                    current_price,
+                    portfolio.entry_price
+                )
+
+                if exit_check['exit']:
+                    portfolio.execute_trade('sell', self._sell_price(current_price), current_time,
+                                            exit_check['reason'])
+                    continue
+
+            # Check strategy signals
+            signal = df['signal'].iloc[i]
+
+            if signal > 0 and portfolio.cash > 0:
+                portfolio.execute_trade('buy', self._buy_price(current_price), current_time)
+            elif signal < 0 and portfolio.holdings > 0:
+                portfolio.execute_trade('sell', self._sell_price(current_price), current_time)
+
+    def _buy_price(self, price: float) -> float:
+        return self.execution.buy_price(price) if self.execution else price
+
+    def _sell_price(self, price: float) -> float:
+        return self.execution.sell_price(price) if self.execution else price
+
+    def _run_vectorized(self, df: pd.DataFrame, portfolio: Portfolio, start_index: int):
+        """Find trades over NumPy arrays and replay only those into the portfolio"""
+        close = df['Close'].to_numpy(dtype=float)
+        signal = df['signal'].to_numpy()
+        trades = find_trades(close, signal, start_index,
+                             self.strategy.stop_loss_pct, self.strategy.take_profit_pct)
+
+        for i, trade_type, reason in trades:
+            portfolio.execute_trade(trade_type, float(close[i]), df.index[i], reason)
+
+    def _run_intrabar_loop(self, df: pd.DataFrame, bars: Dict[str, np.ndarray], portfolio: Portfolio,
+                           start_index: int):
+        """Walk every bar, checking exits against its Open/High/Low through the execution model"""
+        execution = self.execution
+        bar_open, high, low, close = bars['Open'], bars['High'], bars['Low'], bars['Close']
+        signal = df['signal'].to_numpy()
+        peak = None
+
+        for i in range(start_index, len(df)):
+            current_time = df.index[i]
+            if portfolio.holdings > 0:
+                exit_fill = execution.check_exit(bar_open[i], high[i], low[i], portfolio.entry_price, peak,
+                                                 self.strategy.stop_loss_pct, self.strategy.take_profit_pct)
+                if exit_fill is not None:
+                    reason, price = exit_fill
+                    portfolio.execute_trade('sell', price, current_time, reason)
+                    continue
+                peak = float(np.fmax(peak, high[i]))
+
+            if signal[i] > 0 and portfolio.cash > 0:
+                portfolio.execute_trade('buy', execution.buy_price(float(close[i])), current_time)
+                peak = portfolio.entry_price
+            elif signal[i] < 0 and portfolio.holdings > 0:
+                portfolio.execute_trade('sell', execution.sell_price(float(close[i])), current_time)
+
+    def _run_intrabar_vectorized(self, df: pd.DataFrame, bars: Dict[str, np.ndarray], portfolio: Portfolio,
+                                 start_index: int):
+        """Find intrabar trades over NumPy arrays and replay only those into the portfolio"""
+        trades = self.execution.find_trades(bars, df['signal'].to_numpy(), start_index,
+                                            self.strategy.stop_loss_pct, self.strategy.take_profit_pct)
+        for i, trade_type, reason, price in trades:
+            portfolio.execute_trade(trade_type, float(price), df.index[i], reason)
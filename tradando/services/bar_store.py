@@ -0,0 +1,240 @@
+from typing import Callable, Dict, List, Optional, Tuple
+from datetime import datetime
+import json
+import logging
+import os
+import re
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# fetcher(symbol, start, end, interval) -> DataFrame indexed by timestamp
+Fetcher = Callable[[str, datetime, datetime, str], Optional[pd.DataFrame]]
+# bulk_fetcher(symbols, start, end, interval) -> {symbol: DataFrame} for the symbols it got
+BulkFetcher = Callable[[List[str], datetime, datetime, str], Dict[str, pd.DataFrame]]
+
+# Every stored frame has these columns, whichever fetcher filled it. yf.download() leaves out
+# the corporate action columns Ticker.history() returns; a bar without one had none.
+COLUMNS = ('Open', 'High', 'Low', 'Close', 'Volume', 'Dividends', 'Stock Splits')
+EVENT_COLUMNS = ['Dividends', 'Stock Splits']
+
+
+def _as_utc(ts) -> pd.Timestamp:
+    """Interpret naive datetimes as local time and convert to UTC"""
+    ts = pd.Timestamp(ts)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize(datetime.now().astimezone().tzinfo)
+    return ts.tz_convert('UTC')
+
+
+class BarStore:
+    """On-disk OHLCV cache keyed by (symbol, interval).
+
+    Each key is stored as a single structured NumPy array (int64 UTC
+    nanosecond timestamps plus one float64 field per column) that is read
+    back memory-mapped, with a small JSON sidecar recording the timezone and
+    how much history has been fetched. Only bars older than the cached range
+    or newer than the last cached bar are requested from the fetcher.
+    With a `bulk_fetcher`, get_many() refreshes many symbols in one call.
+    """
+
+    def __init__(self, root: str, fetcher: Fetcher, refresh_seconds: float = 60,
+                 bulk_fetcher: Optional[BulkFetcher] = None):
+        self.root = root
+        self.fetcher = fetcher
+        self.bulk_fetcher = bulk_fetcher
+        self.refresh_seconds = refresh_seconds
+        self._locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock_for(self, key: Tuple[str, str]) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _paths(self, symbol: str, interval: str) -> Tuple[str, str]:
+        name = re.sub(r'[^A-Za-z0-9._-]', '_', symbol)
+        base = os.path.join(self.root, interval, name)
+        return base + '.npy', base + '.json'
+
+    def _load_meta(self, symbol: str, interval: str) -> Dict:
+        _, meta_path = self._paths(symbol, interval)
+        try:
+            with open(meta_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _load(self, symbol: str, interval: str) -> Tuple[Optional[pd.DataFrame], Dict]:
+        data_path, meta_path = self._paths(symbol, interval)
+        if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+            return None, {}
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            bars = np.load(data_path, mmap_mode='r')
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable cache for {symbol} ({interval}): {e}")
+            return None, {}
+
+        index = pd.to_datetime(np.asarray(bars['ts']), utc=True).tz_convert(meta['tz'])
+        columns = {name: np.array(bars[name]) for name in bars.dtype.names if name != 'ts'}
+        # Stores written before the columns were fixed are brought to the same shape
+        return self._conform(pd.DataFrame(columns, index=index)), meta
+
+    def _save(self, symbol: str, interval: str, df: pd.DataFrame, meta: Dict):
+        data_path, meta_path = self._paths(symbol, interval)
+        os.makedirs(os.path.dirname(data_path), exist_ok=True)
+
+        bars = np.empty(len(df), dtype=[('ts', '<i8')] + [(str(c), '<f8') for c in df.columns])
+        bars['ts'] = df.index.tz_convert('UTC').as_unit('ns').asi8
+        for column in df.columns:
+            bars[str(column)] = df[column].to_numpy(dtype=float)
+
+        # Write then rename so readers never see a partial file
+        with open(data_path + '.tmp', 'wb') as f:
+            np.save(f, bars)
+        os.replace(data_path + '.tmp', data_path)
+        with open(meta_path + '.tmp', 'w') as f:
+            json.dump(meta, f)
+        os.replace(meta_path + '.tmp', meta_path)
+
+    @staticmethod
+    def _conform(df: pd.DataFrame) -> pd.DataFrame:
+        """Exactly COLUMNS, as floats, with missing corporate actions as zero"""
+        df = df.reindex(columns=list(COLUMNS)).astype(float)
+        df[EVENT_COLUMNS] = df[EVENT_COLUMNS].fillna(0.0)
+        return df
+
+    @classmethod
+    def _normalize(cls, df: Optional[pd.DataFrame]) -> Optional[pd.DataFrame]:
+        if df is None or df.empty:
+            return None
+        if df.index.tz is None:
+            df = df.tz_localize('UTC')
+        return cls._conform(df)
+
+    def _fetch(self, symbol: str, start, end, interval: str) -> Optional[pd.DataFrame]:
+        return self._normalize(self.fetcher(symbol, start, end, interval))
+
+    @staticmethod
+    def _merge(cached: pd.DataFrame, parts: List[pd.DataFrame]) -> pd.DataFrame:
+        merged = pd.concat([cached] + [p.tz_convert(cached.index.tz) for p in parts])
+        return merged[~merged.index.duplicated(keep='last')].sort_index()
+
+    def get(self, symbol: str, start: datetime, end: datetime, interval: str = '5m') -> Optional[pd.DataFrame]:
+        """Get bars in [start, end], topping up the cache from the fetcher"""
+        start_utc, end_utc = _as_utc(start), _as_utc(end)
+
+        with self._lock_for((symbol, interval)):
+            cached, meta = self._load(symbol, interval)
+            parts = []
+            dirty = False
+
+            if cached is None or cached.empty:
+                fresh = self._fetch(symbol, start, end, interval)
+                if fresh is None:
+                    return None
+                cached = fresh
+                meta = {'tz': str(fresh.index.tz), 'fetched_at': time.time()}
+                covered_from = start_utc
+                dirty = True
+            else:
+                covered_from = pd.Timestamp(meta['covered_from'], tz='UTC')
+                if start_utc < covered_from:
+                    older = self._safe_fetch(symbol, start, cached.index[0], interval)
+                    if older is not None:
+                        parts.append(older)
+                    covered_from = start_utc
+                    dirty = True
+                if time.time() - meta['fetched_at'] >= self.refresh_seconds:
+                    # Refetch the last cached bar too, it may still have been forming
+                    newer = self._safe_fetch(symbol, cached.index[-1], end, interval)
+                    if newer is not None:
+                        parts.append(newer)
+                    meta['fetched_at'] = time.time()
+                    dirty = True
+
+            if dirty:
+                cached = self._merge(cached, parts)
+                meta['covered_from'] = int(covered_from.value)
+                self._save(symbol, interval, cached, meta)
+
+        window = cached[(cached.index >= start_utc) & (cached.index <= end_utc)]
+        return window if not window.empty else None
+
+    def _safe_fetch(self, symbol: str, start, end, interval: str) -> Optional[pd.DataFrame]:
+        """Fetch a top-up range, serving the cache alone if the upstream fails"""
+        try:
+            return self._fetch(symbol, start, end, interval)
+        except Exception as e:
+            logger.warning(f"Top-up fetch failed for {symbol} ({interval}), serving cache: {e}")
+            return None
+
+    def _refresh_from(self, symbol: str, interval: str, start_utc: pd.Timestamp) -> Optional[pd.Timestamp]:
+        """Where a refresh of `symbol` has to fetch from, or None if its cache is fresh.
+
+        A cache covering `start_utc` only needs topping up from its last bar,
+        like get() does; one that does not reach back that far, or is empty,
+        needs the whole range.
+        """
+        meta = self._load_meta(symbol, interval)
+        if 'covered_from' not in meta or start_utc < pd.Timestamp(meta['covered_from'], tz='UTC'):
+            return start_utc
+        if time.time() - meta['fetched_at'] < self.refresh_seconds:
+            return None
+        cached, _ = self._load(symbol, interval)
+        return cached.index[-1] if cached is not None and not cached.empty else start_utc
+
+    def get_many(self, symbols: List[str], start: datetime, end: datetime,
+                 interval: str = '5m') -> Dict[str, Optional[pd.DataFrame]]:
+        """Get bars for several symbols, refreshing the stale ones with bulk fetches.
+
+        Symbols whose cache covers the range are topped up together from
+        the earliest of their last cached bars; the rest get one full-range
+        fetch. Symbols the bulk fetches do not return fall back to get()'s
+        own per-symbol fetch.
+        """
+        start_utc = _as_utc(start)
+        refresh_from = {}
+        for symbol in symbols:
+            since = self._refresh_from(symbol, interval, start_utc)
+            if since is not None:
+                refresh_from[symbol] = since
+
+        if refresh_from and self.bulk_fetcher is not None:
+            full = [s for s, since in refresh_from.items() if since == start_utc]
+            top_up = [s for s, since in refresh_from.items() if since != start_utc]
+            if full:
+                self._bulk_refresh(full, start, start_utc, end, interval)
+            if top_up:
+                since = min(refresh_from[s] for s in top_up)
+                self._bulk_refresh(top_up, since.to_pydatetime(), since, end, interval)
+
+        return {symbol: self.get(symbol, start, end, interval) for symbol in symbols}
+
+    def _bulk_refresh(self, symbols: List[str], start: datetime, start_utc: pd.Timestamp, end: datetime,
+                      interval: str):
+        """Fetch [start, end] for `symbols` in one bulk call and merge it into their caches"""
+        try:
+            fresh = self.bulk_fetcher(symbols, start, end, interval)
+        except Exception as e:
+            logger.warning(f"Bulk fetch of {len(symbols)} symbols ({interval}) failed: {e}")
+            return
+
+        for symbol in symbols:
+            df = self._normalize(fresh.get(symbol))
+            if df is None:
+                continue
+            with self._lock_for((symbol, interval)):
+                cached, meta = self._load(symbol, interval)
+                covered_from = start_utc
+                if cached is not None and not cached.empty:
+                    # Older history stays covered only if it joins up with the new bars
+                    if cached.index[-1] >= start_utc and 'covered_from' in meta:
+                        covered_from = min(start_utc, pd.Timestamp(meta['covered_from'], tz='UTC'))
+                    df = self._merge(cached, [df])
+                self._save(symbol, interval, df, {'tz': str(df.index.tz), 'fetched_at': time.time(),
+                                                  'covered_from': int(covered_from.value)})
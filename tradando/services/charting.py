@@ -0,0 +1,115 @@
+from typing import Dict, Any, List, Tuple
+import base64
+import numpy as np
+import pandas as pd
+
+DOWNSAMPLERS = ('lttb', 'minmax')
+ENCODINGS = ('json', 'base64', 'binary')
+
+
+def _bucket_edges(n: int, n_buckets: int) -> np.ndarray:
+    """Edges splitting bars 1..n-2 into equal buckets, first and last bars kept apart"""
+    return np.linspace(1, n - 1, n_buckets + 1).astype(int)
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: indices of `n_out` points preserving the visual shape.
+
+    A budget below 3 leaves no bucket between the first and last point,
+    so only those two are returned.
+    """
+    n = len(y)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1])
+
+    # Missing values would poison the triangle areas
+    y = pd.Series(y).ffill().bfill().to_numpy(dtype=float)
+    edges = _bucket_edges(n, n_out - 2)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+
+    for b in range(n_out - 2):
+        start, end = edges[b], edges[b + 1]
+        if b + 2 < len(edges):
+            next_x, next_y = x[edges[b + 1]:edges[b + 2]].mean(), y[edges[b + 1]:edges[b + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        areas = np.abs((x[previous] - next_x) * (y[start:end] - y[previous])
+                       - (x[previous] - x[start:end]) * (next_y - y[previous]))
+        previous = start + int(areas.argmax())
+        selected[b + 1] = previous
+
+    return selected
+
+
+def minmax(y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices of the minimum and maximum of each of `n_out // 2` buckets, in time order.
+
+    A budget below 4 leaves no bucket, so only the first and last point are returned.
+    """
+    n = len(y)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 4:
+        return np.array([0, n - 1])
+
+    filled = pd.Series(y).ffill().bfill().to_numpy(dtype=float)
+    edges = _bucket_edges(n, (n_out - 2) // 2)
+    lows = [start + int(filled[start:end].argmin()) for start, end in zip(edges[:-1], edges[1:])]
+    highs = [start + int(filled[start:end].argmax()) for start, end in zip(edges[:-1], edges[1:])]
+    return np.unique(np.concatenate(([0, n - 1], lows, highs)))
+
+
+def downsample(index: pd.DatetimeIndex, series: Dict[str, np.ndarray], max_points: int,
+               method: str = 'lttb', reference: str = None) -> Tuple[pd.DatetimeIndex, Dict[str, np.ndarray]]:
+    """Keep at most `max_points` bars, chosen on the `reference` series and applied to all"""
+    if method not in DOWNSAMPLERS:
+        raise ValueError(f"Unknown downsampling method: {method}")
+    if not max_points or max_points >= len(index):
+        return index, series
+
+    values = series[reference or next(iter(series))]
+    if method == 'lttb':
+        keep = lttb(index.as_unit('ns').asi8.astype(float), values, max_points)
+    else:
+        keep = minmax(values, max_points)
+    return index[keep], {name: column[keep] for name, column in series.items()}
+
+
+def _nullable(values: np.ndarray) -> List:
+    """Floats as a list with NaN replaced by None"""
+    return [None if v != v else v for v in values.tolist()]
+
+
+def encode(index: pd.DatetimeIndex, series: Dict[str, np.ndarray], encoding: str = 'json'):
+    """Chart payload in the requested encoding.
+
+    'json' keeps the original shape: '%Y-%m-%d %H:%M:%S' strings and float
+    lists with nulls. 'base64' and 'binary' are columnar: little-endian
+    uint32 epoch seconds and float32 values (NaN for missing), as base64
+    strings in a JSON object or concatenated in one octet-stream body
+    described by the returned layout.
+    """
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unknown encoding: {encoding}")
+
+    if encoding == 'json':
+        payload = {'timestamps': index.strftime('%Y-%m-%d %H:%M:%S').tolist()}
+        payload.update({name: _nullable(values) for name, values in series.items()})
+        return payload
+
+    columns = {'timestamps': (index.as_unit('ns').asi8 // 10 ** 9).astype('<u4')}
+    columns.update({name: np.asarray(values, dtype='<f4') for name, values in series.items()})
+    layout = [{'name': name, 'dtype': column.dtype.str} for name, column in columns.items()]
+
+    if encoding == 'base64':
+        return {
+            'encoding': 'base64',
+            'length': len(index),
+            'columns': layout,
+            **{name: base64.b64encode(column.tobytes()).decode('ascii') for name, column in columns.items()}
+        }
+    return b''.join(column.tobytes() for column in columns.values()), {'length': len(index), 'columns': layout}
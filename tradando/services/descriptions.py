@@ -0,0 +1,127 @@
+from typing import Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from tradando.strategies.base import TradingStrategy
+
+logger = logging.getLogger(__name__)
+
+
+def strategy_params(strategy: TradingStrategy) -> Dict[str, Any]:
+    """Public scalar attributes that identify a configured strategy"""
+    return {k: v for k, v in sorted(vars(strategy).items())
+            if not k.startswith('_') and isinstance(v, (int, float, str))}
+
+
+class DescriptionService:
+    """LLM-written strategy descriptions that never block a request.
+
+    get() answers from an in-process cache, then an on-disk cache keyed by
+    strategy class and parameters; on a miss it queues generation on a
+    background thread and returns the fallback text straight away. Requests
+    go through one pooled session with connect/read timeouts, and a failed
+    generation is not retried for `retry_seconds`. `api_url` can point at a
+    local stand-in server.
+    """
+
+    def __init__(self, api_url: str, api_key: Optional[str], model: str, cache_dir: str,
+                 timeout=(2, 10), retry_seconds: float = 300):
+        self.api_url = api_url
+        self.model = model
+        self.cache_dir = cache_dir
+        self.timeout = timeout
+        self.retry_seconds = retry_seconds
+
+        self.session = requests.Session()
+        self.session.mount('http://', HTTPAdapter(pool_maxsize=4, max_retries=0))
+        self.session.mount('https://', HTTPAdapter(pool_maxsize=4, max_retries=0))
+        if api_key:
+            self.session.headers['Authorization'] = f"Bearer {api_key}"
+
+        self._cache: Dict[str, str] = {}
+        self._pending = set()
+        self._failed_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='describe')
+
+    def key(self, strategy: TradingStrategy) -> str:
+        identity = {'class': type(strategy).__name__, 'params': strategy_params(strategy)}
+        return hashlib.sha1(json.dumps(identity, sort_keys=True).encode()).hexdigest()
+
+    @staticmethod
+    def fallback(strategy: TradingStrategy) -> str:
+        return f"{strategy.name}: {strategy.description}."
+
+    @staticmethod
+    def prompt(strategy: TradingStrategy) -> str:
+        return (f"This is a cryptocurrency trading strategy called {strategy.name}:\n"
+                f"- {strategy.description}\n"
+                f"- Positions are closed at a {strategy.stop_loss_pct}% stop loss "
+                f"or a {strategy.take_profit_pct}% take profit\n")
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _load(self, key: str) -> Optional[str]:
+        try:
+            with open(self._path(key)) as f:
+                return json.load(f)['text']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _save(self, key: str, text: str):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        with open(path + '.tmp', 'w') as f:
+            json.dump({'text': text, 'created_at': time.time()}, f)
+        os.replace(path + '.tmp', path)
+
+    def get(self, strategy: TradingStrategy) -> str:
+        """Cached description, or the fallback while one is being generated"""
+        key = self.key(strategy)
+        with self._lock:
+            if key in self._cache:
+                return self._cache[key]
+
+        text = self._load(key)
+        with self._lock:
+            if text is not None:
+                self._cache[key] = text
+                return text
+            recently_failed = time.time() - self._failed_at.get(key, float('-inf')) < self.retry_seconds
+            if key not in self._pending and not recently_failed:
+                self._pending.add(key)
+                self._executor.submit(self._generate, key, self.prompt(strategy))
+        return self.fallback(strategy)
+
+    def _generate(self, key: str, prompt: str):
+        try:
+            response = self.session.post(f"{self.api_url}{self.model}", json={"inputs": prompt},
+                                         timeout=self.timeout)
+            response.raise_for_status()
+            text = response.json()[0]['generated_text']
+        except Exception as e:
+            logger.warning(f"Strategy description generation failed: {e}")
+            with self._lock:
+                self._failed_at[key] = time.time()
+                self._pending.discard(key)
+            return
+
+        with self._lock:
+            self._cache[key] = text
+            self._failed_at.pop(key, None)
+            self._pending.discard(key)
+        try:
+            self._save(key, text)
+        except OSError as e:
+            logger.warning(f"Could not cache strategy description on disk: {e}")
+
+    def wait(self):
+        """Block until queued generations finish"""
+        self._executor.submit(lambda: None).result()
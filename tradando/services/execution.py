@@ -0,0 +1,121 @@
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+
+class ExecutionModel:
+    """How orders fill: intrabar stop loss / take profit / trailing stop, slippage and fees.
+
+    Entries fill at the signal bar's close. While a position is open, each
+    later bar's Low is checked against the stop level and its High against
+    the take-profit level, so exits trigger inside the bar and fill at the
+    level itself, or at the Open when the bar gaps through it. When a bar
+    touches both levels the stop is assumed to come first. The trailing
+    stop follows the highest High since entry, as of the previous bar.
+    Every fill is moved against the trade by `slippage_pct`, and
+    `fee_pct` of each trade's notional is charged on both sides. Bars
+    without Open/High/Low fall back to Close, which reproduces the
+    Close-only rules.
+    """
+
+    def __init__(self, trailing_stop_pct: Optional[float] = None, slippage_pct: float = 0.0,
+                 fee_pct: float = 0.0):
+        if trailing_stop_pct is not None and trailing_stop_pct <= 0:
+            raise ValueError("trailing_stop_pct must be positive")
+        if slippage_pct < 0 or fee_pct < 0:
+            raise ValueError("slippage_pct and fee_pct cannot be negative")
+        self.trailing_stop_pct = trailing_stop_pct
+        self.slippage_pct = slippage_pct
+        self.fee_pct = fee_pct
+
+    def buy_price(self, price: float) -> float:
+        return price * (1 + self.slippage_pct / 100)
+
+    def sell_price(self, price: float) -> float:
+        return price * (1 - self.slippage_pct / 100)
+
+    @staticmethod
+    def bars(data: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Open/High/Low/Close arrays, with Close standing in for missing columns"""
+        close = data['Close'].to_numpy(dtype=float)
+        return {column: data[column].to_numpy(dtype=float) if column in data else close
+                for column in ('Open', 'High', 'Low', 'Close')}
+
+    def stop_level(self, entry_price: float, peak: float, stop_loss_pct: float) -> Tuple[float, str]:
+        """The active stop and its reason, given the highest price seen before this bar"""
+        stop = entry_price * (1 - stop_loss_pct / 100)
+        if self.trailing_stop_pct is not None:
+            trailing = peak * (1 - self.trailing_stop_pct / 100)
+            if trailing > stop:
+                return trailing, 'trailing_stop'
+        return stop, 'stop_loss'
+
+    def check_exit(self, bar_open: float, high: float, low: float, entry_price: float, peak: float,
+                   stop_loss_pct: float, take_profit_pct: float) -> Optional[Tuple[str, float]]:
+        """(reason, fill price) if this bar exits the position, for the bar-by-bar engine"""
+        stop, stop_reason = self.stop_level(entry_price, peak, stop_loss_pct)
+        take = entry_price * (1 + take_profit_pct / 100)
+        stop_hit, take_hit = low <= stop, high >= take
+        if take_hit and not (stop_hit and bar_open < take):
+            return 'take_profit', self.sell_price(max(bar_open, take))
+        if stop_hit:
+            return stop_reason, self.sell_price(min(bar_open, stop))
+        return None
+
+    def find_trades(self, bars: Dict[str, np.ndarray], signal: np.ndarray, start_index: int,
+                    stop_loss_pct: float, take_profit_pct: float) -> List[Tuple[int, str, str, float]]:
+        """Locate the trades of an all-in long-only run, like backtest.find_trades.
+
+        Each position jumps to the next buy signal and scans only the bars
+        up to the next sell signal, all levels for the span computed at
+        once. Returns (bar index, 'buy'/'sell', reason, fill price) tuples.
+        """
+        bar_open, high, low, close = bars['Open'], bars['High'], bars['Low'], bars['Close']
+        n = len(close)
+        buys = np.flatnonzero(signal[start_index:] > 0) + start_index
+        sells = np.flatnonzero(signal < 0)
+        trades = []
+        i = start_index
+
+        while True:
+            k = np.searchsorted(buys, i)
+            if k == len(buys):
+                break
+            entry = int(buys[k])
+            entry_price = self.buy_price(close[entry])
+            trades.append((entry, 'buy', 'signal', entry_price))
+
+            s = np.searchsorted(sells, entry + 1)
+            end = int(sells[s]) if s < len(sells) else n
+            span = slice(entry + 1, end + 1)
+            stop = entry_price * (1 - stop_loss_pct / 100)
+            take = entry_price * (1 + take_profit_pct / 100)
+            span_open, span_high, span_low = bar_open[span], high[span], low[span]
+
+            if self.trailing_stop_pct is not None and len(span_high):
+                peak = np.empty(len(span_high))
+                peak[0] = entry_price
+                np.fmax.accumulate(np.fmax(span_high[:-1], entry_price), out=peak[1:])
+                stop = np.maximum(peak * (1 - self.trailing_stop_pct / 100), stop)
+            stop_hit = span_low <= stop
+            take_hit = span_high >= take
+            hit = stop_hit | take_hit
+
+            if hit.any():
+                offset = int(hit.argmax())
+                exit_index = entry + 1 + offset
+                level = stop[offset] if isinstance(stop, np.ndarray) else stop
+                if take_hit[offset] and not (stop_hit[offset] and span_open[offset] < take):
+                    reason, price = 'take_profit', max(span_open[offset], take)
+                else:
+                    trailing = isinstance(stop, np.ndarray) and level > entry_price * (1 - stop_loss_pct / 100)
+                    reason, price = 'trailing_stop' if trailing else 'stop_loss', min(span_open[offset], level)
+            elif end < n:
+                exit_index, reason, price = end, 'signal', close[end]
+            else:
+                break
+
+            trades.append((exit_index, 'sell', reason, self.sell_price(price)))
+            i = exit_index + 1
+
+        return trades
@@ -0,0 +1,111 @@
+from typing import Callable, Optional, Tuple
+from collections import OrderedDict
+import hashlib
+import threading
+import pandas as pd
+from tradando.config import Config
+from tradando.services import kernels
+
+
+def fingerprint(series: pd.Series) -> str:
+    """Content hash of a series' values and index"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(series.to_numpy(dtype=float).tobytes())
+    index = series.index
+    if isinstance(index, pd.DatetimeIndex):
+        digest.update(index.asi8.tobytes())
+        digest.update(str(index.tz).encode())
+    else:
+        digest.update(pd.util.hash_pandas_object(index, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _nbytes(value) -> int:
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True).sum())
+    return int(value.memory_usage(index=True))
+
+
+class IndicatorCache:
+    """Process-wide LRU of computed indicator series.
+
+    Entries are keyed by (data fingerprint, indicator, params) and evicted
+    least recently used first once their total size exceeds `max_bytes`.
+    Cached series are shared between callers and must not be modified.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries: 'OrderedDict[tuple, object]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple, compute: Callable[[], object]):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        value = compute()
+        size = _nbytes(value)
+        if size > self.max_bytes:
+            return value
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = value
+                self.nbytes += size
+                while self.nbytes > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self.nbytes -= _nbytes(evicted)
+            return self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+indicator_cache = IndicatorCache(Config.INDICATOR_CACHE_MAX_BYTES)
+
+
+def _series(values, like: pd.Series) -> pd.Series:
+    return pd.Series(values, index=like.index, copy=False)
+
+
+def sma(close: pd.Series, window: int, key: Optional[str] = None) -> pd.Series:
+    """Simple moving average"""
+    key = key or fingerprint(close)
+    return indicator_cache.get((key, 'sma', window),
+                               lambda: _series(kernels.rolling_mean(close.to_numpy(dtype=float), window), close))
+
+
+def ema(close: pd.Series, span: int, key: Optional[str] = None) -> pd.Series:
+    """Exponential moving average, not bias adjusted"""
+    key = key or fingerprint(close)
+    return indicator_cache.get((key, 'ema', span),
+                               lambda: _series(kernels.ema(close.to_numpy(dtype=float), span), close))
+
+
+def rsi(close: pd.Series, period: int, key: Optional[str] = None) -> pd.Series:
+    """RSI from simple rolling means of gains and losses"""
+    key = key or fingerprint(close)
+    return indicator_cache.get((key, 'rsi', period),
+                               lambda: _series(kernels.rsi(close.to_numpy(dtype=float), period), close))
+
+
+def macd(close: pd.Series, fast: int, slow: int, signal: int,
+         key: Optional[str] = None) -> Tuple[pd.Series, pd.Series]:
+    """MACD line and signal line, reusing the cached EMAs"""
+    key = key or fingerprint(close)
+
+    def compute():
+        macd_line = ema(close, fast, key).to_numpy() - ema(close, slow, key).to_numpy()
+        signal_line = kernels.ema(macd_line, signal)
+        return pd.DataFrame({'macd': macd_line, 'signal': signal_line}, index=close.index)
+
+    lines = indicator_cache.get((key, 'macd', fast, slow, signal), compute)
+    return lines['macd'], lines['signal']
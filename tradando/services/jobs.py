@@ -0,0 +1,176 @@
+from typing import Dict, Any, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import numpy as np
+from tradando.config import Config
+from tradando.models.trade_ledger import TradeLedger
+from tradando.services.analysis import build_strategies, run_backtests, summarize_results
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    request_hash TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    done INTEGER NOT NULL DEFAULT 0,
+    total INTEGER NOT NULL,
+    summary TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_request_hash ON jobs (request_hash, status);
+CREATE TABLE IF NOT EXISTS job_results (
+    job_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    results TEXT NOT NULL,
+    PRIMARY KEY (job_id, position)
+);
+"""
+
+ACTIVE = ('queued', 'running')
+
+
+def _json_default(o):
+    if isinstance(o, TradeLedger):
+        return o.to_dicts()
+    if isinstance(o, np.generic):
+        return o.item()
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, default=_json_default)
+
+
+def request_hash(payload: Dict[str, Any]) -> str:
+    return hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+class JobQueue:
+    """/analyze requests run in the background, persisted in SQLite.
+
+    Jobs run on a bounded thread pool and record each ticker's results as
+    it finishes, so progress and partial results can be polled. Submitting
+    a payload identical to a queued or running job returns that job.
+    Finished jobs survive a restart; jobs interrupted by one are re-queued
+    from scratch.
+    """
+
+    def __init__(self, path: str, workers: int = 2):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='analyze-job')
+
+        for (job_id,) in self._query("SELECT id FROM jobs WHERE status IN ('queued', 'running') "
+                                     "ORDER BY created_at"):
+            logger.info(f"Re-queueing analysis job {job_id} interrupted by a restart")
+            self._execute("DELETE FROM job_results WHERE job_id = ?", (job_id,))
+            self._execute("UPDATE jobs SET status = 'queued', done = 0 WHERE id = ?", (job_id,))
+            self._executor.submit(self._run, job_id)
+
+    def _execute(self, sql: str, params: Tuple = ()):
+        with self._lock:
+            self._db.execute(sql, params)
+
+    def _query(self, sql: str, params: Tuple = ()) -> List[tuple]:
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def submit(self, payload: Dict[str, Any]) -> Tuple[str, bool]:
+        """Queue an analysis, returning (job id, whether an in-flight job was reused)"""
+        key = request_hash(payload)
+        with self._lock:
+            row = self._db.execute("SELECT id FROM jobs WHERE request_hash = ? AND status IN (?, ?)",
+                                   (key, *ACTIVE)).fetchone()
+            if row is not None:
+                return row[0], True
+
+            job_id = uuid.uuid4().hex
+            now = time.time()
+            self._db.execute("INSERT INTO jobs (id, request_hash, payload, status, total, created_at, updated_at) "
+                             "VALUES (?, ?, ?, 'queued', ?, ?, ?)",
+                             (job_id, key, json.dumps(payload), len(payload.get('tickers', [])), now, now))
+        self._executor.submit(self._run, job_id)
+        return job_id, False
+
+    def _run(self, job_id: str):
+        (payload,), = self._query("SELECT payload FROM jobs WHERE id = ?", (job_id,))
+        data = json.loads(payload)
+        self._execute("UPDATE jobs SET status = 'running', updated_at = ? WHERE id = ?", (time.time(), job_id))
+
+        def on_ticker(position: int, symbol: str, results: List[Dict[str, Any]]):
+            with self._lock:
+                self._db.execute("INSERT OR REPLACE INTO job_results (job_id, position, results) VALUES (?, ?, ?)",
+                                 (job_id, position, _dumps(results)))
+                self._db.execute("UPDATE jobs SET done = done + 1, updated_at = ? WHERE id = ?",
+                                 (time.time(), job_id))
+
+        try:
+            strategies = data.get('strategies', ['sma_cross'])
+            strategy_instances = build_strategies(strategies, float(data.get('stop_loss', '5')),
+                                                  float(data.get('take_profit', '5')))
+            all_results = run_backtests(data.get('tickers', []), strategy_instances,
+                                        int(data.get('days', '5')), on_ticker=on_ticker,
+                                        interval=data.get('interval', Config.BASE_INTERVAL))
+            response_data = summarize_results(all_results, strategies)
+            if response_data is None:
+                raise ValueError("No data available for selected pairs")
+            self._execute("UPDATE jobs SET status = 'done', summary = ?, updated_at = ? WHERE id = ?",
+                          (_dumps(response_data['summary']), time.time(), job_id))
+        except Exception as e:
+            logger.error(f"Analysis job {job_id} failed: {e}")
+            self._execute("UPDATE jobs SET status = 'failed', error = ?, updated_at = ? WHERE id = ?",
+                          (str(e), time.time(), job_id))
+
+    def get(self, job_id: str, include_results: bool = True) -> Optional[Dict[str, Any]]:
+        """Job status and progress, with the results recorded so far sorted by return"""
+        rows = self._query("SELECT status, done, total, summary, error, created_at, updated_at "
+                           "FROM jobs WHERE id = ?", (job_id,))
+        if not rows:
+            return None
+        status, done, total, summary, error, created_at, updated_at = rows[0]
+
+        job = {
+            'job_id': job_id,
+            'status': status,
+            'progress': {'done': done, 'total': total},
+            'created_at': created_at,
+            'updated_at': updated_at,
+        }
+        if summary is not None:
+            job['summary'] = json.loads(summary)
+        if error is not None:
+            job['error'] = error
+        if include_results:
+            results = []
+            for (chunk,) in self._query("SELECT results FROM job_results WHERE job_id = ? ORDER BY position",
+                                        (job_id,)):
+                results.extend(json.loads(chunk))
+            results.sort(key=lambda x: x['return_pct'], reverse=True)
+            job['results'] = results
+        return job
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """The shared job queue, opened (and recovered) on first use"""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue(Config.JOBS_DB_PATH, Config.JOB_WORKERS)
+        return _queue
@@ -0,0 +1,117 @@
+"""Indicator and signal kernels over raw float64 NumPy arrays.
+
+Every kernel takes an optional `out` array of the result's shape and
+returns it. Indicator values are those of the pandas expressions they
+replace (rolling().mean(), ewm(adjust=False).mean(), diff().where(...)),
+NaN warm-up included, and signals come back as int8 arrays of -1/0/1.
+Kernels run along the last axis: a 2-D array is a batch of independent
+series of equal length, one per row.
+
+Rolling means and EMAs are thin wrappers around pandas' own window
+routines, not NumPy kernels: pandas allocates their result, which is
+returned as is (read-only under copy-on-write), or copied into `out`
+when one is given. Signals compare
+these values for exact ties (a fast SMA equal to the slow one, an RSI
+landing on its threshold), so they must be the same floats bit for bit,
+not just close: any other summation order turns some ties into trades.
+Stepping pandas' arithmetic through time across a batch's rows in NumPy
+reproduces it too, but takes about twice as long. The signal kernels
+below do work in place.
+"""
+from typing import Optional, Tuple
+import numpy as np
+import pandas as pd
+
+
+def _out(out: Optional[np.ndarray], shape: Tuple[int, ...], dtype=np.float64) -> np.ndarray:
+    if out is None:
+        return np.empty(shape, dtype=dtype)
+    if out.shape != shape or out.dtype != dtype:
+        raise ValueError(f"Output array must have shape {shape} and dtype {np.dtype(dtype)}")
+    return out
+
+
+def _by_row(x: np.ndarray, window_of, out: Optional[np.ndarray]) -> np.ndarray:
+    """A pandas window mean of every series along the last axis, copied into `out` if given"""
+    if out is not None:
+        out = _out(out, x.shape)
+    if x.size == 0:
+        return _out(out, x.shape)
+    if x.ndim == 1:
+        result = window_of(pd.Series(x, copy=False)).mean().to_numpy()
+    else:
+        # One column per series: pandas runs the window down each column independently
+        columns = pd.DataFrame(x.reshape(-1, x.shape[-1]).T, copy=False)
+        result = window_of(columns).mean().to_numpy().T.reshape(x.shape)
+    if out is None:
+        return result
+    out[...] = result
+    return out
+
+
+def rolling_mean(x: np.ndarray, window: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Mean of the last `window` values, NaN until the window is full or when it holds a NaN"""
+    return _by_row(x, lambda values: values.rolling(window), out)
+
+
+def ema(x: np.ndarray, span: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Exponential moving average, equal to ewm(span=span, adjust=False).mean()"""
+    return _by_row(x, lambda values: values.ewm(span=span, adjust=False), out)
+
+
+def rsi(close: np.ndarray, period: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """RSI from simple rolling means of gains and losses; missing changes count as zero"""
+    out = _out(out, close.shape)
+    delta = np.zeros(close.shape)
+    np.subtract(close[..., 1:], close[..., :-1], out=delta[..., 1:])
+
+    gain = np.where(delta > 0, delta, 0.0)
+    # Negated after the where, like -delta.where(delta < 0, 0): no change is a loss of -0.0
+    loss = np.negative(np.where(delta < 0, delta, 0.0))
+    # delta is no longer needed: it holds the average gain, `out` the average loss
+    average_gain = rolling_mean(gain, period, out=delta)
+    average_loss = rolling_mean(loss, period, out=out)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(average_gain, average_loss, out=out)
+        out += 1
+        np.divide(100, out, out=out)
+        np.subtract(100, out, out=out)
+    return out
+
+
+def macd(close: np.ndarray, fast: int, slow: int, signal: int) -> Tuple[np.ndarray, np.ndarray]:
+    """MACD line and its signal line"""
+    line = np.subtract(ema(close, fast), ema(close, slow))
+    return line, ema(line, signal)
+
+
+def threshold_signals(values: np.ndarray, lower: float, upper: float,
+                      out: Optional[np.ndarray] = None) -> np.ndarray:
+    """1 below `lower`, -1 above `upper`, 0 otherwise (and for NaN)"""
+    out = _out(out, values.shape, np.int8)
+    out.fill(0)
+    out[values < lower] = 1
+    out[values > upper] = -1
+    return out
+
+
+def comparison_signals(fast: np.ndarray, slow: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """1 while `fast` is above `slow`, -1 while below"""
+    out = _out(out, fast.shape, np.int8)
+    np.greater(fast, slow, out=out, casting='unsafe')
+    out[fast < slow] = -1
+    return out
+
+
+def crossover_signals(fast: np.ndarray, slow: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """1 where `fast` crosses above `slow`, -1 where it crosses below, against the previous bar"""
+    out = _out(out, fast.shape, np.int8)
+    out.fill(0)
+    if fast.shape[-1] < 2:
+        return out
+    now, before = fast[..., 1:], fast[..., :-1]
+    line_now, line_before = slow[..., 1:], slow[..., :-1]
+    out[..., 1:][(now > line_now) & (before <= line_before)] = 1
+    out[..., 1:][(now < line_now) & (before >= line_before)] = -1
+    return out
@@ -0,0 +1,97 @@
+from typing import Dict, Any, List, Optional
+from collections import OrderedDict, deque
+import threading
+import pandas as pd
+from tradando.config import Config
+from tradando.models.portfolio import Portfolio
+from tradando.services.backtest import Backtester
+from tradando.strategies.base import TradingStrategy
+
+
+class LiveTrader:
+    """Trades a strategy bar by bar, keeping strategy and portfolio state between updates.
+
+    Each completed bar goes through the strategy's on_bar and the same
+    exit-then-signal rules as Backtester's loop, so a new bar costs constant
+    time instead of a full backtest. The newest bar of a fetch may still be
+    forming and is only consumed once a later bar arrives.
+    """
+
+    def __init__(self, strategy: TradingStrategy, initial_value: float = Config.INITIAL_CASH):
+        self.strategy = strategy
+        self.strategy.reset()
+        self.portfolio = Portfolio(initial_value)
+        self.start_index = Backtester(strategy).start_index()
+        self.n_bars = 0
+        self.last_timestamp = None
+        # Recently consumed bars with their signals, for streaming subscribers
+        self.recent_bars = deque(maxlen=Config.STREAM_REPLAY_EVENTS)
+        self.lock = threading.Lock()
+
+    def on_bar(self, timestamp, bar) -> Optional[int]:
+        """Consume one completed bar and return the ledger position of its trade, if any"""
+        signal = self.strategy.on_bar(bar)
+        i = self.n_bars
+        self.n_bars += 1
+        self.last_timestamp = timestamp
+        self.recent_bars.append((timestamp, bar, signal))
+        if i < self.start_index:
+            return None
+
+        current_price = float(bar['Close'])
+        if self.portfolio.holdings > 0:
+            exit_check = self.strategy.check_exit_conditions(current_price, self.portfolio.entry_price)
+            if exit_check['exit']:
+                return self.portfolio.execute_trade('sell', current_price, timestamp, exit_check['reason'])
+
+        if signal > 0 and self.portfolio.cash > 0:
+            return self.portfolio.execute_trade('buy', current_price, timestamp)
+        if signal < 0 and self.portfolio.holdings > 0:
+            return self.portfolio.execute_trade('sell', current_price, timestamp)
+        return None
+
+    def feed(self, data: pd.DataFrame) -> List[int]:
+        """Consume the completed bars of `data` not seen yet"""
+        completed = data.iloc[:-1]
+        if self.last_timestamp is not None:
+            completed = completed[completed.index > self.last_timestamp]
+
+        trades = []
+        for timestamp, bar in zip(completed.index, completed.to_dict('records')):
+            trade = self.on_bar(timestamp, bar)
+            if trade is not None:
+                trades.append(trade)
+        return trades
+
+    def snapshot(self, current_price: float, include_trades: bool = True) -> Dict[str, Any]:
+        """Portfolio state valued at the latest price, with the full trade list unless left out"""
+        state = {
+            'portfolio_value': round(self.portfolio.get_current_value(current_price), 2),
+            'price': round(current_price, 2),
+            'holdings': round(self.portfolio.holdings, 6),
+            'cash': round(self.portfolio.cash, 2)
+        }
+        if include_trades:
+            state['trades'] = self.portfolio.trades.to_dicts()
+        return state
+
+
+_traders: 'OrderedDict[str, LiveTrader]' = OrderedDict()
+_traders_lock = threading.Lock()
+
+
+def get_live_trader(key: str, factory) -> LiveTrader:
+    """Shared trader for `key`, created with `factory()` on first use.
+
+    Only the Config.LIVE_TRADER_ENTRIES most recently requested traders are
+    kept; an evicted key starts over from a fresh portfolio.
+    """
+    with _traders_lock:
+        trader = _traders.get(key)
+        if trader is not None:
+            _traders.move_to_end(key)
+            return trader
+        trader = _traders[key] = LiveTrader(factory())
+        if len(_traders) > Config.LIVE_TRADER_ENTRIES:
+            _traders.popitem(last=False)
+        return trader
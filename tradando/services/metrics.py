@@ -0,0 +1,111 @@
+from typing import Dict, List, Tuple
+from contextlib import contextmanager
+import bisect
+import threading
+import time
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+HELP = {
+    'tradando_request_seconds': 'HTTP request latency by route',
+    'tradando_fetch_seconds': 'Historical data fetch latency',
+    'tradando_signal_seconds': 'Signal generation latency by strategy',
+    'tradando_backtest_seconds': 'Backtester.run latency by strategy and mode',
+    'tradando_serialize_seconds': 'JSON serialization latency by route',
+}
+
+# (metric name, sorted label items, seconds)
+Observation = Tuple[str, Tuple[Tuple[str, str], ...], float]
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram, one per label set"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Process-wide histograms rendered in Prometheus text format.
+
+    Work done in another process can be timed under capture() there and
+    its observations recorded here with record_all().
+    """
+
+    def __init__(self):
+        self._histograms: Dict[str, Dict[tuple, Histogram]] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def observe(self, name: str, seconds: float, **labels):
+        labels = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        captured = getattr(self._local, 'captured', None)
+        if captured is not None:
+            captured.append((name, labels, seconds))
+            return
+        with self._lock:
+            self._histograms.setdefault(name, {}).setdefault(labels, Histogram()).observe(seconds)
+
+    def record_all(self, observations: List[Observation]):
+        for name, labels, seconds in observations:
+            self.observe(name, seconds, **dict(labels))
+
+    @contextmanager
+    def capture(self):
+        """Collect this thread's observations into a list instead of recording them"""
+        previous = getattr(self._local, 'captured', None)
+        self._local.captured = []
+        try:
+            yield self._local.captured
+        finally:
+            self._local.captured = previous
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def render(self) -> str:
+        """All histograms in Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name in sorted(self._histograms):
+                lines.append(f"# HELP {name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels, histogram in sorted(self._histograms[name].items()):
+                    cumulative = 0
+                    for bound, count in zip(list(histogram.buckets) + ['+Inf'], histogram.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(labels + (('le', str(bound)),))} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {histogram.total}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        return '\n'.join(lines) + '\n'
+
+
+def _format_labels(labels: tuple) -> str:
+    if not labels:
+        return ''
+    escaped = (f'{k}="{_escape(v)}"' for k, v in labels)
+    return '{' + ','.join(escaped) + '}'
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+metrics = MetricsRegistry()
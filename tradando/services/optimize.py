@@ -0,0 +1,135 @@
+from typing import Dict, Any, List, Iterable, Optional, Tuple
+from itertools import product
+import logging
+import numpy as np
+import pandas as pd
+from tradando.config import Config
+from tradando.services.analysis import get_backtest_pool
+from tradando.services.backtest import Backtester, find_trades, summarize_trades
+from tradando.services import indicators
+from tradando.strategies.registry import strategy_registry
+
+logger = logging.getLogger(__name__)
+
+SORT_KEYS = ('return_pct', 'final_value', 'n_trades')
+
+
+def expand_values(spec) -> List:
+    """Turn a scalar, a list or a {start, stop, step} range (stop inclusive) into a list"""
+    if isinstance(spec, dict):
+        start, stop, step = spec['start'], spec['stop'], spec.get('step', 1)
+        if step <= 0:
+            raise ValueError("Range step must be positive")
+        if all(isinstance(v, int) for v in (start, stop, step)):
+            return list(range(start, stop + 1, step))
+        return [round(float(v), 10) for v in np.arange(start, stop + step / 2, step)]
+    if isinstance(spec, (list, tuple)):
+        return list(spec)
+    return [spec]
+
+
+def check_param_names(strategy_key: str, params: Dict[str, Any]):
+    """Reject names that are not signal parameters of the strategy's constructor"""
+    names = {p['name'] for p in strategy_registry.schema(strategy_key)['params']}
+    # Exits are swept through stop_losses / take_profits instead
+    names -= {'stop_loss_pct', 'take_profit_pct'}
+    unknown = sorted(set(params) - names)
+    if unknown:
+        raise ValueError(f"Invalid {strategy_key} parameters: {', '.join(unknown)} "
+                         f"(choose from {', '.join(sorted(names))})")
+
+
+def build_grid(strategy_key: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Cartesian product of the strategy parameter values, minus invalid combinations"""
+    strategy_cls = strategy_registry.get_class(strategy_key)
+    names = list(params)
+    grid = []
+    for values in product(*(expand_values(params[name]) for name in names)):
+        combo = dict(zip(names, values))
+        if strategy_cls.valid_params(combo):
+            grid.append(combo)
+    return grid
+
+
+def _signals(strategy_key: str, close: pd.Series, key: str, params: Dict[str, Any]) -> np.ndarray:
+    """Same signal column the strategy's generate_signals produces, from cached indicators"""
+    return strategy_registry.instance(strategy_key, **params).signal_array(close, key)
+
+
+def _sweep_chunk(strategy_key: str, close: np.ndarray, param_sets: List[Dict[str, Any]],
+                 exits: List[Tuple[float, float]], initial_value: float) -> List[Dict[str, Any]]:
+    """Evaluate every parameter set against every stop loss / take profit pair"""
+    series = pd.Series(close)
+    key = indicators.fingerprint(series)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        results = []
+        for params in param_sets:
+            signal = _signals(strategy_key, series, key, params)
+            start_index = Backtester(strategy_registry.instance(strategy_key, **params)).start_index()
+            for stop_loss, take_profit in exits:
+                trades = find_trades(close, signal, start_index, stop_loss, take_profit)
+                results.append({
+                    'params': params,
+                    'stop_loss_pct': stop_loss,
+                    'take_profit_pct': take_profit,
+                    **summarize_trades(close, trades, initial_value)
+                })
+    return results
+
+
+def _chunks(items: List, size: int) -> Iterable[List]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def run_sweep(data: pd.DataFrame, strategy_key: str, params: Dict[str, Any],
+              stop_losses: Iterable[float], take_profits: Iterable[float],
+              initial_value: float = Config.INITIAL_CASH, top: Optional[int] = None,
+              sort_by: str = 'return_pct') -> Dict[str, Any]:
+    """Backtest every parameter combination on one symbol and rank the results.
+
+    Signal parameter sets are evaluated against every stop loss / take
+    profit pair, so each signal column is built once per parameter set and
+    the indicator windows behind it come from the shared indicator cache.
+    Chunks are spread over the shared backtest process pool when one is
+    available. `top` keeps only the best results and must be a positive
+    integer when given.
+    """
+    if strategy_key not in strategy_registry:
+        raise ValueError(f"Unknown strategy: {strategy_key}")
+    if sort_by not in SORT_KEYS:
+        raise ValueError(f"Cannot rank by: {sort_by}")
+    if top is not None and (isinstance(top, bool) or not isinstance(top, int) or top <= 0):
+        raise ValueError(f"top must be a positive integer: {top!r}")
+
+    check_param_names(strategy_key, params)
+    param_sets = build_grid(strategy_key, params)
+    exits = list(product([float(v) for v in expand_values(stop_losses)],
+                         [float(v) for v in expand_values(take_profits)]))
+    n_combinations = len(param_sets) * len(exits)
+    if n_combinations == 0:
+        raise ValueError("Parameter grid is empty")
+    if n_combinations > Config.OPTIMIZE_MAX_COMBINATIONS:
+        raise ValueError(f"Too many combinations: {n_combinations} > {Config.OPTIMIZE_MAX_COMBINATIONS}")
+
+    close = data['Close'].to_numpy(dtype=float)
+    pool = get_backtest_pool()
+    logger.info(f"Sweeping {n_combinations} {strategy_key} combinations over {len(close)} bars")
+
+    if pool is None:
+        results = _sweep_chunk(strategy_key, close, param_sets, exits, initial_value)
+    else:
+        # Sort so neighbouring parameter sets share indicator windows within a chunk
+        param_sets.sort(key=lambda p: tuple(sorted(p.items())))
+        size = max(1, -(-len(param_sets) // (Config.ANALYZE_BACKTEST_WORKERS * 4)))
+        futures = [pool.submit(_sweep_chunk, strategy_key, close, chunk, exits, initial_value)
+                   for chunk in _chunks(param_sets, size)]
+        results = [result for future in futures for result in future.result()]
+
+    results.sort(key=lambda r: r[sort_by], reverse=True)
+    return {
+        'strategy': strategy_key,
+        'n_combinations': n_combinations,
+        'n_bars': len(close),
+        'results': results if top is None else results[:top]
+    }
@@ -0,0 +1,193 @@
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from tradando.config import Config
+from tradando.models.trade_ledger import TradeLedger
+from tradando.services.backtest import Backtester
+from tradando.strategies.base import TradingStrategy
+
+
+class PortfolioBacktester:
+    """Backtest one strategy across many symbols sharing a single cash pool.
+
+    Prices and signals are aligned on the union of the symbols' timestamps
+    into (time x symbol) matrices. On each bar stop loss / take profit and
+    sell signals close positions first, then buy signals open new ones
+    while slots and cash last. A symbol only trades on bars it actually has.
+
+    Entries cannot be vectorized over time, since each one depends on the
+    cash and slots every earlier trade left. Exits do not: when a position
+    opens, its exit bar is found with a vectorized scan of the bars ahead.
+    So the Python loop only visits bars where a buy signal fires or a
+    position closes, and the holdings in between are filled in afterwards
+    to value the portfolio on every bar.
+
+    Sizing: each new position targets `position_size_pct` of current
+    equity, scaled by relative inverse volatility when `allocation` is
+    'inverse_volatility'. When there are more buy signals than free slots,
+    the strongest trailing momentum wins, and when targets exceed cash they
+    are scaled down pro rata.
+    """
+
+    ALLOCATIONS = ('equal', 'inverse_volatility')
+
+    def __init__(self, strategy: TradingStrategy, max_positions: int = 10,
+                 position_size_pct: float = None, allocation: str = 'equal', lookback: int = 20):
+        if allocation not in self.ALLOCATIONS:
+            raise ValueError(f"Unknown allocation: {allocation}")
+        if max_positions < 1:
+            raise ValueError("max_positions must be at least 1")
+        self.strategy = strategy
+        self.max_positions = max_positions
+        self.position_size_pct = position_size_pct if position_size_pct is not None else 100 / max_positions
+        self.allocation = allocation
+        self.lookback = lookback
+
+    def align(self, data: Dict[str, pd.DataFrame]):
+        """Close and signal matrices on the union of all timestamps"""
+        symbols = list(data)
+        raw_close = pd.concat({s: data[s]['Close'] for s in symbols}, axis=1).sort_index()
+        signal = pd.concat({s: pd.Series(self.strategy.signal_array(data[s]['Close']), index=data[s].index)
+                            for s in symbols}, axis=1).reindex(raw_close.index)
+
+        has_bar = raw_close.notna().to_numpy()
+        # Positions are valued at the last known price between a symbol's bars
+        close = raw_close.ffill().to_numpy(dtype=float)
+        signal = signal.fillna(0).to_numpy(dtype=np.int8)
+        warmed_up = (np.cumsum(has_bar, axis=0, dtype=np.int32) - 1) >= Backtester(self.strategy).start_index()
+        return raw_close.index, symbols, close, has_bar, np.where(warmed_up, signal, 0)
+
+    def _ranking(self, close: np.ndarray) -> Dict[str, np.ndarray]:
+        """Trailing momentum and volatility per bar and symbol"""
+        prices = pd.DataFrame(close)
+        momentum = (prices / prices.shift(self.lookback) - 1).to_numpy()
+        volatility = prices.pct_change(fill_method=None).rolling(self.lookback).std().to_numpy()
+        return {'momentum': np.nan_to_num(momentum, nan=-np.inf), 'volatility': volatility}
+
+    def _find_exit(self, close: np.ndarray, has_bar: np.ndarray, signal: np.ndarray, t: int,
+                   i: int) -> Tuple[int, Optional[str]]:
+        """Bar and reason closing a position in symbol i bought on bar t, or (n_times, None) if it stays open"""
+        entry_price = close[t, i]
+        stop_loss, take_profit = self.strategy.stop_loss_pct, self.strategy.take_profit_pct
+        # Most positions close soon, so the bars ahead are scanned in growing chunks
+        start, size = t + 1, 256
+        while start < len(close):
+            end = start + size
+            change = (close[start:end, i] - entry_price) / entry_price * 100
+            bar = has_bar[start:end, i]
+            stops = bar & (change <= -stop_loss)
+            takes = bar & (change >= take_profit)
+            hits = np.flatnonzero(stops | takes | (bar & (signal[start:end, i] < 0)))
+            if len(hits):
+                k = hits[0]
+                return start + k, 'stop_loss' if stops[k] else 'take_profit' if takes[k] else 'signal'
+            start, size = end, size * 2
+        return len(close), None
+
+    def run(self, data: Dict[str, pd.DataFrame], initial_value: float = Config.INITIAL_CASH) -> Dict[str, Any]:
+        data = {symbol: df for symbol, df in data.items() if df is not None and not df.empty}
+        if not data:
+            raise ValueError("No data to backtest")
+
+        index, symbols, close, has_bar, signal = self.align(data)
+        ranking = self._ranking(close)
+        n_times, n_symbols = close.shape
+
+        cash = float(initial_value)
+        shares = np.zeros(n_symbols)
+        entry_price = np.zeros(n_symbols)
+        cost_basis = np.zeros(n_symbols)
+        realized = np.zeros(n_symbols)
+        entered_at = np.zeros(n_symbols, dtype=np.int64)
+        exit_at = np.full(n_symbols, n_times)
+        exit_reason: List[Optional[str]] = [None] * n_symbols
+        # Shares held per bar and the cash left after each visited bar
+        holdings = np.zeros((n_times, n_symbols))
+        cash_after = np.full(n_times, np.nan)
+        ledgers = [TradeLedger() for _ in symbols]
+
+        buy_bars = np.flatnonzero((has_bar & (signal > 0)).any(axis=1))
+        next_buy = 0
+        while True:
+            buy_bar = buy_bars[next_buy] if next_buy < len(buy_bars) else n_times
+            t = int(min(buy_bar, exit_at.min()))
+            if t >= n_times:
+                break
+            price = close[t]
+
+            exits = exit_at == t
+            for i in np.flatnonzero(exits):
+                proceeds = shares[i] * price[i]
+                pnl = proceeds - cost_basis[i]
+                change = (price[i] - entry_price[i]) / entry_price[i] * 100
+                ledgers[i].append('sell', exit_reason[i], index[t], price[i], shares[i], proceeds,
+                                  change, pnl, entry_price[i])
+                cash += float(proceeds)
+                realized[i] += pnl
+                holdings[entered_at[i]:t, i] = shares[i]
+                shares[i] = 0
+                exit_at[i] = n_times
+            held = shares > 0
+
+            slots = self.max_positions - int(held.sum())
+            if t == buy_bar:
+                next_buy += 1
+                candidates = np.flatnonzero(has_bar[t] & ~held & ~exits & (signal[t] > 0))
+                if slots > 0 and cash > 0 and len(candidates):
+                    if len(candidates) > slots:
+                        order = np.argsort(-ranking['momentum'][t, candidates], kind='stable')
+                        candidates = candidates[order[:slots]]
+
+                    equity_now = cash + float(np.dot(shares[held], price[held]))
+                    target = np.full(len(candidates), equity_now * self.position_size_pct / 100)
+                    if self.allocation == 'inverse_volatility':
+                        volatility = ranking['volatility'][t, candidates]
+                        inverse = np.where(volatility > 0, 1 / volatility, np.nan)
+                        if np.isfinite(inverse).any():
+                            inverse = np.nan_to_num(inverse, nan=np.nanmin(inverse))
+                            target *= inverse / inverse.mean()
+                    if target.sum() > cash:
+                        target *= cash / target.sum()
+
+                    for i, amount in zip(candidates, target):
+                        shares[i] = amount / price[i]
+                        entry_price[i] = price[i]
+                        cost_basis[i] = amount
+                        ledgers[i].append('buy', 'signal', index[t], price[i], shares[i], amount)
+                        if shares[i] > 0:
+                            entered_at[i] = t
+                            exit_at[i], exit_reason[i] = self._find_exit(close, has_bar, signal, t, i)
+                    cash -= float(target.sum())
+            cash_after[t] = cash
+
+        for i in np.flatnonzero(shares > 0):
+            holdings[entered_at[i]:, i] = shares[i]
+        held_value = np.where(holdings > 0, holdings * close, 0.0)
+        invested = held_value.sum(axis=1)
+        equity = pd.Series(cash_after).ffill().fillna(initial_value).to_numpy() + invested
+
+        final_value = float(equity[-1])
+        peak = np.maximum.accumulate(equity)
+        per_symbol = []
+        for i, symbol in enumerate(symbols):
+            per_symbol.append({
+                'symbol': symbol,
+                'holdings': round(float(shares[i]), 8),
+                'value': round(float(shares[i] * close[-1, i]), 2),
+                'realized_pnl': round(float(realized[i]), 2),
+                **ledgers[i].summary(),
+                'trades': ledgers[i]
+            })
+
+        return {
+            'initial_value': initial_value,
+            'final_value': round(final_value, 2),
+            'return_pct': round((final_value - initial_value) / initial_value * 100, 2),
+            'cash': round(cash, 2),
+            'max_drawdown_pct': round(float(((equity - peak) / peak).min() * 100), 2),
+            'exposure_pct': round(float((invested / equity).mean() * 100), 2),
+            'n_bars': n_times,
+            'n_symbols': n_symbols,
+            'n_trades': sum(len(ledger) for ledger in ledgers),
+            'symbols': per_symbol
+        }
@@ -0,0 +1,167 @@
+from typing import Any, Callable, Dict, Iterable, Optional
+from collections import OrderedDict
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+import pandas as pd
+from tradando.config import Config
+from tradando.services.execution import ExecutionModel
+from tradando.strategies.base import TradingStrategy
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever Backtester.run's result changes shape, orphaning older disk entries
+RESULT_FORMAT = 1
+
+
+def frame_fingerprint(data: pd.DataFrame) -> str:
+    """Content hash of a frame's index, column names and values"""
+    digest = hashlib.blake2b(digest_size=16)
+    index = data.index
+    if isinstance(index, pd.DatetimeIndex):
+        digest.update(index.as_unit('ns').asi8.tobytes())
+        digest.update(str(index.tz).encode())
+    else:
+        digest.update(pd.util.hash_pandas_object(index, index=False).to_numpy().tobytes())
+    for column in data.columns:
+        digest.update(str(column).encode())
+        digest.update(data[column].to_numpy(dtype=float).tobytes())
+    return digest.hexdigest()
+
+
+def _config(obj) -> Dict[str, Any]:
+    # Public attributes are configuration; on_bar state lives in underscored ones
+    return {name: value for name, value in vars(obj).items() if not name.startswith('_')}
+
+
+def result_key(data: pd.DataFrame, strategy: TradingStrategy, mode: str = 'vectorized',
+               execution: Optional[ExecutionModel] = None, initial_value: float = 10000) -> str:
+    """Content address of a backtest: the bars plus everything that configures the run"""
+    cls = type(strategy)
+    spec = {
+        'format': RESULT_FORMAT,
+        'strategy': f"{cls.__module__}.{cls.__qualname__}",
+        'params': _config(strategy),
+        'mode': mode,
+        'execution': _config(execution) if execution is not None else None,
+        'initial_value': initial_value,
+    }
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(frame_fingerprint(data).encode())
+    digest.update(json.dumps(spec, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def combined_key(keys: Iterable[str], **params) -> str:
+    """One key for a response assembled from several results"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+    for key in keys:
+        digest.update(key.encode())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Backtest results by content address, in an LRU with an optional disk tier.
+
+    Entries are pickled once when stored: the pickle's size counts against
+    `max_bytes`, and with a `directory` it is also written there, so results
+    survive restarts and are shared between processes. A key only ever maps
+    to one result, so disk entries never go stale and can be deleted at any
+    time. get() hands out shallow copies, leaving callers free to add keys;
+    the nested trade ledger is shared and must not be modified.
+    """
+
+    def __init__(self, max_bytes: int, directory: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.nbytes = 0
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()  # key -> (result, size)
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + '.pkl')
+
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cached result {key}: {e}")
+            return None
+
+    def _save(self, key: str, payload: bytes):
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename so readers never see a partial file
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Could not write cached result {key}: {e}")
+
+    def _remember(self, key: str, result: Dict[str, Any], size: int):
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = (result, size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.nbytes -= evicted
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            if key in self._entries:
+                return True
+        return self.directory is not None and os.path.exists(self._path(key))
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return dict(self._entries[key][0])
+        if self.directory is None:
+            return None
+
+        result = self._load(key)
+        if result is None:
+            return None
+        self._remember(key, result, os.path.getsize(self._path(key)))
+        return dict(result)
+
+    def put(self, key: str, result: Dict[str, Any]):
+        result = dict(result)
+        payload = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        if self.directory is not None:
+            self._save(key, payload)
+        self._remember(key, result, len(payload))
+
+    def get_or_compute(self, key: str, compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        result = self.get(key)
+        if result is None:
+            result = compute()
+            self.put(key, result)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+result_cache = ResultCache(Config.RESULT_CACHE_MAX_BYTES,
+                           Config.RESULT_CACHE_DIR if Config.RESULT_CACHE_ON_DISK else None)
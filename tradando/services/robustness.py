@@ -0,0 +1,169 @@
+from typing import Dict, Any, Optional
+import logging
+import numpy as np
+import pandas as pd
+from tradando.config import Config
+from tradando.services.backtest import Backtester
+from tradando.strategies.base import TradingStrategy
+
+logger = logging.getLogger(__name__)
+
+METHODS = ('bootstrap', 'block')
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def resample_paths(close: np.ndarray, n_paths: int, method: str = 'block',
+                   block_bars: int = Config.ROBUSTNESS_BLOCK_BARS,
+                   rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """(n_paths, len(close)) price paths rebuilt from resampled log returns.
+
+    'bootstrap' draws every return independently; 'block' draws runs of
+    `block_bars` consecutive returns (wrapping around the end), keeping
+    the short-range autocorrelation and volatility clustering that
+    indicators react to. Every path starts at the observed first close.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown resampling method: {method}")
+    if n_paths <= 0:
+        raise ValueError("n_paths must be positive")
+    if len(close) < 2:
+        raise ValueError("Need at least two closes to resample returns")
+    if not np.isfinite(close).all() or (close <= 0).any():
+        raise ValueError("Closes must be positive and finite")
+
+    rng = rng or np.random.default_rng()
+    returns = np.diff(np.log(close))
+    n = len(returns)
+    block = 1 if method == 'bootstrap' else max(1, min(block_bars, n))
+
+    starts = rng.integers(0, n, size=(n_paths, -(-n // block)))
+    positions = (starts[:, :, None] + np.arange(block)).reshape(n_paths, -1)[:, :n]
+    positions %= n
+
+    paths = np.empty((n_paths, n + 1))
+    paths[:, 0] = 0
+    np.cumsum(returns[positions], axis=1, out=paths[:, 1:])
+    np.exp(paths, out=paths)
+    paths *= close[0]
+    return paths
+
+
+def simulate(paths: np.ndarray, signals: np.ndarray, start_index: int, stop_loss_pct: float,
+             take_profit_pct: float, initial_value: float = Config.INITIAL_CASH) -> Dict[str, np.ndarray]:
+    """All-in long-only runs over every path at once, stepping through bars.
+
+    Follows Backtester's loop bar by bar, each step a handful of array
+    operations across all paths: while holding, stop loss / take profit
+    are checked before the sell signal, and a bar that closes a position
+    never opens a new one. Returns per-path final return, maximum drawdown
+    and trade count.
+    """
+    n_paths, n_bars = paths.shape
+    holding = np.zeros(n_paths, dtype=bool)
+    cash = np.full(n_paths, float(initial_value))
+    shares = np.zeros(n_paths)
+    entry = np.ones(n_paths)
+    peak = cash.copy()
+    drawdown = np.zeros(n_paths)
+    n_trades = np.zeros(n_paths, dtype=np.int64)
+    equity = np.empty(n_paths)
+
+    for i in range(start_index, n_bars):
+        price = paths[:, i]
+        signal = signals[:, i]
+
+        change = (price - entry) / entry * 100
+        sell = holding & ((change <= -stop_loss_pct) | (change >= take_profit_pct) | (signal < 0))
+        buy = ~holding & (signal > 0)
+
+        if sell.any():
+            cash[sell] = shares[sell] * price[sell]
+            shares[sell] = 0
+            holding[sell] = False
+        if buy.any():
+            shares[buy] = cash[buy] / price[buy]
+            cash[buy] = 0
+            entry[buy] = price[buy]
+            holding[buy] = True
+        n_trades += sell
+        n_trades += buy
+
+        np.multiply(shares, price, out=equity)
+        equity += cash
+        np.maximum(peak, equity, out=peak)
+        np.maximum(drawdown, 1 - equity / peak, out=drawdown)
+
+    final = cash + shares * paths[:, -1]
+    return {
+        'return_pct': (final - initial_value) / initial_value * 100,
+        'max_drawdown_pct': drawdown * 100,
+        'n_trades': n_trades,
+    }
+
+
+def distribution(values: np.ndarray) -> Dict[str, Any]:
+    """Mean, spread and percentiles of one per-path statistic"""
+    percentiles = np.percentile(values, PERCENTILES)
+    return {
+        'mean': round(float(values.mean()), 2),
+        'std': round(float(values.std()), 2),
+        'min': round(float(values.min()), 2),
+        'max': round(float(values.max()), 2),
+        'percentiles': {f'p{p}': round(float(v), 2) for p, v in zip(PERCENTILES, percentiles)},
+    }
+
+
+def run_robustness(strategy: TradingStrategy, data: pd.DataFrame, n_paths: int = Config.ROBUSTNESS_PATHS,
+                   method: str = 'block', block_bars: int = Config.ROBUSTNESS_BLOCK_BARS,
+                   seed: Optional[int] = None, initial_value: float = Config.INITIAL_CASH) -> Dict[str, Any]:
+    """Distribution of a strategy's return and drawdown over resampled price histories.
+
+    The observed closes' log returns are resampled into `n_paths` synthetic
+    histories of the same length. Signals for all of them come from one
+    (paths x bars) pass of the strategy's signal_matrix and the trades
+    from one batched simulation, instead of a backtest per path. The
+    observed history goes through the same simulation, so its result sits
+    on the same scale as the percentiles.
+    """
+    if type(strategy).check_exit_conditions is not TradingStrategy.check_exit_conditions:
+        raise ValueError("Robustness analysis only supports the default stop loss / take profit exits")
+
+    close = data['Close'].to_numpy(dtype=float)
+    if n_paths * len(close) > Config.ROBUSTNESS_MAX_CELLS:
+        raise ValueError(f"Too many simulated bars: {n_paths} paths x {len(close)} bars "
+                         f"> {Config.ROBUSTNESS_MAX_CELLS}")
+
+    rng = np.random.default_rng(seed)
+    paths = resample_paths(close, n_paths, method, block_bars, rng)
+    start_index = Backtester(strategy).start_index()
+    logger.info(f"Simulating {strategy.name} over {n_paths} x {len(close)} {method} resampled bars")
+
+    simulated = simulate(paths, strategy.signal_matrix(paths), start_index,
+                         strategy.stop_loss_pct, strategy.take_profit_pct, initial_value)
+    observed = simulate(close[None, :], strategy.signal_matrix(close[None, :]), start_index,
+                        strategy.stop_loss_pct, strategy.take_profit_pct, initial_value)
+
+    returns = simulated['return_pct']
+    price_change = (paths[:, -1] - paths[:, 0]) / paths[:, 0] * 100
+    observed_return = float(observed['return_pct'][0])
+    return {
+        'strategy': strategy.name,
+        'n_bars': len(close),
+        'n_paths': n_paths,
+        'method': method,
+        'block_bars': block_bars if method == 'block' else 1,
+        'seed': seed,
+        'observed': {
+            'return_pct': round(observed_return, 2),
+            'max_drawdown_pct': round(float(observed['max_drawdown_pct'][0]), 2),
+            'n_trades': int(observed['n_trades'][0]),
+            # Share of resampled paths that did no better than the observed history
+            'return_rank_pct': round(float((returns <= observed_return).mean() * 100), 2),
+        },
+        'return_pct': distribution(returns),
+        'max_drawdown_pct': distribution(simulated['max_drawdown_pct']),
+        'price_change_pct': distribution(price_change),
+        'excess_return_pct': distribution(returns - price_change),
+        'n_trades': distribution(simulated['n_trades'].astype(float)),
+        'loss_probability_pct': round(float((returns < 0).mean() * 100), 2),
+    }
@@ -0,0 +1,240 @@
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple
+from collections import OrderedDict, deque
+import json
+import logging
+import queue
+import threading
+import pandas as pd
+from tradando.config import Config
+from tradando.models.trade_ledger import TradeLedger
+from tradando.services.live import LiveTrader
+from tradando.utils import fetch_historical_data, get_strategy_description
+
+logger = logging.getLogger(__name__)
+
+# (event id, server-sent event text)
+Event = Tuple[int, str]
+
+
+def _number(value) -> Optional[float]:
+    """JSON-safe bar value: NaN and missing columns become null"""
+    return None if value is None or value != value else float(value)
+
+
+def format_event(event_id: Optional[int], name: str, data: Dict[str, Any]) -> str:
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines += [f"event: {name}", f"data: {json.dumps(data, default=str)}"]
+    return '\n'.join(lines) + '\n\n'
+
+
+class Subscription:
+    """One client's queue of pending events"""
+
+    def __init__(self, maxsize: int):
+        self.queue: 'queue.Queue[Event]' = queue.Queue(maxsize)
+        self.dropped = False
+
+
+class SymbolStream:
+    """One background poller per symbol, broadcasting to every subscriber.
+
+    Each poll fetches the symbol once and feeds its completed bars to the
+    shared LiveTrader. What changed is published once for all subscribers:
+    - a 'bar' event per new bar, with its signal;
+    - a 'trade' event per new trade;
+    - a 'portfolio' event with the revalued position.
+    New subscribers get a 'snapshot' first. The trader is looked up with
+    `get_trader` on every poll, so the stream follows the shared one for the
+    symbol; if that was evicted and replaced, every subscriber gets a new
+    'snapshot' of the replacement. A reconnecting client resumes
+    after the Last-Event-ID it saw while that event is still in the replay
+    buffer. A subscriber that falls `queue_size` events behind is dropped
+    (it can reconnect and resume) instead of being buffered without bound.
+    The poller stops when the last subscriber leaves.
+    """
+
+    def __init__(self, symbol: str, get_trader: Callable[[], LiveTrader],
+                 fetch: Callable[[str], pd.DataFrame] = fetch_historical_data,
+                 poll_seconds: float = Config.STREAM_POLL_SECONDS, queue_size: int = Config.STREAM_QUEUE_SIZE,
+                 replay_events: int = Config.STREAM_REPLAY_EVENTS):
+        self.symbol = symbol
+        self.get_trader = get_trader
+        self.trader = get_trader()
+        self.fetch = fetch
+        self.poll_seconds = poll_seconds
+        self.queue_size = queue_size
+
+        self._events: 'deque[Event]' = deque(maxlen=replay_events)
+        self._next_id = 1
+        self._subscribers: List[Subscription] = []
+        self._lock = threading.Lock()
+        self._poll_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        with self.trader.lock:
+            self._last_bar = self.trader.last_timestamp
+            self._published_trades = len(self.trader.portfolio.trades)
+        self._last_price: Optional[float] = None
+
+    @property
+    def n_subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def _state(self) -> Dict[str, Any]:
+        # Trades already went out as their own events
+        return self.trader.snapshot(self._last_price, include_trades=False)
+
+    def _snapshot(self, description: str) -> Dict[str, Any]:
+        snapshot = self.trader.snapshot(self._last_price)
+        snapshot['symbol'] = self.symbol
+        snapshot['strategy'] = self.trader.strategy.name
+        snapshot['strategy_description'] = description
+        return snapshot
+
+    def poll(self):
+        """Fetch once, trade the new bars and publish what changed"""
+        with self._poll_lock:
+            data = self.fetch(self.symbol)
+            if data is None or data.empty:
+                return
+            price = float(data['Close'].iloc[-1])
+
+            trader = self.get_trader()
+            if trader is not self.trader:
+                # The shared trader was evicted and started over: subscribers start over from its state
+                self.trader = trader
+                description = get_strategy_description(trader.strategy)
+                with trader.lock:
+                    trader.feed(data)
+                    self._last_bar = trader.last_timestamp
+                    self._published_trades = len(trader.portfolio.trades)
+                    self._last_price = price
+                    self._publish([('snapshot', self._snapshot(description))])
+                return
+
+            # The trader lock is held while publishing so a concurrent
+            # subscribe() sees either the state before or after these events
+            with self.trader.lock:
+                self.trader.feed(data)
+                events = []
+                for timestamp, bar, signal in self.trader.recent_bars:
+                    if self._last_bar is None or timestamp > self._last_bar:
+                        events.append(('bar', {
+                            'timestamp': timestamp.strftime(TradeLedger.TIMESTAMP_FORMAT),
+                            **{column.lower(): _number(bar.get(column))
+                               for column in ('Open', 'High', 'Low', 'Close', 'Volume')},
+                            'signal': int(signal)
+                        }))
+                if self.trader.recent_bars:
+                    self._last_bar = self.trader.recent_bars[-1][0]
+
+                ledger = self.trader.portfolio.trades
+                events += [('trade', trade) for trade in ledger.to_dicts(self._published_trades)]
+                self._published_trades = len(ledger)
+
+                if events or price != self._last_price:
+                    self._last_price = price
+                    events.append(('portfolio', self._state()))
+                self._publish(events)
+
+    def _publish(self, events: List[Tuple[str, Dict[str, Any]]]):
+        with self._lock:
+            for name, data in events:
+                # Encoded once, however many subscribers receive it
+                event = (self._next_id, format_event(self._next_id, name, data))
+                self._next_id += 1
+                self._events.append(event)
+                for subscription in list(self._subscribers):
+                    try:
+                        subscription.queue.put_nowait(event)
+                    except queue.Full:
+                        logger.warning(f"Dropping a {self.symbol} stream subscriber that fell behind")
+                        subscription.dropped = True
+                        self._subscribers.remove(subscription)
+
+    def subscribe(self, last_event_id: Optional[int] = None) -> Subscription:
+        """Register a subscriber, queueing its snapshot or the events it missed"""
+        if self._last_price is None or self.get_trader() is not self.trader:
+            self.poll()
+
+        # May call out to a model, so resolved before taking the locks
+        description = get_strategy_description(self.trader.strategy)
+        subscription = Subscription(self.queue_size)
+        with self.trader.lock, self._lock:
+            oldest = self._events[0][0] if self._events else self._next_id
+            if last_event_id is not None and oldest <= last_event_id + 1 <= self._next_id:
+                missed = [event for event in self._events if event[0] > last_event_id]
+                for event in missed[-self.queue_size:]:
+                    subscription.queue.put_nowait(event)
+            elif self._last_price is not None:
+                # Carries the latest id so a reconnect resumes after it
+                subscription.queue.put_nowait((self._next_id - 1, format_event(self._next_id - 1 or None, 'snapshot',
+                                                                                self._snapshot(description))))
+            self._subscribers.append(subscription)
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name=f'stream-{self.symbol}', daemon=True)
+                self._thread.start()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+            if not self._subscribers:
+                self._stop.set()
+
+    def _run(self):
+        while True:
+            # Woken early by the last unsubscribe
+            self._stop.wait(self.poll_seconds)
+            with self._lock:
+                if not self._subscribers:
+                    self._thread = None
+                    return
+                self._stop.clear()
+            try:
+                self.poll()
+            except Exception as e:
+                logger.warning(f"Polling {self.symbol} for its stream failed: {e}")
+
+    def iter_events(self, subscription: Subscription,
+                    heartbeat_seconds: float = Config.STREAM_HEARTBEAT_SECONDS,
+                    retry_seconds: float = Config.STREAM_RETRY_SECONDS) -> Iterator[str]:
+        """Server-sent event text for one subscriber, with keep-alive comments while idle"""
+        try:
+            # How soon a dropped client reconnects, independent of the poll interval
+            yield f"retry: {int(retry_seconds * 1000)}\n\n"
+            while not subscription.dropped:
+                try:
+                    _, text = subscription.queue.get(timeout=heartbeat_seconds)
+                except queue.Empty:
+                    yield ': keep-alive\n\n'
+                    continue
+                yield text
+        finally:
+            self.unsubscribe(subscription)
+
+
+_streams: 'OrderedDict[str, SymbolStream]' = OrderedDict()
+_streams_lock = threading.Lock()
+
+
+def get_symbol_stream(symbol: str, get_trader: Callable[[], LiveTrader]) -> SymbolStream:
+    """Shared stream for `symbol`, trading with the trader `get_trader()` returns.
+
+    Beyond Config.STREAM_ENTRIES streams the least recently requested ones
+    without subscribers, whose pollers have stopped, are forgotten. Streams
+    with subscribers are kept however many there are.
+    """
+    with _streams_lock:
+        stream = _streams.get(symbol)
+        if stream is not None:
+            _streams.move_to_end(symbol)
+            return stream
+        stream = _streams[symbol] = SymbolStream(symbol, get_trader)
+        idle = [key for key, other in _streams.items() if other is not stream and not other.n_subscribers]
+        for key in idle[:max(0, len(_streams) - Config.STREAM_ENTRIES)]:
+            del _streams[key]
+        return stream
@@ -0,0 +1,247 @@
+from typing import Dict, Hashable, Optional, Sequence, Tuple
+from collections import OrderedDict
+import threading
+import numpy as np
+import pandas as pd
+from tradando.config import Config
+
+INTERVALS: Dict[str, pd.Timedelta] = {
+    '5m': pd.Timedelta(minutes=5),
+    '15m': pd.Timedelta(minutes=15),
+    '30m': pd.Timedelta(minutes=30),
+    '1h': pd.Timedelta(hours=1),
+    '4h': pd.Timedelta(hours=4),
+    '1d': pd.Timedelta(days=1),
+}
+
+# How each column of a bar combines across the base bars it spans; other columns are dropped
+AGGREGATIONS = {
+    'Open': 'first',
+    'High': 'max',
+    'Low': 'min',
+    'Close': 'last',
+    'Volume': 'sum',
+    'Dividends': 'sum',
+    'Stock Splits': 'max',
+}
+
+
+def interval_delta(interval: str) -> pd.Timedelta:
+    if interval not in INTERVALS:
+        raise ValueError(f"Unsupported interval: {interval} (choose from {', '.join(INTERVALS)})")
+    return INTERVALS[interval]
+
+
+def _wall_ns(index: pd.DatetimeIndex) -> np.ndarray:
+    """Nanosecond wall-clock times in the index's own timezone"""
+    if index.tz is None:
+        return index.as_unit('ns').asi8
+    return index.tz_localize(None).as_unit('ns').asi8
+
+
+def session_offset(index: pd.DatetimeIndex, interval: str) -> int:
+    """Where intraday `interval` bars start within the interval, in nanoseconds.
+
+    Taken from the local time of day each day's trading starts at, so a
+    market opening at 9:30 gets 1h bars starting at :30 past the hour,
+    like the exchange's own bars; 24h markets get 0, i.e. bars aligned
+    to the clock. The first day is left out when there are others, as
+    the window usually cuts into it. The most common start wins, and of
+    equally common ones the earliest in the interval.
+    """
+    step = interval_delta(interval).value
+    day = pd.Timedelta(days=1).value
+    wall = _wall_ns(index)
+    if not len(wall):
+        return 0
+    opens = np.flatnonzero(np.diff(wall // day)) + 1
+    opens = opens if len(opens) else np.array([0])
+    offsets, counts = np.unique(wall[opens] % day % step, return_counts=True)
+    return int(offsets[counts.argmax()])
+
+
+def bucket_starts(index: pd.DatetimeIndex, interval: str, offset: Optional[int] = None) -> np.ndarray:
+    """UTC nanosecond start of the `interval` bar each timestamp falls in.
+
+    Intraday bars are aligned to the session: multiples of the interval
+    from `offset` (session_offset() of the index when not given) in local
+    time. Daily bars are aligned to midnight in the index's own timezone.
+    """
+    step = interval_delta(interval)
+    ns = index.as_unit('ns').asi8
+    if step < pd.Timedelta(days=1):
+        wall = _wall_ns(index)
+        offset = session_offset(index, interval) if offset is None else offset
+        # Stepping back in elapsed time keeps the two 1:00s of a DST change apart
+        starts = ns - (wall - offset) % step.value
+        if index.tz is None or not len(starts):
+            return starts
+        # ...but lands an hour off the local bucket start when a DST change lies in between
+        unique, positions = np.unique(starts, return_inverse=True)
+        start_offsets = _wall_ns(pd.DatetimeIndex(unique).tz_localize('UTC').tz_convert(index.tz)) - unique
+        return starts + (wall - ns) - start_offsets[positions]
+    if index.tz is None:
+        return ns - ns % step.value
+
+    wall = _wall_ns(index)
+    days = wall - wall % step.value
+    # Only one midnight per day needs converting back to UTC
+    unique_days, positions = np.unique(days, return_inverse=True)
+    midnights = pd.DatetimeIndex(unique_days).tz_localize(index.tz, ambiguous=np.ones(len(unique_days), bool),
+                                                          nonexistent='shift_forward')
+    return midnights.as_unit('ns').asi8[positions]
+
+
+def _reduce(values: np.ndarray, hows: Sequence[str], starts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Bucket labels and one aggregated row per run of equal `starts` in a (bars, columns) array"""
+    n = len(values)
+    if n == 0:
+        return starts[:0], values[:0]
+    firsts = np.concatenate(([0], np.flatnonzero(np.diff(starts)) + 1))
+    lasts = np.concatenate((firsts[1:], [n])) - 1
+
+    out = np.empty((len(firsts), values.shape[1]))
+    for j, how in enumerate(hows):
+        column = values[:, j]
+        if how == 'first':
+            out[:, j] = column[firsts]
+        elif how == 'last':
+            out[:, j] = column[lasts]
+        elif how == 'max':
+            out[:, j] = np.fmax.reduceat(column, firsts)
+        elif how == 'min':
+            out[:, j] = np.fmin.reduceat(column, firsts)
+        else:
+            out[:, j] = np.add.reduceat(np.nan_to_num(column), firsts)
+    return starts[firsts], out
+
+
+def _frame(labels: np.ndarray, values: np.ndarray, columns: pd.Index, tz) -> pd.DataFrame:
+    index = pd.DatetimeIndex(labels.astype('datetime64[ns]'))
+    if tz is not None:
+        index = index.tz_localize('UTC').tz_convert(tz)
+    return pd.DataFrame(values, index=index, columns=columns, copy=False)
+
+
+def _values(bars: pd.DataFrame) -> Tuple[pd.Index, np.ndarray]:
+    """The aggregated columns and their values as one (bars, columns) array"""
+    positions = [i for i, column in enumerate(bars.columns) if column in AGGREGATIONS]
+    return bars.columns[positions], bars.to_numpy(dtype=float)[:, positions]
+
+
+def aggregate(bars: pd.DataFrame, starts: np.ndarray) -> pd.DataFrame:
+    """One bar per run of equal `starts`, labelled with its start"""
+    columns, values = _values(bars)
+    labels, values = _reduce(values, [AGGREGATIONS[c] for c in columns], starts)
+    return _frame(labels, values, columns, bars.index.tz)
+
+
+def resample_ohlcv(bars: pd.DataFrame, interval: str) -> pd.DataFrame:
+    """Bars of a longer interval built from shorter ones; the last one may still be forming"""
+    return aggregate(bars, bucket_starts(bars.index, interval))
+
+
+def align(higher: pd.DataFrame, index: pd.DatetimeIndex, interval: str,
+          base_interval: str = Config.BASE_INTERVAL) -> pd.DataFrame:
+    """`interval` bars on a base index, each showing from the base bar it completes with.
+
+    A base bar stamped t closes at t + base interval and only sees the
+    higher bars that had closed by then, so multi-timeframe strategies
+    read no bar before it is finished. Earlier rows are NaN.
+    """
+    step = interval_delta(interval)
+    if step >= pd.Timedelta(days=1) and higher.index.tz is not None:
+        # Calendar days, which are 23 or 25 hours across DST changes
+        ends = higher.index + pd.DateOffset(days=step.days)
+    else:
+        ends = higher.index + step
+    visible = ends.searchsorted(index + interval_delta(base_interval), side='right') - 1
+
+    values = higher.to_numpy(dtype=float)[np.maximum(visible, 0)]
+    values[visible < 0] = np.nan
+    return pd.DataFrame(values, index=index, columns=higher.columns)
+
+
+class TimeframeCache:
+    """Derived bars per (key, interval), extended as the base bars move on.
+
+    Base bars are fetched once at the base interval and every longer
+    interval is aggregated from them in-process. When the same key comes
+    back with a later window of base bars, only the first bar (which may
+    have lost base bars off the window's start) and the bars from the
+    previous last one on (still forming then) are aggregated again; the
+    bars in between are reused. A window reaching further back than the
+    cached one, or whose session offset moved, is aggregated from scratch.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Tuple[Hashable, str], Tuple[pd.Timestamp, pd.Timestamp, int, pd.DataFrame]]' = \
+            OrderedDict()
+        self._lock = threading.Lock()
+
+    def _extend(self, entry, bars: pd.DataFrame, interval: str, offset: int) -> Optional[pd.DataFrame]:
+        first, last, cached_offset, derived = entry
+        columns, values = _values(bars)
+        if derived.empty or not derived.columns.equals(columns) or bars.index[0] < first or bars.index[-1] < last \
+                or offset != cached_offset:
+            return None
+
+        labels = derived.index.as_unit('ns').asi8
+        head_start = bucket_starts(bars.index[:1], interval, offset)[0]
+        # Derived bars strictly between the head and the last one are complete and unchanged
+        middle = slice(labels.searchsorted(head_start, side='right'), len(labels) - 1)
+        tail_pos = bars.index.searchsorted(derived.index[-1])
+        head_end = bars.index.searchsorted(derived.index[middle.start]) if middle.start < middle.stop else tail_pos
+
+        hows = [AGGREGATIONS[c] for c in columns]
+        head_labels, head_values = _reduce(values[:head_end], hows,
+                                           bucket_starts(bars.index[:head_end], interval, offset))
+        tail_labels, tail_values = _reduce(values[tail_pos:], hows,
+                                           bucket_starts(bars.index[tail_pos:], interval, offset))
+        return _frame(np.concatenate((head_labels, labels[middle], tail_labels)),
+                      np.concatenate((head_values, derived.to_numpy()[middle], tail_values)),
+                      columns, bars.index.tz)
+
+    def get(self, key: Hashable, bars: Optional[pd.DataFrame], interval: str) -> Optional[pd.DataFrame]:
+        """`bars` at `interval`, reusing what was derived for `key` before"""
+        if interval_delta(interval) == interval_delta(Config.BASE_INTERVAL):
+            return bars
+        if bars is None or bars.empty:
+            return bars
+
+        cache_key = (key, interval)
+        offset = session_offset(bars.index, interval)
+        with self._lock:
+            entry = self._entries.get(cache_key)
+        derived = self._extend(entry, bars, interval, offset) if entry is not None else None
+        if derived is None:
+            derived = aggregate(bars, bucket_starts(bars.index, interval, offset))
+
+        with self._lock:
+            self._entries[cache_key] = (bars.index[0], bars.index[-1], offset, derived)
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return derived
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+timeframe_cache = TimeframeCache(Config.TIMEFRAME_CACHE_ENTRIES)
+
+
+def multi_timeframe(bars: pd.DataFrame, intervals: Sequence[str], columns: Sequence[str] = ('Close',),
+                    key: Optional[Hashable] = None) -> pd.DataFrame:
+    """Base bars joined with aligned columns of longer intervals, named like 'Close_1h'"""
+    frames = [bars]
+    for interval in intervals:
+        higher = timeframe_cache.get(key, bars, interval) if key is not None else resample_ohlcv(bars, interval)
+        aligned = align(higher[list(columns)], bars.index, interval)
+        frames.append(aligned.add_suffix(f'_{interval}'))
+    return pd.concat(frames, axis=1)
@@ -0,0 +1,139 @@
+from typing import Dict, Any, List, Iterable, Optional, Tuple
+import logging
+import numpy as np
+import pandas as pd
+from tradando.config import Config
+from tradando.services.analysis import get_backtest_pool
+from tradando.services.backtest import Backtester, find_trades, summarize_trades
+from tradando.strategies.base import TradingStrategy
+
+logger = logging.getLogger(__name__)
+
+# (window start, train end / test start, test end) bar positions
+Window = Tuple[int, int, int]
+
+
+def build_windows(n_bars: int, train_bars: int, test_bars: int, step_bars: Optional[int] = None) -> List[Window]:
+    """Consecutive train/test windows, advanced by `step_bars` (default: one test length)"""
+    step_bars = step_bars or test_bars
+    if train_bars < 0 or test_bars <= 0 or step_bars <= 0:
+        raise ValueError("train_bars must be >= 0, test_bars and step_bars > 0")
+    return [(start, start + train_bars, start + train_bars + test_bars)
+            for start in range(0, n_bars - train_bars - test_bars + 1, step_bars)]
+
+
+def _evaluate(close: np.ndarray, signal: np.ndarray, start: int, end: int, warmup: int,
+              stop_loss: float, take_profit: float, initial_value: float) -> Dict[str, Any]:
+    """Trade one window of the full-history arrays, starting flat with fresh cash"""
+    window_close = close[start:end]
+    trades = find_trades(window_close, signal[start:end], max(0, warmup - start), stop_loss, take_profit)
+    return {
+        'price_change_pct': round(float((window_close[-1] - window_close[0]) / window_close[0] * 100), 2),
+        **summarize_trades(window_close, trades, initial_value)
+    }
+
+
+def _window_chunk(close: np.ndarray, signal: np.ndarray, offset: int, windows: List[Window], warmup: int,
+                  stop_loss: float, take_profit: float, initial_value: float) -> List[Dict[str, Any]]:
+    """Evaluate windows over arrays that begin at bar `offset` of the full history"""
+    results = []
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for start, split, end in windows:
+            start, split, end = start - offset, split - offset, end - offset
+            window_warmup = warmup - offset
+            result = {'test': _evaluate(close, signal, split, end, window_warmup,
+                                        stop_loss, take_profit, initial_value)}
+            if split > start:
+                result['train'] = _evaluate(close, signal, start, split, window_warmup,
+                                            stop_loss, take_profit, initial_value)
+            results.append(result)
+    return results
+
+
+def _chunks(windows: List[Window], n: int) -> Iterable[List[Window]]:
+    size = max(1, -(-len(windows) // n))
+    for start in range(0, len(windows), size):
+        yield windows[start:start + size]
+
+
+def aggregate(stats: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Distribution of per-window returns"""
+    returns = np.array([s['return_pct'] for s in stats])
+    excess = returns - np.array([s['price_change_pct'] for s in stats])
+    return {
+        'n_windows': len(stats),
+        'mean_return_pct': round(float(returns.mean()), 2),
+        'median_return_pct': round(float(np.median(returns)), 2),
+        'std_return_pct': round(float(returns.std()), 2),
+        'min_return_pct': round(float(returns.min()), 2),
+        'max_return_pct': round(float(returns.max()), 2),
+        'positive_pct': round(float((returns > 0).mean() * 100), 2),
+        'mean_excess_return_pct': round(float(excess.mean()), 2),
+        'compounded_return_pct': round(float((np.prod(1 + returns / 100) - 1) * 100), 2),
+        'n_trades': int(sum(s['n_trades'] for s in stats)),
+    }
+
+
+def run_walk_forward(strategy: TradingStrategy, data: pd.DataFrame, train_bars: int, test_bars: int,
+                     step_bars: Optional[int] = None,
+                     initial_value: float = Config.INITIAL_CASH) -> Dict[str, Any]:
+    """Evaluate a strategy over many rolling train/test windows of one history.
+
+    Signals are generated once over the whole history and every window
+    trades a slice of the same arrays, starting flat with `initial_value`
+    and marking an open position to its last close. Indicators are
+    therefore warm from the first bar of every window after the strategy's
+    own warm-up. The train window reports in-sample stats for the same
+    fixed parameters; `train_bars=0` gives plain rolling windows. Windows
+    are split into chunks over the shared backtest process pool when one
+    is available.
+    Compounded returns only describe a real sequence of trades when
+    `step_bars` equals `test_bars`.
+    """
+    if type(strategy).check_exit_conditions is not TradingStrategy.check_exit_conditions:
+        raise ValueError("Walk-forward only supports the default stop loss / take profit exits")
+
+    close = data['Close'].to_numpy(dtype=float)
+    signal = strategy.signal_array(data['Close'])
+    windows = build_windows(len(close), train_bars, test_bars, step_bars)
+    if not windows:
+        raise ValueError(f"History of {len(close)} bars is shorter than one window "
+                         f"({train_bars} train + {test_bars} test bars)")
+
+    warmup = Backtester(strategy).start_index()
+    args = (warmup, strategy.stop_loss_pct, strategy.take_profit_pct, initial_value)
+    pool = get_backtest_pool()
+    logger.info(f"Walk-forward over {len(windows)} windows of {len(close)} bars")
+
+    if pool is None or len(windows) == 1:
+        results = _window_chunk(close, signal, 0, windows, *args)
+    else:
+        # Each worker gets only the span of bars its windows cover
+        futures = []
+        for chunk in _chunks(windows, Config.ANALYZE_BACKTEST_WORKERS * 4):
+            lo, hi = chunk[0][0], chunk[-1][2]
+            futures.append(pool.submit(_window_chunk, close[lo:hi], signal[lo:hi], lo, chunk, *args))
+        results = [result for future in futures for result in future.result()]
+
+    index = data.index
+    for (start, split, end), result in zip(windows, results):
+        result['train_start'] = index[start].isoformat() if split > start else None
+        result['test_start'] = index[split].isoformat()
+        result['test_end'] = index[end - 1].isoformat()
+
+    summary = {'test': aggregate([r['test'] for r in results])}
+    if train_bars:
+        summary['train'] = aggregate([r['train'] for r in results])
+        train_mean = summary['train']['mean_return_pct']
+        summary['efficiency'] = (round(summary['test']['mean_return_pct'] / train_mean, 3)
+                                 if train_mean else None)
+
+    return {
+        'strategy': strategy.name,
+        'n_bars': len(close),
+        'train_bars': train_bars,
+        'test_bars': test_bars,
+        'step_bars': step_bars or test_bars,
+        'summary': summary,
+        'windows': results
+    }
@@ -0,0 +1,21 @@
+// Responses by request, revalidated with their ETag instead of sent again
+const responseCache = new Map();
+
+async function postWithETag(url, options) {
+    const cacheKey = `${url} ${options.body}`;
+    const cached = responseCache.get(cacheKey);
+    const headers = { ...options.headers };
+    if (cached) {
+        headers['If-None-Match'] = cached.etag;
+    }
+    const response = await fetch(url, { ...options, headers });
+    if (response.status === 304 && cached) {
+        return cached.data;
+    }
+    const data = await response.json();
+    const etag = response.headers.get('ETag');
+    if (etag && response.ok) {
+        responseCache.set(cacheKey, { etag, data });
+    }
+    return data;
+}
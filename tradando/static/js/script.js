@@ -1,3 +1,5 @@
+// postWithETag comes from js/etag.js, which the page loads before this script
+
 const priceChart = new Chart(document.getElementById('priceChart').getContext('2d'), {
     type: 'line',
     data: {
@@ -134,86 +136,78 @@ function updateTradesTable(trades) {
     });
 }
 
-async function updateData() {
-    try {
-        const response = await fetch('/update', {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/x-www-form-urlencoded' },
-            body: `ticker=${document.getElementById('ticker').value}`
-        });
-        
-        const data = await response.json();
-        
-        if (data.error) {
-            alert(data.error);
-            return;
-        }
+function updatePortfolio(data) {
+    document.getElementById('portfolio-value').textContent = 
+        `Current Portfolio Value: $${data.portfolio_value.toLocaleString()}`;
+    document.getElementById('latest-price').textContent = 
+        `Latest Price: $${data.price.toLocaleString()}`;
+    document.getElementById('holdings').textContent = 
+        `Current Holdings: ${data.holdings}`;
+    document.getElementById('cash-balance').textContent = 
+        `Cash Balance: $${data.cash.toLocaleString()}`;
+}
 
-        // Update strategy description
-        document.getElementById('strategy-text').textContent = data.strategy_description;
+let liveTrades = [];
+let liveStream = null;
+
+// The server pushes new bars, trades and portfolio values as they happen
+function subscribe(ticker) {
+    if (liveStream) {
+        liveStream.close();
+    }
+    priceChart.data.labels = [];
+    priceChart.data.datasets.forEach(dataset => { dataset.data = []; });
+    liveStream = new EventSource(`/stream/${encodeURIComponent(ticker)}`);
 
-        // Update chart data
-        priceChart.data.labels = data.timestamps;
-        priceChart.data.datasets[0].data = data.historical_prices;
-        priceChart.data.datasets[1].data = data.sma20_values;
-        priceChart.data.datasets[2].data = data.sma50_values;
+    liveStream.addEventListener('snapshot', event => {
+        const data = JSON.parse(event.data);
+        document.getElementById('strategy-text').textContent = data.strategy_description;
+        updatePortfolio(data);
+        liveTrades = data.trades;
+        updateTradesTable(liveTrades);
+    });
 
-        // Update buy/sell signals
-        priceChart.data.datasets[3].data = data.buy_signals.map(signal => ({
-            x: signal.timestamp,
-            y: signal.price
-        }));
-        priceChart.data.datasets[4].data = data.sell_signals.map(signal => ({
-            x: signal.timestamp,
-            y: signal.price
-        }));
+    liveStream.addEventListener('bar', event => {
+        const bar = JSON.parse(event.data);
+        priceChart.data.labels.push(bar.timestamp);
+        priceChart.data.datasets[0].data.push(bar.close);
+        priceChart.update();
+    });
 
+    liveStream.addEventListener('trade', event => {
+        const trade = JSON.parse(event.data);
+        const marker = { x: trade.timestamp, y: trade.price };
+        priceChart.data.datasets[trade.type === 'buy' ? 3 : 4].data.push(marker);
         priceChart.update();
+        liveTrades.push(trade);
+        updateTradesTable(liveTrades);
+    });
 
-        // Update other UI elements
-        document.getElementById('portfolio-value').textContent = 
-            `Current Portfolio Value: $${data.portfolio_value.toLocaleString()}`;
-        document.getElementById('latest-price').textContent = 
-            `Latest Price: $${data.price.toLocaleString()}`;
-        document.getElementById('holdings').textContent = 
-            `Current Holdings: ${data.holdings}`;
-        document.getElementById('cash-balance').textContent = 
-            `Cash Balance: $${data.cash.toLocaleString()}`;
-        
-        // Log the data before updating chart
-        console.log("Updating chart with:");
-        console.log("Timestamps:", data.timestamps.length);
-        console.log("Prices:", data.historical_prices.length);
-        console.log("First price:", data.historical_prices[0]);
-        console.log("Last price:", data.historical_prices[data.historical_prices.length - 1]);
-        
-        // Update trades table
-        updateTradesTable(data.trades);
-        
-    } catch (error) {
-        console.error("Error updating data:", error);
-    }
-}
+    liveStream.addEventListener('portfolio', event => {
+        updatePortfolio(JSON.parse(event.data));
+    });
 
-// Initial update
-updateData();
+    // EventSource reconnects by itself and resumes after the last event it saw
+    liveStream.onerror = () => console.warn("Live stream interrupted, reconnecting");
+}
 
-// Auto-update every 5 minutes
-setInterval(updateData, 3000000);
+const tickerInput = document.getElementById('ticker');
+if (tickerInput) {
+    subscribe(tickerInput.value);
+    tickerInput.addEventListener('change', event => subscribe(event.target.value));
+}
 
 async function runBacktest() {
     try {
         const ticker = document.getElementById('ticker').value;
         const days = document.getElementById('backtest-days').value;
         
-        const response = await fetch('/backtest', {
+        const data = await postWithETag('/backtest', {
             method: 'POST',
             headers: { 'Content-Type': 'application/x-www-form-urlencoded' },
             body: `ticker=${ticker}&days=${days}`
         });
         
-        const data = await response.json();
-        
         if (data.error) {
             alert(data.error);
             return;
@@ -1,7 +1,103 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+from collections import deque
+import math
+import numpy as np
 import pandas as pd
 
+
+class RollingMean:
+    """O(1) running mean over the last `period` values, NaN until the window is full.
+
+    Repeats pandas' rolling().mean() step for step: Kahan-compensated adds
+    and removes, missing values left out of the count, and a run of
+    identical values yielding that value. Live signals therefore compare
+    the same floats the batch kernels produce, ties included.
+    """
+
+    def __init__(self, period: int):
+        self.period = period
+        self.window = deque()
+        self.nobs = 0
+        self.total = 0.0
+        self._add_compensation = 0.0
+        self._remove_compensation = 0.0
+        self._negatives = 0
+        self._same_run = 0
+        self._previous = None
+
+    def _remove(self, value: float):
+        if value != value:
+            return
+        self.nobs -= 1
+        y = -value - self._remove_compensation
+        t = self.total + y
+        self._remove_compensation = t - self.total - y
+        self.total = t
+        if math.copysign(1.0, value) < 0:
+            self._negatives -= 1
+
+    def _add(self, value: float):
+        if self._previous is None:
+            self._previous = value
+        if value != value:
+            return
+        self.nobs += 1
+        y = value - self._add_compensation
+        t = self.total + y
+        self._add_compensation = t - self.total - y
+        self.total = t
+        if math.copysign(1.0, value) < 0:
+            self._negatives += 1
+        self._same_run = self._same_run + 1 if value == self._previous else 1
+        self._previous = value
+
+    def update(self, value: float) -> float:
+        if len(self.window) == self.period:
+            self._remove(self.window.popleft())
+        self.window.append(value)
+        self._add(value)
+
+        if self.nobs < self.period:
+            return float('nan')
+        if self._same_run >= self.nobs:
+            return self._previous
+        mean = self.total / self.nobs
+        # All-positive or all-negative windows cannot round across zero
+        if (self._negatives == 0 and mean < 0) or (self._negatives == self.nobs and mean > 0):
+            return 0.0
+        return mean
+
+
+class ExponentialMean:
+    """Recursive EMA, one ewm(span=span, adjust=False).mean() step per value.
+
+    Uses pandas' weighting arithmetic rather than the textbook
+    alpha * x + (1 - alpha) * previous, which rounds differently.
+    """
+
+    def __init__(self, span: int):
+        self.alpha = 1.0 / (1.0 + (span - 1) / 2.0)
+        self.value = float('nan')
+        self._started = False
+        self._old_weight = 1.0
+
+    def update(self, value: float) -> float:
+        if not self._started:
+            self._started = True
+            self.value = value
+        elif self.value == self.value:
+            self._old_weight *= 1.0 - self.alpha
+            if value == value:
+                if self.value != value:
+                    self.value = ((self._old_weight * self.value + self.alpha * value)
+                                  / (self._old_weight + self.alpha))
+                self._old_weight = 1.0
+        elif value == value:
+            self.value = value
+        return self.value
+
+
 class TradingStrategy(ABC):
     def __init__(self, stop_loss_pct: float = 5, take_profit_pct: float = 5):
         self.stop_loss_pct = stop_loss_pct
@@ -14,6 +110,35 @@ class TradingStrategy(ABC):
         """Generate buy/sell signals based on the strategy"""
         pass
 
+    @classmethod
+    def valid_params(cls, params: Dict[str, Any]) -> bool:
+        """Whether a parameter combination is worth running, for optimizer grids"""
+        return True
+
+    def signal_array(self, close: pd.Series, key: Optional[str] = None) -> np.ndarray:
+        """The signal column of generate_signals as an int8 array; `key` is the close fingerprint"""
+        return self.generate_signals(close.to_frame('Close'))['signal'].to_numpy(dtype=np.int8)
+
+    def signal_matrix(self, paths: np.ndarray) -> np.ndarray:
+        """Signals for a batch of close series, one per row, as an int8 (paths, bars) array"""
+        signals = np.empty(paths.shape, dtype=np.int8)
+        for row, path in enumerate(paths):
+            signals[row] = self.signal_array(pd.Series(path))
+        return signals
+
+    @staticmethod
+    def signal_frame(close: pd.Series, columns: Dict[str, Any], signal: np.ndarray) -> pd.DataFrame:
+        """Close, indicator columns and signal on close's index, without copying the input frame"""
+        return pd.DataFrame({'Close': close, **columns, 'signal': signal}, index=close.index)
+
+    def reset(self):
+        """Clear the incremental state kept by on_bar"""
+        pass
+
+    def on_bar(self, bar) -> int:
+        """Consume one bar and return its signal, matching generate_signals on the series so far"""
+        raise NotImplementedError(f"{self.name} does not support incremental evaluation")
+
     def check_exit_conditions(self, current_price: float, entry_price: float) -> Dict[str, Any]:
         """Check stop loss and take profit conditions"""
         if entry_price is None:
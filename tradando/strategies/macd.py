@@ -1,6 +1,7 @@
-from tradando.strategies.base import TradingStrategy
+from tradando.strategies.base import TradingStrategy, ExponentialMean
 import pandas as pd
 import numpy as np
+from tradando.services import indicators, kernels
 
 class MACDStrategy(TradingStrategy):
     def __init__(self, fast_period: int = 12, slow_period: int = 26, 
@@ -12,32 +13,54 @@ class MACDStrategy(TradingStrategy):
         self.name = "MACD Strategy"
         self.description = (f"MACD ({fast_period}/{slow_period}/{signal_period}) "
                           "Crossover Strategy")
+        self.reset()
+
+    @classmethod
+    def valid_params(cls, params) -> bool:
+        return params.get('fast_period', 12) < params.get('slow_period', 26)
+
+    def reset(self):
+        self._fast_ema = ExponentialMean(self.fast_period)
+        self._slow_ema = ExponentialMean(self.slow_period)
+        self._signal_ema = ExponentialMean(self.signal_period)
+        self._prev_macd = None
+        self._prev_signal = None
+
+    def on_bar(self, bar) -> int:
+        close = float(bar['Close'])
+        macd = self._fast_ema.update(close) - self._slow_ema.update(close)
+        signal_line = self._signal_ema.update(macd)
+        prev_macd, prev_signal = self._prev_macd, self._prev_signal
+        self._prev_macd, self._prev_signal = macd, signal_line
+
+        if prev_macd is None:
+            return 0
+        if macd < signal_line and prev_macd >= prev_signal:
+            return -1
+        if macd > signal_line and prev_macd <= prev_signal:
+            return 1
+        return 0
 
     def calculate_macd(self, data: pd.Series) -> tuple:
         """Calculate MACD line and signal line"""
-        exp1 = data.ewm(span=self.fast_period, adjust=False).mean()
-        exp2 = data.ewm(span=self.slow_period, adjust=False).mean()
-        macd_line = exp1 - exp2
-        signal_line = macd_line.ewm(span=self.signal_period, adjust=False).mean()
-        return macd_line, signal_line
+        return indicators.macd(data, self.fast_period, self.slow_period, self.signal_period)
+
+    def signal_array(self, close: pd.Series, key: str = None) -> np.ndarray:
+        """Buy when MACD crosses above its signal line, sell when it crosses below"""
+        macd, signal_line = indicators.macd(close, self.fast_period, self.slow_period, self.signal_period, key)
+        return kernels.crossover_signals(macd.to_numpy(), signal_line.to_numpy())
+
+    def signal_matrix(self, paths: np.ndarray) -> np.ndarray:
+        return kernels.crossover_signals(*kernels.macd(paths, self.fast_period, self.slow_period,
+                                                       self.signal_period))
 
     def generate_signals(self, data: pd.DataFrame) -> pd.DataFrame:
         """Generate signals based on MACD crossover"""
-        df = data.copy()
-        
-        # Calculate MACD and signal line
-        df['MACD'], df['Signal_Line'] = self.calculate_macd(df['Close'])
-        df['MACD_Hist'] = df['MACD'] - df['Signal_Line']
-        
-        # Generate signals
-        df['signal'] = 0
-        
-        # Buy when MACD crosses above signal line
-        df.loc[(df['MACD'] > df['Signal_Line']) & 
-               (df['MACD'].shift(1) <= df['Signal_Line'].shift(1)), 'signal'] = 1
-        
-        # Sell when MACD crosses below signal line
-        df.loc[(df['MACD'] < df['Signal_Line']) & 
-               (df['MACD'].shift(1) >= df['Signal_Line'].shift(1)), 'signal'] = -1
-        
-        return df 
\ No newline at end of file
+        close = data['Close']
+        macd, signal_line = self.calculate_macd(close)
+        signal = kernels.crossover_signals(macd.to_numpy(), signal_line.to_numpy())
+        return self.signal_frame(close, {
+            'MACD': macd,
+            'Signal_Line': signal_line,
+            'MACD_Hist': macd - signal_line
+        }, signal)
@@ -0,0 +1,150 @@
+from typing import Any, Dict, List, Optional, Type, Union
+from collections import OrderedDict
+from importlib import import_module, metadata
+import inspect
+import json
+import logging
+import threading
+from tradando.strategies.base import TradingStrategy
+
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = 'tradando.strategies'
+
+BUILTIN_STRATEGIES = {
+    'sma_cross': 'tradando.strategies.sma_cross:SMACrossStrategy',
+    'rsi': 'tradando.strategies.rsi:RSIStrategy',
+    'macd': 'tradando.strategies.macd:MACDStrategy',
+}
+
+Target = Union[str, Type[TradingStrategy], metadata.EntryPoint]
+
+
+class StrategyRegistry:
+    """Strategies by key, imported on first use.
+
+    Keys map to a strategy class or a 'module:Class' path. Packages can add
+    strategies without touching this one by declaring an entry point in the
+    'tradando.strategies' group; built-in keys take precedence. instance()
+    memoizes configured strategies by their parameters, so they are shared
+    and must only be used for batch signals: on_bar() callers need their
+    own from create().
+    """
+
+    def __init__(self, targets: Dict[str, Target], entry_point_group: Optional[str] = ENTRY_POINT_GROUP,
+                 max_instances: int = 256):
+        self._targets: Dict[str, Target] = dict(targets)
+        self._classes: Dict[str, Type[TradingStrategy]] = {}
+        self._instances: 'OrderedDict[tuple, TradingStrategy]' = OrderedDict()
+        self._group = entry_point_group
+        self._discovered = entry_point_group is None
+        self.max_instances = max_instances
+        self._lock = threading.RLock()
+
+    def register(self, key: str, target: Target):
+        with self._lock:
+            self._targets[key] = target
+            self._classes.pop(key, None)
+            for cached in [k for k in self._instances if k[0] == key]:
+                del self._instances[cached]
+
+    def _discover(self):
+        with self._lock:
+            if self._discovered:
+                return
+            self._discovered = True
+            for entry_point in metadata.entry_points(group=self._group):
+                if entry_point.name in self._targets:
+                    logger.warning(f"Ignoring strategy plugin {entry_point.value}: "
+                                   f"'{entry_point.name}' is already registered")
+                    continue
+                self._targets[entry_point.name] = entry_point
+
+    def names(self) -> List[str]:
+        self._discover()
+        return list(self._targets)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.names()
+
+    def get_class(self, key: str) -> Type[TradingStrategy]:
+        """The strategy class, importing its module the first time it is asked for"""
+        self._discover()
+        with self._lock:
+            if key in self._classes:
+                return self._classes[key]
+            if key not in self._targets:
+                raise ValueError(f"Unknown strategy: {key}")
+            target = self._targets[key]
+            if isinstance(target, metadata.EntryPoint):
+                cls = target.load()
+            elif isinstance(target, str):
+                module, _, name = target.partition(':')
+                cls = getattr(import_module(module), name)
+            else:
+                cls = target
+            if not (isinstance(cls, type) and issubclass(cls, TradingStrategy)):
+                raise TypeError(f"Strategy '{key}' does not resolve to a TradingStrategy subclass")
+            self._classes[key] = cls
+            return cls
+
+    def create(self, key: str, **params) -> TradingStrategy:
+        """A new strategy instance"""
+        cls = self.get_class(key)
+        try:
+            return cls(**params)
+        except TypeError as e:
+            raise ValueError(f"Invalid {key} parameters: {e}")
+
+    def instance(self, key: str, **params) -> TradingStrategy:
+        """A shared strategy instance for these parameters"""
+        cache_key = (key, json.dumps(params, sort_keys=True, default=str))
+        with self._lock:
+            if cache_key in self._instances:
+                self._instances.move_to_end(cache_key)
+                return self._instances[cache_key]
+
+        strategy = self.create(key, **params)
+        with self._lock:
+            strategy = self._instances.setdefault(cache_key, strategy)
+            while len(self._instances) > self.max_instances:
+                self._instances.popitem(last=False)
+            return strategy
+
+    def schema(self, key: str) -> Dict[str, Any]:
+        """Name, description and constructor parameters with their types and defaults"""
+        cls = self.get_class(key)
+        params = []
+        for klass in cls.__mro__:
+            if not (isinstance(klass, type) and issubclass(klass, TradingStrategy)):
+                continue
+            signature = inspect.signature(klass.__init__)
+            for param in list(signature.parameters.values())[1:]:
+                if param.kind in (param.VAR_POSITIONAL, param.VAR_KEYWORD):
+                    continue
+                if any(p['name'] == param.name for p in params):
+                    continue
+                annotation = param.annotation
+                params.append({
+                    'name': param.name,
+                    'type': getattr(annotation, '__name__', None) if annotation is not param.empty else None,
+                    'default': None if param.default is param.empty else param.default,
+                    'required': param.default is param.empty,
+                })
+            if not any(p.kind == p.VAR_KEYWORD for p in signature.parameters.values()):
+                break
+
+        default = self.instance(key) if not any(p['required'] for p in params) else None
+        return {
+            'key': key,
+            'class': f"{cls.__module__}.{cls.__qualname__}",
+            'name': default.name if default else cls.__name__,
+            'description': default.description if default else (cls.__doc__ or '').strip(),
+            'params': params,
+        }
+
+    def schemas(self) -> List[Dict[str, Any]]:
+        return [self.schema(key) for key in self.names()]
+
+
+strategy_registry = StrategyRegistry(BUILTIN_STRATEGIES)
@@ -1,6 +1,8 @@
-from tradando.strategies.base import TradingStrategy
+from tradando.strategies.base import TradingStrategy, RollingMean
+import math
 import pandas as pd
 import numpy as np
+from tradando.services import indicators, kernels
 
 class RSIStrategy(TradingStrategy):
     def __init__(self, period: int = 14, overbought: int = 70, oversold: int = 30, **kwargs):
@@ -10,29 +12,54 @@ class RSIStrategy(TradingStrategy):
         self.oversold = oversold
         self.name = "RSI Strategy"
         self.description = f"RSI ({period}) with Overbought ({overbought}) and Oversold ({oversold}) levels"
+        self.reset()
+
+    @classmethod
+    def valid_params(cls, params) -> bool:
+        return params.get('oversold', 30) < params.get('overbought', 70)
+
+    def reset(self):
+        self._prev_close = None
+        self._gain = RollingMean(self.period)
+        self._loss = RollingMean(self.period)
+
+    def on_bar(self, bar) -> int:
+        close = float(bar['Close'])
+        # Like diff().where(...) in calculate_rsi, the first bar counts as no change
+        delta = 0.0 if self._prev_close is None else close - self._prev_close
+        self._prev_close = close
+
+        # Same values as the kernel's gain / loss arrays, down to the -0.0 of an unchanged close
+        gain = self._gain.update(delta if delta > 0 else 0.0)
+        loss = self._loss.update(-(delta if delta < 0 else 0.0))
+        if math.isnan(gain):
+            return 0
+        if loss == 0:
+            rsi = 100.0 if gain > 0 else float('nan')
+        else:
+            rsi = 100 - (100 / (1 + gain / loss))
+
+        if rsi > self.overbought:
+            return -1
+        if rsi < self.oversold:
+            return 1
+        return 0
 
     def calculate_rsi(self, data: pd.Series) -> pd.Series:
         """Calculate RSI indicator"""
-        delta = data.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=self.period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=self.period).mean()
-        
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
+        return indicators.rsi(data, self.period)
+
+    def signal_array(self, close: pd.Series, key: str = None) -> np.ndarray:
+        """Buy below the oversold level, sell above the overbought level"""
+        rsi = indicators.rsi(close, self.period, key).to_numpy()
+        return kernels.threshold_signals(rsi, self.oversold, self.overbought)
+
+    def signal_matrix(self, paths: np.ndarray) -> np.ndarray:
+        return kernels.threshold_signals(kernels.rsi(paths, self.period), self.oversold, self.overbought)
 
     def generate_signals(self, data: pd.DataFrame) -> pd.DataFrame:
         """Generate signals based on RSI"""
-        df = data.copy()
-        df['RSI'] = self.calculate_rsi(df['Close'])
-        
-        # Generate signals
-        df['signal'] = 0
-        
-        # Buy when RSI crosses below oversold level
-        df.loc[df['RSI'] < self.oversold, 'signal'] = 1
-        
-        # Sell when RSI crosses above overbought level
-        df.loc[df['RSI'] > self.overbought, 'signal'] = -1
-        
-        return df 
\ No newline at end of file
+        close = data['Close']
+        rsi = self.calculate_rsi(close)
+        signal = kernels.threshold_signals(rsi.to_numpy(), self.oversold, self.overbought)
+        return self.signal_frame(close, {'RSI': rsi}, signal)
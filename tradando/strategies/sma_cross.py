@@ -1,5 +1,7 @@
-from tradando.strategies.base import TradingStrategy
+from tradando.strategies.base import TradingStrategy, RollingMean
+import numpy as np
 import pandas as pd
+from tradando.services import indicators, kernels
 
 class SMACrossStrategy(TradingStrategy):
     def __init__(self, fast_period: int = 20, slow_period: int = 50, **kwargs):
@@ -8,16 +10,45 @@ class SMACrossStrategy(TradingStrategy):
         self.slow_period = slow_period
         self.name = "SMA Crossover"
         self.description = f"Simple Moving Average Crossover ({fast_period}/{slow_period})"
+        self.reset()
+
+    @classmethod
+    def valid_params(cls, params) -> bool:
+        return params.get('fast_period', 20) < params.get('slow_period', 50)
+
+    def reset(self):
+        self._fast = RollingMean(self.fast_period)
+        self._slow = RollingMean(self.slow_period)
+
+    def on_bar(self, bar) -> int:
+        close = float(bar['Close'])
+        fast = self._fast.update(close)
+        slow = self._slow.update(close)
+        if fast > slow:
+            return 1
+        if fast < slow:
+            return -1
+        return 0
+
+    def signal_array(self, close: pd.Series, key: str = None) -> np.ndarray:
+        """Buy while the fast SMA is above the slow one, sell while it is below"""
+        key = key or indicators.fingerprint(close)
+        fast = indicators.sma(close, self.fast_period, key).to_numpy()
+        slow = indicators.sma(close, self.slow_period, key).to_numpy()
+        return kernels.comparison_signals(fast, slow)
+
+    def signal_matrix(self, paths: np.ndarray) -> np.ndarray:
+        return kernels.comparison_signals(kernels.rolling_mean(paths, self.fast_period),
+                                          kernels.rolling_mean(paths, self.slow_period))
 
     def generate_signals(self, data: pd.DataFrame) -> pd.DataFrame:
         """Generate signals based on SMA crossover"""
-        df = data.copy()
-        df[f'SMA{self.fast_period}'] = df['Close'].rolling(window=self.fast_period).mean()
-        df[f'SMA{self.slow_period}'] = df['Close'].rolling(window=self.slow_period).mean()
-        
-        # Generate signals
-        df['signal'] = 0
-        df.loc[df[f'SMA{self.fast_period}'] > df[f'SMA{self.slow_period}'], 'signal'] = 1
-        df.loc[df[f'SMA{self.fast_period}'] < df[f'SMA{self.slow_period}'], 'signal'] = -1
-        
-        return df
+        close = data['Close']
+        key = indicators.fingerprint(close)
+        fast = indicators.sma(close, self.fast_period, key)
+        slow = indicators.sma(close, self.slow_period, key)
+        signal = kernels.comparison_signals(fast.to_numpy(), slow.to_numpy())
+        return self.signal_frame(close, {
+            f'SMA{self.fast_period}': fast,
+            f'SMA{self.slow_period}': slow
+        }, signal)
@@ -1,9 +1,17 @@
-import yfinance as yf
-import pandas as pd
+import os
+import time
 import requests
+from requests.adapters import HTTPAdapter
+import pandas as pd
 from datetime import datetime, timedelta  # Import only datetime here
 import pytz
 from tradando.config import Config
+from tradando.services.bar_store import BarStore
+from tradando.services.descriptions import DescriptionService
+from tradando.services.metrics import metrics
+from tradando.services.timeframes import timeframe_cache
+from tradando.strategies.base import TradingStrategy
+from tradando.strategies.registry import strategy_registry
 from typing import List, Dict, Any
 from concurrent.futures import ThreadPoolExecutor
 import logging
@@ -15,8 +23,79 @@ def utc_to_local(utc_dt):
     local_tz = datetime.now().astimezone().tzinfo
     return utc_dt.replace(tzinfo=pytz.UTC).astimezone(local_tz)
 
-def fetch_historical_data(symbol: str, days: int = 5) -> pd.DataFrame:
-    """Fetch historical data with error handling and logging"""
+# One pooled session for every Yahoo Finance request
+yf_session = requests.Session()
+yf_session.mount('https://', HTTPAdapter(pool_maxsize=Config.BULK_FETCH_POOL_SIZE))
+
+def yfinance_fetcher(symbol: str, start, end, interval: str) -> pd.DataFrame:
+    """Download bars from Yahoo Finance"""
+    import yfinance as yf  # imported on first download, it is slow to load
+    ticker = yf.Ticker(symbol, session=yf_session)
+    return ticker.history(start=start, end=end, interval=interval)
+
+def _is_rate_limited(error) -> bool:
+    message = str(error)
+    return '429' in message or 'Too Many Requests' in message or 'Rate' in type(error).__name__
+
+def yfinance_bulk_fetcher(symbols: List[str], start, end, interval: str) -> Dict[str, pd.DataFrame]:
+    """Download bars for many symbols in batched yf.download calls.
+
+    A batch that hits Yahoo's rate limit is retried with exponential
+    backoff; symbols that still fail are left out of the result.
+    """
+    import yfinance as yf
+    from yfinance import shared as yf_shared
+    bars = {}
+    size = Config.BULK_FETCH_BATCH_SIZE
+    for batch in [symbols[i:i + size] for i in range(0, len(symbols), size)]:
+        for attempt in range(Config.BULK_FETCH_RETRIES + 1):
+            try:
+                df = yf.download(batch, start=start, end=end, interval=interval, group_by='ticker',
+                                 auto_adjust=True, threads=True, progress=False, session=yf_session)
+            except Exception as e:
+                if not _is_rate_limited(e) or attempt == Config.BULK_FETCH_RETRIES:
+                    logger.error(f"Bulk download of {len(batch)} symbols failed: {e}")
+                    break
+                df = None
+            else:
+                # yfinance reports per-symbol failures here instead of raising
+                errors = getattr(yf_shared, '_ERRORS', {}) or {}
+                if not isinstance(df.columns, pd.MultiIndex):
+                    df = pd.concat({batch[0]: df}, axis=1)
+                rate_limited = [symbol for symbol in batch if _is_rate_limited(errors.get(symbol, ''))]
+                for symbol in batch:
+                    if symbol in rate_limited or symbol not in df.columns.get_level_values(0):
+                        continue
+                    symbol_bars = df[symbol].dropna(how='all')
+                    if not symbol_bars.empty:
+                        bars[symbol] = symbol_bars
+                if not rate_limited or attempt == Config.BULK_FETCH_RETRIES:
+                    break
+                batch = rate_limited
+
+            delay = Config.BULK_FETCH_BACKOFF * 2 ** attempt
+            logger.warning(f"Rate limited by Yahoo Finance, retrying {len(batch)} symbols in {delay}s")
+            time.sleep(delay)
+    return bars
+
+bar_store = BarStore(Config.DATA_CACHE_DIR, yfinance_fetcher, Config.DATA_REFRESH_SECONDS,
+                     bulk_fetcher=yfinance_bulk_fetcher)
+def set_bar_store(store: BarStore) -> BarStore:
+    """Serve bars from `store` from now on, returning the store it replaces"""
+    global bar_store
+    previous, bar_store = bar_store, store
+    return previous
+
+description_service = DescriptionService(Config.HF_API_URL, Config.HF_API_KEY, Config.HF_MODEL,
+                                         os.path.join(Config.DATA_CACHE_DIR, 'descriptions'),
+                                         Config.HF_TIMEOUT, Config.DESCRIPTION_RETRY_SECONDS)
+
+def fetch_historical_data(symbol: str, days: int = 5, interval: str = Config.BASE_INTERVAL) -> pd.DataFrame:
+    """Fetch historical data with error handling and logging.
+
+    Only base interval bars are downloaded; longer intervals are
+    aggregated from them and extended incrementally as new bars arrive.
+    """
     try:
         # Calculate start and end dates
         end_date = datetime.now()
@@ -24,31 +103,50 @@ def fetch_historical_data(symbol: str, days: int = 5) -> pd.DataFrame:
         
         logger.info(f"Fetching data for {symbol} from {start_date} to {end_date}")
         
-        # Fetch data using yfinance
-        ticker = yf.Ticker(symbol)
-        df = ticker.history(start=start_date, end=end_date, interval='5m')
+        # Served from the local bar store, which only asks the fetcher for missing bars
+        with metrics.timer('tradando_fetch_seconds'):
+            df = bar_store.get(symbol, start_date, end_date, interval=Config.BASE_INTERVAL)
         
-        if df.empty:
+        if df is None or df.empty:
             logger.error(f"No data received for {symbol}")
             return None
             
         logger.info(f"Received {len(df)} data points for {symbol}")
-        return df
+        return timeframe_cache.get((symbol, days), df, interval)
         
     except Exception as e:
         logger.error(f"Error fetching data for {symbol}: {str(e)}")
         return None
 
-def get_strategy_description():
-    headers = {"Authorization": f"Bearer {Config.HF_API_KEY}"}
-    prompt = """
-    This is a cryptocurrency trading strategy that uses Moving Average Crossover:
-    - When the 20-period SMA crosses above the 50-period SMA (Golden Cross), it generates a buy signal
-    - When the 20-period SMA crosses below the 50-period SMA (Death Cross), it generates a sell signal
-    """
+def prefetch_historical_data(symbols: List[str], days: int = 5,
+                             interval: str = Config.BASE_INTERVAL) -> Dict[str, pd.DataFrame]:
+    """Refresh the bar store for many symbols at once, returning those with data"""
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=days)
     try:
-        response = requests.post(f"{Config.HF_API_URL}gpt2", headers=headers, json={"inputs": prompt})
-        return response.json()[0]['generated_text']
+        with metrics.timer('tradando_fetch_seconds'):
+            bars = bar_store.get_many(symbols, start_date, end_date, interval=Config.BASE_INTERVAL)
     except Exception as e:
-        print(f"Error fetching strategy description: {e}")
-        return "A Moving Average Crossover strategy using SMA20 and SMA50."
+        logger.error(f"Error prefetching {len(symbols)} symbols: {str(e)}")
+        return {}
+    return {symbol: timeframe_cache.get((symbol, days), df, interval)
+            for symbol, df in bars.items() if df is not None and not df.empty}
+
+def fetch_many(symbols: List[str], days: int = 5, columns: List[str] = ('Close',),
+               dtype=None, interval: str = Config.BASE_INTERVAL) -> pd.DataFrame:
+    """Bars for many symbols as one frame on a shared DatetimeIndex.
+
+    Columns are a (column, symbol) MultiIndex holding only the requested
+    columns, so fetch_many(...)['Close'] is a time x symbol frame. Symbols
+    without data are left out; pass dtype='float32' to halve the memory.
+    """
+    bars = prefetch_historical_data(symbols, days, interval)
+    if not bars:
+        return pd.DataFrame()
+    frame = pd.concat({symbol: df[list(columns)] for symbol, df in bars.items()}, axis=1).sort_index()
+    frame = frame.swaplevel(axis=1).sort_index(axis=1, level=0, sort_remaining=False)
+    return frame.astype(dtype) if dtype is not None else frame
+
+def get_strategy_description(strategy: TradingStrategy = None) -> str:
+    """Description of the strategy, never waiting on the language model"""
+    return description_service.get(strategy or strategy_registry.instance('sma_cross'))